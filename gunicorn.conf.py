@@ -0,0 +1,32 @@
+"""
+Configuración de gunicorn (se carga sola desde el directorio de trabajo).
+
+Las métricas de ``/metrics`` se comparten entre los workers a través de
+``PROMETHEUS_MULTIPROC_DIR``: se define y se vacía antes de cargar la
+aplicación (con ``--preload`` el maestro ya crea contadores al importarla) y
+se limpian los archivos de cada worker que termina. Fuera de ``DEBUG`` y
+``TESTING``, ``/metrics`` responde 404 si no se define ``METRICS_TOKEN`` en el
+entorno; Prometheus lo envía como ``Authorization: Bearer <token>``.
+
+Cada worker inicia al arrancar su hilo de la bandeja de correos, que
+entrega lo que haya quedado pendiente (el hilo no sobrevive al fork de
+``--preload``, por eso se hace en ``post_worker_init``).
+"""
+
+import os
+import shutil
+
+# Antes de importar prometheus_client: el modo multiproceso se elige al importarlo
+METRICS_DIR = os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/tienda-metrics')
+shutil.rmtree(METRICS_DIR, ignore_errors=True)
+os.makedirs(METRICS_DIR, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def post_worker_init(worker):
+    from website.outbox import start_outbox_worker
+    start_outbox_worker(worker.wsgi)
@@ -0,0 +1,12 @@
+"""
+Pruebas de carga de la tienda.
+
+    python -m loadtest seed --products 100000       # base sintética
+    python -m loadtest run --products 100000 --mix default --users 20 --duration 60
+    python -m loadtest run ... --update-baseline    # guarda la línea base
+
+``run`` corre los escenarios de ``scenarios.py`` contra la aplicación en el
+mismo proceso y sale con código 1 si alguna ruta empeoró respecto de
+``baseline.json``. Para cargar un servidor real, ``locustfile.py`` en la
+raíz del repositorio usa los mismos escenarios.
+"""
@@ -0,0 +1,128 @@
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+
+import click
+
+from .catalog import catalog_for
+from .runner import TOLERANCE, compare, format_report, run_load
+from .scenarios import MIXES
+
+BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+
+def _database_uri(database, products):
+    """URL de la base de carga: nunca la de ``instance/``"""
+    if database and '://' in database:
+        return database
+    path = database or os.path.join(tempfile.gettempdir(), f'tienda-carga-{products}.sqlite3')
+    return f'sqlite:///{os.path.abspath(path)}'
+
+
+def _working_copy(uri):
+    """
+    Copia de la base SQLite sembrada para una corrida.
+
+    Los compradores agregan carritos y pedidos; sobre una copia nueva cada
+    corrida parte de los mismos datos y es comparable con la línea base.
+    """
+    path = uri[len('sqlite:///'):]
+    copy = f'{path}.run'
+    source, target = sqlite3.connect(path), sqlite3.connect(copy)
+    with target:
+        source.backup(target)
+    source.close()
+    target.close()
+    return f'sqlite:///{copy}'
+
+
+def _app(uri):
+    from website import create_app
+    return create_app({'SQLALCHEMY_DATABASE_URI': uri, 'SECRET_KEY': 'carga'})
+
+
+def _seeded():
+    from sqlalchemy import inspect, text
+
+    from website import db
+    return (inspect(db.engine).has_table('product')
+            and db.session.execute(text('SELECT 1 FROM product LIMIT 1')).first() is not None)
+
+
+def _seed(catalog, orders):
+    from .seed import seed
+    counts = seed(catalog, orders=orders, log=click.echo)
+    click.echo(f'Base sembrada: {counts}')
+
+
+@click.group()
+def cli():
+    """Pruebas de carga contra la aplicación en el mismo proceso."""
+
+
+@cli.command('seed')
+@click.option('--products', default=10000, show_default=True)
+@click.option('--customers', type=int, help='Por defecto, 1 cada 100 productos (10 a 1000).')
+@click.option('--orders', type=int, help='Por defecto, 5 por cliente.')
+@click.option('--database', help='Archivo SQLite o URL; por defecto uno temporal por tamaño.')
+def seed_command(products, customers, orders, database):
+    """Crea una base sintética de catálogo, clientes y pedidos."""
+    catalog = catalog_for(products, customers)
+    with _app(_database_uri(database, products)).app_context():
+        _seed(catalog, orders)
+
+
+@cli.command('run')
+@click.option('--products', default=10000, show_default=True, help='Tamaño del catálogo sembrado.')
+@click.option('--customers', type=int)
+@click.option('--database', help='Se siembra si está vacía.')
+@click.option('--mix', type=click.Choice(sorted(MIXES)), default='default', show_default=True)
+@click.option('--users', default=10, show_default=True, help='Usuarios virtuales (threads).')
+@click.option('--duration', type=float, help='Segundos; si no se indica, --iterations por usuario.')
+@click.option('--iterations', default=200, show_default=True)
+@click.option('--warmup', default=5, show_default=True, help='Tareas sin medir por usuario.')
+@click.option('--seed', 'seed_value', default=0, show_default=True, help='Semilla de los usuarios.')
+@click.option('--baseline', default=BASELINE, show_default=True, type=click.Path(dir_okay=False))
+@click.option('--tolerance', default=TOLERANCE, show_default=True, help='Empeoramiento admitido (fracción).')
+@click.option('--output', type=click.Path(dir_okay=False), help='Guardar también el informe en JSON.')
+@click.option('--update-baseline', is_flag=True, help='Reemplazar la línea base con esta corrida.')
+def run_command(products, customers, database, mix, users, duration, iterations, warmup, seed_value,
+                baseline, tolerance, output, update_baseline):
+    """Corre una mezcla de usuarios y la compara con la línea base."""
+    catalog = catalog_for(products, customers)
+    uri = _database_uri(database, products)
+    with _app(uri).app_context():
+        if not _seeded():
+            _seed(catalog, None)
+    app = _app(_working_copy(uri)) if uri.startswith('sqlite:///') else _app(uri)
+    report = run_load(app, catalog, mix=mix, users=users, duration=duration,
+                      iterations=iterations, warmup=warmup, seed=seed_value)
+    click.echo(format_report(report))
+
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    if update_baseline:
+        with open(baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        click.echo(f'Línea base guardada en {baseline}')
+        return
+    if not os.path.exists(baseline):
+        click.echo(f'Sin línea base en {baseline}; guardarla con --update-baseline.')
+        return
+    with open(baseline, encoding='utf-8') as f:
+        previous = json.load(f)
+    if previous.get('params', {}).get('mix') != mix or previous.get('params', {}).get('products') != products:
+        click.echo('Aviso: la línea base se tomó con otra mezcla o tamaño de catálogo.')
+    problems = compare(report, previous, tolerance=tolerance)
+    for problem in problems:
+        click.echo(f'REGRESIÓN {problem}', err=True)
+    if problems:
+        sys.exit(1)
+    click.echo(f'Sin regresiones (tolerancia {tolerance:.0%}).')
+
+
+if __name__ == '__main__':
+    cli()
@@ -0,0 +1,50 @@
+"""
+Datos que siembra ``seed.py``, sin depender de la aplicación.
+
+``locustfile.py`` usa ``catalog_for()`` para conocer los ids y correos
+sembrados sin importar ``website`` ni consultar la base.
+"""
+
+from dataclasses import dataclass
+
+LOAD_PASSWORD = 'Carga123456789'
+
+CATEGORIES = (
+    'Electrónica', 'Hogar', 'Cocina', 'Deportes', 'Juguetes', 'Libros', 'Moda',
+    'Belleza', 'Jardín', 'Oficina', 'Mascotas', 'Automotriz', 'Música', 'Salud',
+    'Herramientas', 'Bebés', 'Videojuegos', 'Fotografía', 'Viajes', 'Papelería',
+)
+NOUNS = (
+    'auriculares', 'teclado', 'lámpara', 'sartén', 'zapatillas', 'mochila', 'reloj',
+    'cafetera', 'monitor', 'silla', 'pelota', 'cámara', 'parlante', 'licuadora',
+    'taladro', 'cuaderno', 'camiseta', 'tablet', 'colchoneta', 'botella',
+)
+ADJECTIVES = (
+    'inalámbrico', 'compacto', 'profesional', 'ergonómico', 'portátil', 'clásico',
+    'deportivo', 'digital', 'premium', 'ecológico', 'infantil', 'resistente',
+)
+BRANDS = ('Nova', 'Andes', 'Pacífico', 'Cóndor', 'Inca', 'Vértice', 'Lumen', 'Orbe')
+
+
+@dataclass
+class Catalog:
+    """Lo que los escenarios necesitan saber de los datos sembrados"""
+    products: int
+    categories: int
+    customers: int
+    password: str = LOAD_PASSWORD
+    search_terms: tuple = NOUNS + BRANDS
+
+    def customer_email(self, number):
+        # .test no pasa el validador de correo del formulario de login
+        return f'cliente{number}@carga.example.com'
+
+    def products_per_category(self):
+        return max(1, self.products // self.categories)
+
+
+def catalog_for(products, customers=None):
+    categories = min(len(CATEGORIES), max(1, products // 50))
+    if customers is None:
+        customers = max(10, min(1000, products // 100))
+    return Catalog(products=products, categories=categories, customers=customers)
@@ -0,0 +1,191 @@
+"""
+Ejecución local de los escenarios contra la aplicación en el mismo proceso.
+
+Cada usuario virtual corre en su propio thread con un cliente de pruebas de
+Flask (sin servidor ni red) y sin pausas entre tareas. Por ruta se registran
+p50, p95 y p99 en milisegundos y las peticiones por segundo; el informe se
+compara con una línea base en JSON y la corrida falla si alguna ruta
+empeora más que la tolerancia.
+"""
+
+import math
+import random
+import threading
+import time
+from collections import defaultdict
+
+from .scenarios import MIXES, SCENARIOS
+
+# Métricas de cada ruta que se comparan con la línea base (p99 varía demasiado
+# entre corridas cortas: se registra pero no decide)
+COMPARED = ('p50_ms', 'p95_ms')
+TOLERANCE = 0.3
+# Diferencias por debajo de esto (ms) son ruido aunque superen la tolerancia
+NOISE_FLOOR_MS = 5.0
+# Con menos muestras el p95 es casi el máximo: la ruta se informa pero no se compara
+MIN_SAMPLES = 20
+
+
+class Recorder:
+    """Duraciones y errores por ruta, compartido por los threads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.durations = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.enabled = True
+
+    def record(self, name, seconds, status):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.durations[name].append(seconds)
+            if status >= 500:
+                self.errors[name] += 1
+
+
+class TimedClient:
+    """Cliente de pruebas de Flask con la interfaz de la sesión de Locust"""
+
+    def __init__(self, app, recorder):
+        self.client = app.test_client()
+        self.recorder = recorder
+
+    def get(self, path, name=None, **kwargs):
+        return self.request('GET', path, name, **kwargs)
+
+    def post(self, path, name=None, **kwargs):
+        return self.request('POST', path, name, **kwargs)
+
+    def request(self, method, path, name=None, **kwargs):
+        start = time.perf_counter()
+        response = self.client.open(path, method=method, **kwargs)
+        self.recorder.record(f'{method} {name or path}', time.perf_counter() - start, response.status_code)
+        return response
+
+
+def percentile(values, percent):
+    """Percentil por rango más cercano de una lista ordenada"""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(percent / 100 * len(values)) - 1)]
+
+
+def summarize(recorder, elapsed):
+    routes = {}
+    for name, durations in sorted(recorder.durations.items()):
+        durations = sorted(durations)
+        routes[name] = {
+            'count': len(durations),
+            'errors': recorder.errors.get(name, 0),
+            'mean_ms': round(sum(durations) / len(durations) * 1000, 3),
+            'p50_ms': round(percentile(durations, 50) * 1000, 3),
+            'p95_ms': round(percentile(durations, 95) * 1000, 3),
+            'p99_ms': round(percentile(durations, 99) * 1000, 3),
+            'rps': round(len(durations) / elapsed, 2),
+        }
+    total = sum(route['count'] for route in routes.values())
+    return {
+        'requests': total,
+        'errors': sum(route['errors'] for route in routes.values()),
+        'elapsed_s': round(elapsed, 3),
+        'throughput_rps': round(total / elapsed, 2) if elapsed else 0.0,
+        'routes': routes,
+    }
+
+
+def run_load(app, catalog, mix='default', users=10, duration=None, iterations=200, warmup=5, seed=None):
+    """
+    Corre ``users`` usuarios virtuales de la mezcla ``mix``.
+
+    Cada usuario ejecuta ``warmup`` tareas sin medir (cachés, índice de
+    sugerencias) y luego ``iterations`` tareas, o tareas hasta cumplir
+    ``duration`` segundos si se indica.
+
+    Returns:
+        Informe con los parámetros, el total de peticiones por segundo y
+        p50/p95/p99 por ruta.
+    """
+    weights = MIXES[mix]
+    rng = random.Random(seed)
+    kinds = rng.choices(list(weights), weights=list(weights.values()), k=users)
+    recorder = Recorder()
+    ready = threading.Barrier(users + 1)
+    deadline = [None]
+    failures = []
+
+    def user(kind, user_seed):
+        try:
+            scenario = SCENARIOS[kind](TimedClient(app, recorder), catalog, random.Random(user_seed))
+            scenario.on_start()
+            for _ in range(warmup):
+                scenario.run_task()
+        except Exception as e:          # el informe lo muestra; los demás usuarios siguen
+            failures.append(f'{kind}: {e!r}')
+            ready.wait()
+            return
+        ready.wait()
+        done = 0
+        try:
+            while (deadline[0] is None and done < iterations) or (deadline[0] and time.perf_counter() < deadline[0]):
+                scenario.run_task()
+                done += 1
+        except Exception as e:          # corta a este usuario: la muestra quedó incompleta
+            failures.append(f'{kind} (tarea {done + 1}): {e!r}')
+
+    recorder.enabled = False
+    threads = [threading.Thread(target=user, args=(kind, rng.random()), daemon=True) for kind in kinds]
+    for thread in threads:
+        thread.start()
+    ready.wait()
+    # Todos terminaron el calentamiento: desde acá se mide
+    recorder.enabled = True
+    start = time.perf_counter()
+    if duration:
+        deadline[0] = start + duration
+    for thread in threads:
+        thread.join()
+    report = summarize(recorder, time.perf_counter() - start)
+    report['params'] = {
+        'mix': mix, 'users': users, 'duration': duration, 'iterations': None if duration else iterations,
+        'products': catalog.products, 'customers': catalog.customers,
+        'scenarios': {kind: kinds.count(kind) for kind in weights},
+    }
+    report['failures'] = failures
+    return report
+
+
+def compare(report, baseline, tolerance=TOLERANCE, noise_floor_ms=NOISE_FLOOR_MS):
+    """
+    Diferencias del informe respecto de la línea base.
+
+    Returns:
+        Lista de mensajes; vacía si ninguna ruta empeoró más que
+        ``tolerance`` (fracción) ni aparecieron errores.
+    """
+    problems = [f'usuario falló: {failure}' for failure in report.get('failures', ())]
+    for name, route in report['routes'].items():
+        if route['errors']:
+            problems.append(f'{name}: {route["errors"]} respuestas 5xx')
+        previous = baseline['routes'].get(name)
+        if previous is None or min(route['count'], previous['count']) < MIN_SAMPLES:
+            continue
+        for metric in COMPARED:
+            limit = previous[metric] * (1 + tolerance)
+            if route[metric] > limit and route[metric] - previous[metric] > noise_floor_ms:
+                problems.append(f'{name}: {metric} {route[metric]:.1f} ms (línea base {previous[metric]:.1f} ms)')
+    minimum = baseline['throughput_rps'] * (1 - tolerance)
+    if report['throughput_rps'] < minimum:
+        problems.append(f'throughput {report["throughput_rps"]:.1f} req/s '
+                        f'(línea base {baseline["throughput_rps"]:.1f} req/s)')
+    return problems
+
+
+def format_report(report):
+    lines = [f'{"ruta":<40} {"n":>6} {"p50":>8} {"p95":>8} {"p99":>8} {"req/s":>8}']
+    for name, route in report['routes'].items():
+        lines.append(f'{name:<40} {route["count"]:>6} {route["p50_ms"]:>8.2f} {route["p95_ms"]:>8.2f} '
+                     f'{route["p99_ms"]:>8.2f} {route["rps"]:>8.1f}')
+    lines.append(f'{report["requests"]} peticiones en {report["elapsed_s"]:.1f} s: '
+                 f'{report["throughput_rps"]:.1f} req/s, {report["errors"]} errores')
+    return '\n'.join(lines)
@@ -0,0 +1,162 @@
+"""
+Escenarios de las pruebas de carga.
+
+Cada tipo de usuario es una clase con tareas ponderadas. Las tareas reciben
+un cliente con la interfaz de la sesión de Locust (``get``/``post`` con
+``name=`` para agrupar las URLs de una misma ruta), así que sirven tanto
+para ``locustfile.py`` contra un servidor como para ``runner.py`` contra
+la aplicación en el mismo proceso.
+"""
+
+import random
+import re
+
+_CSRF = re.compile(r'name="csrf_token" type="hidden" value="([^"]+)"')
+_CART_LINE = re.compile(r'class="plus-cart btn ?" pid="(\d+)"')
+# Errores de tipeo frecuentes: fuerzan el "Quizás quisiste decir"
+_TYPOS = (('a', 'q'), ('e', 'w'), ('o', 'p'), ('r', 't'))
+
+
+def task(weight):
+    def decorate(function):
+        function.task_weight = weight
+        return function
+    return decorate
+
+
+class Scenario:
+    """Usuario virtual: ``on_start`` y tareas elegidas según su peso"""
+
+    def __init__(self, client, catalog, rng=None):
+        self.client = client
+        self.catalog = catalog
+        self.rng = rng or random.Random()
+
+    @classmethod
+    def tasks(cls):
+        return [getattr(cls, name) for name in dir(cls) if hasattr(getattr(cls, name), 'task_weight')]
+
+    def on_start(self):
+        pass
+
+    def run_task(self):
+        tasks = self.tasks()
+        chosen = self.rng.choices(tasks, weights=[t.task_weight for t in tasks])[0]
+        chosen(self)
+
+    # -- Datos al azar ---------------------------------------------------------
+
+    def product_id(self):
+        return self.rng.randint(1, self.catalog.products)
+
+    def category_page(self):
+        category = self.rng.randint(1, self.catalog.categories)
+        pages = max(1, self.catalog.products_per_category() // 12)
+        # Las primeras páginas se visitan mucho más que las últimas
+        page = min(pages, int(self.rng.paretovariate(1.5)))
+        return category, page
+
+    def term(self):
+        return self.rng.choice(self.catalog.search_terms)
+
+
+class Browser(Scenario):
+    """Visitante anónimo que recorre el catálogo"""
+
+    @task(3)
+    def home(self):
+        self.client.get('/', name='/')
+
+    @task(3)
+    def category(self):
+        category, page = self.category_page()
+        self.client.get(f'/category/{category}?page={page}', name='/category/[id]')
+
+    @task(1)
+    def list_products(self):
+        self.client.get('/list-products', name='/list-products')
+
+    @task(3)
+    def detail(self):
+        self.client.get(f'/product/detail/{self.product_id()}', name='/product/detail/[id]')
+
+
+class Searcher(Scenario):
+    """Visitante que escribe en el buscador: sugerencias y resultados"""
+
+    @task(4)
+    def suggestions(self):
+        term = self.term()
+        for length in range(2, min(len(term), 5) + 1):
+            self.client.get(f'/api/search/suggestions?q={term[:length]}', name='/api/search/suggestions')
+
+    @task(4)
+    def search(self):
+        self.client.get(f'/search?q={self.term()}', name='/search')
+
+    @task(1)
+    def search_next_page(self):
+        self.client.get(f'/search?q={self.term()}&page=2', name='/search')
+
+    @task(1)
+    def misspelled_search(self):
+        term = self.term()
+        wrong, right = self.rng.choice(_TYPOS)
+        self.client.get(f'/search?q={term.replace(wrong, right, 1) + "x"}', name='/search (sin resultados)')
+
+
+class Buyer(Scenario):
+    """Cliente con sesión iniciada: carrito, checkout e historial"""
+
+    def on_start(self):
+        number = self.rng.randint(1, self.catalog.customers)
+        page = self.client.get('/auth/login', name='/auth/login').text
+        token = _CSRF.search(page).group(1)
+        response = self.client.post('/auth/login', name='/auth/login', data={
+            'csrf_token': token,
+            'email': self.catalog.customer_email(number),
+            'password': self.catalog.password,
+        })
+        # Con credenciales rechazadas vuelve al formulario de login
+        if '/auth/login' in (response.headers.get('Location') or ''):
+            raise RuntimeError(f'No se pudo iniciar sesión como {self.catalog.customer_email(number)}')
+
+    def cart_lines(self):
+        return _CART_LINE.findall(self.client.get('/cart', name='/cart').text)
+
+    @task(3)
+    def add_to_cart(self):
+        self.client.get(f'/add-to-cart/{self.product_id()}', name='/add-to-cart/[id]', headers={'Referer': '/'})
+
+    @task(2)
+    def view_cart(self):
+        self.cart_lines()
+
+    @task(2)
+    def change_quantity(self):
+        lines = self.cart_lines()
+        if lines:
+            line = self.rng.choice(lines)
+            self.client.get(f'/pluscart?cart_id={line}', name='/pluscart')
+            self.client.get(f'/minuscart?cart_id={line}', name='/minuscart')
+
+    @task(1)
+    def checkout(self):
+        if self.cart_lines():
+            self.client.get('/place-order', name='/place-order')
+
+    @task(1)
+    def orders(self):
+        self.client.get('/orders', name='/orders')
+
+
+SCENARIOS = {'browser': Browser, 'searcher': Searcher, 'buyer': Buyer}
+
+# Mezclas de usuarios: nombre -> peso de cada escenario
+MIXES = {
+    'default': {'browser': 5, 'searcher': 3, 'buyer': 2},
+    'browse': {'browser': 8, 'searcher': 2},
+    'search': {'searcher': 1},
+    'checkout': {'buyer': 1},
+    'sale': {'browser': 3, 'searcher': 2, 'buyer': 5},
+}
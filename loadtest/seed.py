@@ -0,0 +1,134 @@
+"""
+Catálogo, clientes y pedidos sintéticos para las pruebas de carga.
+
+Los datos son deterministas: con los mismos parámetros, los ids, nombres y
+correos son siempre los mismos, así que los escenarios los conocen por
+``catalog.py`` sin consultar la base. Las filas se
+insertan por lotes con ``INSERT`` masivo; 1M de productos tarda unos
+minutos en SQLite.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert
+
+from website import db, init_database
+from website.models import Customer, Order, OrderItem
+from website.modules.category.models import Category
+from website.modules.product.models import Product
+from website.modules.product.spelling import rebuild_search_terms
+
+from .catalog import ADJECTIVES, BRANDS, CATEGORIES, NOUNS
+
+SEED = 2025
+BATCH_SIZE = 5000
+
+
+def _batches(rows, size=BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _product_rows(catalog, rng):
+    base = datetime(2024, 1, 1)
+    for number in range(1, catalog.products + 1):
+        noun, adjective, brand = rng.choice(NOUNS), rng.choice(ADJECTIVES), rng.choice(BRANDS)
+        price = round(rng.uniform(5, 900), 2)
+        stock = rng.randint(0, 500) if rng.random() > 0.05 else 0
+        yield {
+            'product_name': f'{noun.capitalize()} {adjective} {brand} {number}',
+            'description': f'{noun.capitalize()} {adjective} de la marca {brand}, modelo {number}.',
+            'current_price': price,
+            'previous_price': round(price * rng.uniform(1.0, 1.4), 2),
+            'in_stock': stock > 0,
+            'stock_quantity': stock,
+            'flash_sale': rng.random() < 0.05,
+            'product_picture': '/static/images/default.jpg',
+            # Categorías en orden para que los ids de cada una sean consecutivos
+            'category_id': (number - 1) * catalog.categories // catalog.products + 1,
+            'created_at': base + timedelta(minutes=number),
+        }
+
+
+def _customer_rows(catalog, password_hash):
+    for number in range(1, catalog.customers + 1):
+        yield {
+            'username': f'cliente{number}',
+            'email': catalog.customer_email(number),
+            'password_hash': password_hash,
+            'role': 'customer',
+            'is_first_login': False,
+            'address': f'Calle Falsa {number}',
+        }
+
+
+def _order_rows(catalog, orders, rng):
+    base = datetime(2025, 1, 1)
+    for number in range(1, orders + 1):
+        yield {
+            'customer_id': rng.randint(1, catalog.customers),
+            'status': rng.choice(('pending', 'shipped', 'delivered')),
+            'total': 0.0,
+            'created_at': base + timedelta(minutes=number * 7),
+        }
+
+
+def seed(catalog, orders=None, log=print):
+    """
+    Siembra una base vacía (requiere el contexto de la aplicación).
+
+    Args:
+        catalog: ``Catalog`` de ``catalog_for()``.
+        orders: Pedidos históricos; por defecto 5 por cliente.
+        log: Función para informar el avance.
+    """
+    rng = random.Random(SEED)
+    orders = catalog.customers * 5 if orders is None else orders
+    init_database()
+    if db.session.query(Product.id).first() is not None:
+        raise RuntimeError('La base ya tiene productos; usar una base vacía.')
+
+    db.session.execute(insert(Category), [
+        {'name': CATEGORIES[i], 'description': f'Productos de {CATEGORIES[i].lower()}'}
+        for i in range(catalog.categories)
+    ])
+    for done, batch in enumerate(_batches(_product_rows(catalog, rng)), 1):
+        db.session.execute(insert(Product), batch)
+        db.session.commit()
+        log(f'Productos: {min(done * BATCH_SIZE, catalog.products)}/{catalog.products}')
+
+    # Un solo hash para todos: calcularlo por cliente tardaría minutos
+    password_hash = Customer(password=catalog.password).password_hash
+    for batch in _batches(_customer_rows(catalog, password_hash)):
+        db.session.execute(insert(Customer), batch)
+    db.session.commit()
+    log(f'Clientes: {catalog.customers}')
+
+    for batch in _batches(_order_rows(catalog, orders, rng)):
+        db.session.execute(insert(Order), batch)
+    items = ({
+        'order_id': order_id,
+        'product_id': rng.randint(1, catalog.products),
+        'quantity': rng.randint(1, 3),
+        'price': round(rng.uniform(5, 900), 2),
+    } for order_id in range(1, orders + 1) for _ in range(rng.randint(1, 4)))
+    for batch in _batches(items):
+        db.session.execute(insert(OrderItem), batch)
+    db.session.commit()
+    log(f'Pedidos: {orders}')
+
+    # Vocabulario del "Quizás quisiste decir" (el índice FTS lo llenan los triggers)
+    rebuild_search_terms()
+    db.session.commit()
+    return {
+        'products': db.session.query(func.count(Product.id)).scalar(),
+        'customers': db.session.query(func.count(Customer.id)).scalar(),
+        'orders': db.session.query(func.count(Order.id)).scalar(),
+    }
@@ -1,16 +1,46 @@
-from locust import HttpUser, task, between
-
-class MyUser(HttpUser):
-    host = "http://192.168.18.34:5000"  # Aquí defines tu URL base
-    # Tiempo de espera entre tareas (1-2 segundos aleatorios)
-    wait_time = between(1, 2)
-
-    # Tarea: acceder a la página de inicio
-    @task
-    def index(self):
-        self.client.get("/")  # Simula una solicitud GET a la raíz de tu app
-
-    # Tarea: realizar login
-    @task
-    def login(self):
-        self.client.post("/login", data={"email": "admin@example.com", "password": "admin123"})
\ No newline at end of file
+"""
+Carga contra un servidor en marcha con Locust (``pip install locust``).
+
+Usa los escenarios de ``loadtest/scenarios.py`` sobre una base sembrada con
+``python -m loadtest seed``:
+
+    LOAD_PRODUCTS=100000 LOAD_MIX=default locust -f locustfile.py --host http://localhost:5000
+
+``LOAD_PRODUCTS`` y ``LOAD_CUSTOMERS`` deben coincidir con los de la siembra.
+Para medir sin servidor y comparar con la línea base, ``python -m loadtest run``.
+"""
+
+import os
+import random
+
+from locust import HttpUser, between, task
+
+from loadtest.catalog import catalog_for
+from loadtest.scenarios import MIXES, SCENARIOS
+
+CATALOG = catalog_for(int(os.environ.get('LOAD_PRODUCTS', 10000)),
+                      int(os.environ['LOAD_CUSTOMERS']) if os.environ.get('LOAD_CUSTOMERS') else None)
+MIX = MIXES[os.environ.get('LOAD_MIX', 'default')]
+
+
+def _user_class(kind):
+    class ScenarioUser(HttpUser):
+        weight = MIX.get(kind, 0)
+        wait_time = between(1, 3)
+        host = os.environ.get('LOAD_HOST', 'http://localhost:5000')
+
+        def on_start(self):
+            self.scenario = SCENARIOS[kind](self.client, CATALOG, random.Random())
+            self.scenario.on_start()
+
+        @task
+        def run(self):
+            self.scenario.run_task()
+
+    ScenarioUser.__name__ = f'{SCENARIOS[kind].__name__}User'
+    return ScenarioUser
+
+
+# Locust toma las clases de usuario del módulo; las de peso 0 no se lanzan
+for _kind in MIX:
+    globals()[f'{SCENARIOS[_kind].__name__}User'] = _user_class(_kind)
@@ -1,8 +1,11 @@
-from website import create_app
+from website import create_app, create_database
 
 
 app = create_app()
 
 
 if __name__ == '__main__':
+    # En desarrollo se prepara la base al arrancar; en producción usar
+    # "flask db-init" y "flask seed-admin"
+    create_database(app)
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -1,6 +1,11 @@
-from website import create_app
+from website import create_app, create_database
+from website.outbox import start_outbox_worker
 
 app = create_app()
 
 if __name__ == '__main__':
+    # En desarrollo se prepara la base al arrancar; en producción usar
+    # "flask db-init" y "flask seed-admin"
+    create_database(app)
+    start_outbox_worker(app)
     app.run(debug=True) 
\ No newline at end of file
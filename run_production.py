@@ -1,8 +1,10 @@
 from website import create_app
+from website.outbox import start_outbox_worker
 from waitress import serve
 import os
 
 app = create_app()
+start_outbox_worker(app)
 
 port = int(os.environ.get("PORT", 8000))  # Render te da PORT
 serve(app, host="0.0.0.0", port=port, threads=4)
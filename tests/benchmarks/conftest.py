@@ -0,0 +1,31 @@
+"""
+Fixtures de los microbenchmarks (requieren ``pytest-benchmark``).
+
+Los benchmarks corren sobre la base en memoria de ``tests/conftest.py``
+sembrada con ``loadtest.seed``: 2000 productos en 20 categorías, con los
+mismos nombres y datos en cada corrida. Para guardar los resultados y
+compararlos con la corrida anterior::
+
+    python -m pytest tests/benchmarks --benchmark-only --benchmark-autosave
+    python -m pytest tests/benchmarks --benchmark-only --benchmark-compare --benchmark-compare-fail=mean:15%
+
+El historial queda en ``.benchmarks/`` (``pytest-benchmark compare`` lo
+muestra). Con ``--benchmark-disable`` cada benchmark se ejecuta una sola
+vez, como prueba; sin ``pytest-benchmark`` instalado la carpeta se omite.
+"""
+
+import pytest
+
+from loadtest.catalog import catalog_for
+
+pytest.importorskip('pytest_benchmark')
+
+PRODUCTS = 2000
+
+
+@pytest.fixture
+def catalog(app):
+    from loadtest.seed import seed
+    catalog = catalog_for(PRODUCTS)
+    seed(catalog, log=lambda message: None)
+    return catalog
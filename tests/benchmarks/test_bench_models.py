@@ -0,0 +1,58 @@
+import pytest
+from sqlalchemy import insert
+
+from website import db
+from website.models import Cart, Customer
+from website.modules.category.models import Category
+from website.modules.cliente.services import get_cart, get_cart_totals
+from website.modules.product.models import Product
+
+CART_LINES = 20
+
+
+@pytest.fixture
+def full_cart(catalog):
+    db.session.execute(insert(Cart), [
+        {'customer_id': 1, 'product_id': product_id, 'quantity': 2, 'total_price': 0.0}
+        for product_id in range(1, CART_LINES + 1)
+    ])
+    db.session.commit()
+    return 1
+
+
+@pytest.mark.benchmark(group='carrito')
+def test_get_cart(benchmark, full_cart):
+    summary = benchmark(get_cart, full_cart)
+    assert len(summary.lines) == CART_LINES
+
+
+@pytest.mark.benchmark(group='carrito')
+def test_get_cart_totals(benchmark, full_cart):
+    amount, total = benchmark(get_cart_totals, full_cart)
+    assert total > amount > 0
+
+
+@pytest.mark.benchmark(group='serializacion')
+def test_product_to_dict(benchmark, catalog):
+    products = Product.query.limit(100).all()
+    data = benchmark(lambda: [product.to_dict() for product in products])
+    assert len(data) == 100
+
+
+@pytest.mark.benchmark(group='serializacion')
+def test_category_to_dict(benchmark, catalog):
+    categories = Category.query.all()
+    data = benchmark(lambda: [category.to_dict() for category in categories])
+    assert len(data) == catalog.categories
+
+
+@pytest.mark.benchmark(group='contraseñas')
+def test_password_hash(benchmark, app):
+    customer = Customer(username='bench', email='bench@tienda.com')
+
+    def set_password():
+        customer.password = 'Cliente123456'
+
+    # Cada hash tarda decenas de milisegundos: pocas rondas alcanzan
+    benchmark.pedantic(set_password, rounds=5, iterations=1)
+    assert customer.verify_password('Cliente123456')
@@ -0,0 +1,36 @@
+import pytest
+
+from website.modules.product.models import Product
+from website.modules.product.search import related_searches
+from website.modules.product.suggestions import calculate_relevance, get_suggestion_index
+
+
+@pytest.mark.benchmark(group='sugerencias')
+@pytest.mark.parametrize('query', ['au', 'teclado', 'nova', 'auriculsres'])
+def test_suggest(benchmark, catalog, query):
+    index = get_suggestion_index()
+    suggestions = benchmark(index.suggest, query)
+    assert suggestions
+
+
+@pytest.mark.benchmark(group='sugerencias')
+def test_calculate_relevance(benchmark, catalog):
+    # El mismo bucle que recorría /api/search/suggestions antes del índice
+    names = [name for name, in Product.query.with_entities(Product.product_name)]
+
+    def score_all():
+        return [calculate_relevance(name, 'nova') for name in names]
+
+    scores = benchmark(score_all)
+    assert len(scores) == catalog.products
+
+
+@pytest.mark.benchmark(group='busqueda')
+@pytest.mark.parametrize('query, category_ids', [
+    ('teclado', ()),
+    ('teclado compacto nova', ()),
+    ('reloj', (1, 2)),
+])
+def test_related_searches(benchmark, catalog, query, category_ids):
+    related = benchmark(related_searches, query, category_ids)
+    assert 0 < len(related) <= 5
@@ -0,0 +1,24 @@
+import pytest
+from flask import render_template
+
+from website.modules.category.models import Category
+from website.modules.product.models import Product
+
+
+@pytest.mark.benchmark(group='plantillas')
+@pytest.mark.parametrize('cache', ['null', 'lru'], ids=['sin_cache', 'cache_caliente'])
+@pytest.mark.parametrize('n', [12, 48, 200])
+def test_render_home(benchmark, app, catalog, n, cache):
+    # Con 'null' cada ronda renderiza las tarjetas; con 'lru' salen de {% cache %}
+    app.config['FRAGMENT_CACHE'] = cache
+    app.extensions.pop('fragment_cache', None)
+    items = Product.query.order_by(Product.created_at.desc()).limit(n).all()
+    categories = Category.query.all()
+
+    def render():
+        with app.test_request_context('/'):
+            return render_template('home.html', items=items, next_cursor=None, categories=categories,
+                                   cart=[], show_profile_modal=False, form=None)
+
+    html = benchmark(render)
+    assert items[0].product_name in html
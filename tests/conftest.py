@@ -0,0 +1,150 @@
+"""
+Fixtures compartidas para las pruebas que usan el cliente de pruebas de Flask.
+
+Las pruebas con Selenium (test_login_*.py, test_admin_login.py, ...) siguen
+necesitando el servidor en http://localhost:5000; estas fixtures levantan la
+aplicación en memoria y no dependen del navegador.
+
+Por defecto usan SQLite en memoria como sustituto local de la base de
+producción. Para correrlas contra un PostgreSQL local, definir
+``TEST_DATABASE_URL`` (por ejemplo ``postgresql://tienda@localhost/tienda_test``);
+las pruebas marcadas ``sqlite_only`` se omiten en ese caso.
+"""
+
+import os
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from website import create_app, db, init_database
+
+TEST_DATABASE_URL = os.environ.get('TEST_DATABASE_URL', 'sqlite://')
+
+
+def pytest_collection_modifyitems(config, items):
+    if TEST_DATABASE_URL.startswith('sqlite'):
+        return
+    skip = pytest.mark.skip(reason='requiere SQLite')
+    for item in items:
+        if 'sqlite_only' in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def app():
+    """Aplicación configurada con la base de pruebas (SQLite en memoria por defecto)"""
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': TEST_DATABASE_URL,
+        'SECRET_KEY': 'test-key',
+    })
+    with app.app_context():
+        init_database()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def category(app):
+    from website.modules.category.models import Category
+    category = Category(name='Electrónicos', description='Dispositivos')
+    db.session.add(category)
+    db.session.commit()
+    return category
+
+
+@pytest.fixture
+def make_products(app, category):
+    """Crea ``n`` productos en stock con fechas de creación consecutivas"""
+    from website.modules.product.models import Product
+
+    def _make(n, **overrides):
+        base = datetime(2025, 1, 1)
+        products = []
+        for i in range(n):
+            values = dict(
+                product_name=f'Producto {i}',
+                description=f'Descripción del producto {i}',
+                current_price=10.0 + i,
+                stock_quantity=5,
+                in_stock=True,
+                category_id=category.id,
+                created_at=base + timedelta(minutes=i),
+            )
+            values.update(overrides)
+            products.append(Product(**values))
+        db.session.add_all(products)
+        db.session.commit()
+        return products
+
+    return _make
+
+
+@pytest.fixture
+def customer(app):
+    from website.models import Customer
+    customer = Customer(
+        username='cliente',
+        email='cliente@tienda.com',
+        role='customer',
+        is_first_login=False,
+        address='Av. Siempre Viva 742',
+    )
+    customer.password = 'Cliente123456'
+    db.session.add(customer)
+    db.session.commit()
+    return customer
+
+
+@pytest.fixture
+def logged_client(client, customer):
+    """Cliente de pruebas con la sesión del cliente ya iniciada"""
+    with client.session_transaction() as session:
+        session['_user_id'] = str(customer.id)
+        session['_fresh'] = True
+    return client
+
+
+@pytest.fixture
+def count_queries(app):
+    """Context manager que acumula las sentencias SQL ejecutadas en el bloque"""
+
+    @contextmanager
+    def _count():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+    return _count
+
+
+@pytest.fixture
+def query_budget(app):
+    """
+    Context manager que falla si el bloque pasa de ``max_queries`` consultas
+    o repite una misma sentencia más de ``max_repeats`` veces (N+1)
+    """
+    from website.query_stats import QUERY_REPEAT_THRESHOLD, assert_query_budget, record_queries
+
+    @contextmanager
+    def _budget(max_queries=None, max_repeats=QUERY_REPEAT_THRESHOLD):
+        with record_queries() as stats:
+            yield stats
+        assert_query_budget(stats, max_queries, max_repeats)
+
+    return _budget
@@ -0,0 +1,94 @@
+import gzip
+import json
+
+import pytest
+from flask import url_for
+
+from website.assets import BUNDLES, build_assets, bundle_urls, load_manifest
+
+
+@pytest.fixture
+def static_folder(app, tmp_path):
+    (tmp_path / 'css').mkdir()
+    (tmp_path / 'css' / 'style.css').write_text('body { color: red; }\n' * 200)
+    (tmp_path / 'logo.png').write_bytes(b'\x89PNG' + bytes(300))
+    (tmp_path / 'uploads').mkdir()
+    (tmp_path / 'uploads' / 'foto.png').write_bytes(b'\x89PNG')
+    (tmp_path / 'js').mkdir()
+    (tmp_path / 'js' / 'a.js').write_text('// primero\nfunction a() {\n    return 1;\n}\n')
+    (tmp_path / 'js' / 'b.min.js').write_text('var b=2')
+    app.static_folder = str(tmp_path)
+    build_assets(str(tmp_path), bundles={'js/site.bundle.js': ('js/a.js', 'js/b.min.js')})
+    load_manifest(app)
+    return tmp_path
+
+
+def test_build_genera_nombres_con_hash_y_comprimidos(static_folder):
+    manifest = json.loads((static_folder / 'dist' / 'manifest.json').read_text())
+
+    assert sorted(manifest) == ['css/style.css', 'js/a.js', 'js/b.min.js', 'js/site.bundle.js', 'logo.png']
+    hashed = manifest['css/style.css']
+    assert hashed.startswith('dist/css/style.') and hashed.endswith('.css')
+    assert gzip.decompress((static_folder / (hashed + '.gz')).read_bytes()) == (static_folder / 'css' / 'style.css').read_bytes()
+    # Las imágenes no se comprimen; la copia con el nombre original se conserva
+    assert not (static_folder / (manifest['logo.png'] + '.gz')).exists()
+    assert (static_folder / 'dist' / 'css' / 'style.css').exists()
+
+
+def test_url_for_static_usa_el_manifiesto(app, static_folder):
+    with app.test_request_context():
+        assert url_for('static', filename='css/style.css').startswith('/static/dist/css/style.')
+        assert url_for('static', filename='css/otro.css') == '/static/css/otro.css'
+
+
+def test_archivo_con_hash_inmutable_y_precomprimido(app, client, static_folder):
+    with app.test_request_context():
+        url = url_for('static', filename='css/style.css')
+
+    response = client.get(url, headers={'Accept-Encoding': 'gzip, deflate'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Content-Type'].startswith('text/css')
+    assert response.cache_control.immutable and response.cache_control.max_age == 31536000
+    assert 'Accept-Encoding' in response.vary
+    assert gzip.decompress(response.data).startswith(b'body { color: red; }')
+    response.close()
+
+    response = client.get(url)
+    assert 'Content-Encoding' not in response.headers
+    assert response.data.startswith(b'body')
+    response.close()
+
+
+def test_archivo_sin_hash_se_sirve_como_siempre(client, static_folder):
+    response = client.get('/static/css/style.css')
+    assert response.status_code == 200
+    assert not response.cache_control.immutable
+    response.close()
+
+
+def test_sin_manifiesto_no_cambia_nada(app, tmp_path):
+    app.static_folder = str(tmp_path)
+    load_manifest(app)
+    with app.test_request_context():
+        assert url_for('static', filename='css/style.css') == '/static/css/style.css'
+
+
+def test_paquete_concatenado_y_minificado(app, static_folder):
+    manifest = json.loads((static_folder / 'dist' / 'manifest.json').read_text())
+    bundle = (static_folder / manifest['js/site.bundle.js']).read_text()
+
+    assert bundle == 'function a(){return 1;}\n;\nvar b=2\n'
+    with app.test_request_context():
+        assert bundle_urls('js/site.bundle.js') == ['/static/' + manifest['js/site.bundle.js']]
+
+
+def test_sin_manifiesto_los_paquetes_se_cargan_por_partes(app, client):
+    load_manifest(app)
+    app.extensions['asset_manifest'] = {}
+    html = client.get('/').get_data(as_text=True)
+
+    for path in BUNDLES['css/site.bundle.css'] + BUNDLES['js/site.bundle.js']:
+        assert f'/static/{path}' in html
+    # El script y los estilos de base.html ya no van en línea
+    assert '<style>' not in html
+    assert 'function toggleThemeMenu' not in html
@@ -0,0 +1,85 @@
+from website import db
+from website.models import Cart
+from website.modules.cliente.services import SHIPPING_COST, get_cart, get_cart_totals
+
+
+def fill_cart(customer_id, products):
+    lines = [
+        Cart(customer_id=customer_id, product_id=p.id, quantity=2, total_price=p.current_price * 2)
+        for p in products
+    ]
+    db.session.add_all(lines)
+    db.session.commit()
+    db.session.expire_all()
+    return lines
+
+
+def test_get_cart_carga_productos_en_una_consulta(customer, make_products, count_queries):
+    products = make_products(6)
+    customer_id = customer.id
+    fill_cart(customer_id, products)
+
+    with count_queries() as statements:
+        summary = get_cart(customer_id)
+        names = [line.product.product_name for line in summary.lines]
+
+    assert len(statements) == 1
+    assert len(names) == 6
+    assert summary.amount == sum(p.current_price * 2 for p in products)
+    assert summary.total == summary.amount + SHIPPING_COST
+
+
+def test_get_cart_totals_en_sql(customer, make_products):
+    products = make_products(3)
+    fill_cart(customer.id, products)
+
+    amount, total = get_cart_totals(customer.id)
+    assert amount == sum(p.current_price * 2 for p in products)
+    assert total == amount + SHIPPING_COST
+
+
+def test_carrito_vacio(customer):
+    assert get_cart_totals(customer.id) == (0, SHIPPING_COST)
+    assert get_cart(customer.id).lines == []
+
+
+def test_consultas_constantes_al_incrementar(logged_client, customer, make_products, count_queries):
+    """El número de consultas de /pluscart no crece con el tamaño del carrito"""
+    customer_id = customer.id
+    logged_client.get('/cart')    # deja al usuario en la caché de identidad
+    counts = []
+    for size in (2, 6):
+        lines = fill_cart(customer_id, make_products(size))
+        with count_queries() as statements:
+            response = logged_client.get(f'/pluscart?cart_id={lines[0].id}')
+        assert response.status_code == 200
+        counts.append(len(statements))
+
+    assert counts[0] == counts[1]
+
+
+def test_no_se_modifica_el_carrito_de_otro_cliente(logged_client, make_products):
+    from website.models import Customer
+    other = Customer(username='otro', email='otro@tienda.com', role='customer')
+    other.password = 'Otro123456'
+    db.session.add(other)
+    db.session.commit()
+    line = fill_cart(other.id, make_products(1))[0]
+
+    response = logged_client.get(f'/pluscart?cart_id={line.id}')
+    assert response.status_code == 404
+    assert db.session.get(Cart, line.id).quantity == 2
+
+
+def test_pluscart_de_cliente_actualiza_cantidad_y_total_de_la_linea(logged_client, customer, make_products):
+    line = fill_cart(customer.id, make_products(1, stock_quantity=5))[0]
+    price = line.product.current_price
+
+    response = logged_client.get(f'/cliente/pluscart?cart_id={line.id}')
+    assert response.get_json()['quantity'] == 3
+    db.session.expire_all()
+    assert db.session.get(Cart, line.id).total_price == price * 3
+
+    logged_client.get(f'/cliente/minuscart?cart_id={line.id}')
+    db.session.expire_all()
+    assert db.session.get(Cart, line.id).total_price == price * 2
@@ -0,0 +1,117 @@
+import pytest
+
+from website import db
+from website.models import Cart, Order, OrderItem
+from website.modules.cliente import services
+from website.modules.cliente.services import SHIPPING_COST, CheckoutConflict, place_order
+from website.modules.product.models import Product
+
+
+def add_line(customer_id, product, quantity):
+    db.session.add(Cart(
+        customer_id=customer_id,
+        product_id=product.id,
+        quantity=quantity,
+        total_price=product.current_price * quantity
+    ))
+    db.session.commit()
+
+
+def test_checkout_descuenta_stock_y_vacia_carrito(customer, make_products):
+    first, second = make_products(2, stock_quantity=3)
+    add_line(customer.id, first, 2)
+    add_line(customer.id, second, 3)
+
+    order, failures = place_order(customer.id, shipping_address='Lima')
+
+    assert failures == []
+    assert order.total == first.current_price * 2 + second.current_price * 3 + SHIPPING_COST
+    assert OrderItem.query.filter_by(order_id=order.id).count() == 2
+    assert Cart.query.filter_by(customer_id=customer.id).count() == 0
+
+    db.session.expire_all()
+    assert db.session.get(Product, first.id).stock_quantity == 1
+    second = db.session.get(Product, second.id)
+    assert second.stock_quantity == 0
+    assert second.in_stock is False
+
+
+def test_checkout_sin_stock_no_modifica_nada(customer, make_products):
+    first, second = make_products(2, stock_quantity=2)
+    add_line(customer.id, first, 1)
+    add_line(customer.id, second, 5)
+
+    order, failures = place_order(customer.id)
+
+    assert order is None
+    assert failures == [{'product_name': second.product_name, 'requested': 5, 'available': 2}]
+    assert Order.query.count() == 0
+    assert Cart.query.filter_by(customer_id=customer.id).count() == 2
+    db.session.expire_all()
+    assert db.session.get(Product, first.id).stock_quantity == 2
+
+
+def test_checkout_carrito_vacio(customer):
+    assert place_order(customer.id) == (None, [])
+
+
+def test_ruta_place_order(logged_client, customer, make_products):
+    product = make_products(1, stock_quantity=1)[0]
+    add_line(customer.id, product, 1)
+
+    response = logged_client.get('/place-order')
+
+    assert response.status_code == 302
+    assert response.headers['Location'].endswith('/orders')
+    assert Order.query.filter_by(customer_id=customer.id).count() == 1
+
+
+def test_checkout_conserva_lineas_agregadas_durante_el_pedido(customer, make_products, monkeypatch):
+    first, second = make_products(2, stock_quantity=5)
+    add_line(customer.id, first, 1)
+    get_cart = services.get_cart
+
+    def read_then_add(customer_id):
+        summary = get_cart(customer_id)
+        # Otra petición agrega una línea después de leer el carrito
+        add_line(customer_id, second, 2)
+        return summary
+
+    monkeypatch.setattr(services, 'get_cart', read_then_add)
+    order, failures = place_order(customer.id)
+
+    assert failures == [] and OrderItem.query.filter_by(order_id=order.id).count() == 1
+    remaining = Cart.query.filter_by(customer_id=customer.id).one()
+    assert (remaining.product_id, remaining.quantity) == (second.id, 2)
+
+
+def test_checkout_reintenta_si_el_stock_se_repuso(customer, make_products, monkeypatch):
+    product = make_products(1, stock_quantity=0)[0]
+    add_line(customer.id, product, 2)
+    stock_failures = services._stock_failures
+
+    def restock_then_check(requested):
+        # Otra petición repone el stock entre el UPDATE fallido y la relectura
+        db.session.query(Product).filter_by(id=product.id).update({'stock_quantity': 5})
+        db.session.commit()
+        return stock_failures(requested)
+
+    monkeypatch.setattr(services, '_stock_failures', restock_then_check)
+    order, failures = place_order(customer.id)
+
+    assert failures == [] and order is not None
+    assert db.session.get(Product, product.id).stock_quantity == 3
+
+
+def test_checkout_en_conflicto_no_dice_carrito_vacio(logged_client, customer, make_products, monkeypatch):
+    product = make_products(1, stock_quantity=0)[0]
+    add_line(customer.id, product, 1)
+    monkeypatch.setattr(services, '_stock_failures', lambda requested: [])
+
+    with pytest.raises(CheckoutConflict):
+        place_order(customer.id)
+
+    response = logged_client.get('/place-order', follow_redirects=True)
+    page = response.get_data(as_text=True)
+    assert 'Inténtalo de nuevo' in page and 'Tu carrito está vacío' not in page
+    assert Cart.query.filter_by(customer_id=customer.id).count() == 1
@@ -0,0 +1,33 @@
+from sqlalchemy import inspect
+
+from website import create_app, db
+from website.models import Customer
+
+
+def test_create_app_no_toca_la_bd(tmp_path):
+    path = tmp_path / 'tienda.sqlite3'
+    create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}'})
+    assert not path.exists()
+
+
+def test_db_init_y_seed_admin(tmp_path):
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'tienda.sqlite3'}",
+        'SQLITE_CHECKPOINT_INTERVAL': 0,
+    })
+    runner = app.test_cli_runner()
+
+    result = runner.invoke(args=['db-init'])
+    assert result.exit_code == 0
+    assert 'Migración aplicada: 0001_hot_path_indexes' in result.output
+
+    result = runner.invoke(args=['seed-admin'])
+    assert result.exit_code == 0
+    # Ejecutar de nuevo no duplica nada
+    assert runner.invoke(args=['db-init']).exit_code == 0
+    assert runner.invoke(args=['seed-admin']).exit_code == 0
+
+    with app.app_context():
+        assert 'customer' in inspect(db.engine).get_table_names()
+        assert Customer.query.filter_by(role='super_admin').count() == 1
+        db.engine.dispose()
@@ -0,0 +1,54 @@
+import pytest
+from sqlalchemy import create_engine
+
+from website import create_app, db
+from website.database import database_uri, engine_options
+
+
+def test_database_url_desde_el_entorno(monkeypatch, tmp_path):
+    monkeypatch.delenv('DATABASE_URL', raising=False)
+    assert database_uri(str(tmp_path)) == f"sqlite:///{tmp_path / 'database.sqlite3'}"
+
+    monkeypatch.setenv('DATABASE_URL', 'postgres://tienda:clave@db:5432/tienda')
+    assert database_uri(str(tmp_path)) == 'postgresql://tienda:clave@db:5432/tienda'
+
+
+def test_opciones_del_pool_de_postgresql(monkeypatch):
+    monkeypatch.setenv('GUNICORN_THREADS', '8')
+    monkeypatch.setenv('DB_STATEMENT_TIMEOUT_MS', '3000')
+    options = engine_options('postgresql://tienda@db/tienda')
+    assert options['pool_size'] == 8
+    assert options['pool_pre_ping'] is True
+    assert options['pool_recycle'] == 1800
+    assert options['connect_args'] == {'options': '-c statement_timeout=3000'}
+
+    assert engine_options('sqlite:///tienda.sqlite3') == {}
+
+
+def test_engine_de_postgresql_usa_el_pool(monkeypatch):
+    pytest.importorskip('psycopg2')
+    monkeypatch.setenv('GUNICORN_THREADS', '6')
+    uri = 'postgresql://tienda@localhost/tienda'
+    # Crear el engine no abre conexiones
+    engine = create_engine(uri, **engine_options(uri))
+    assert engine.pool.size() == 6
+    assert engine.pool._pre_ping
+
+
+@pytest.mark.sqlite_only
+def test_perfil_sqlite_en_cada_conexion(tmp_path):
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'tienda.sqlite3'}",
+        'SQLITE_PRAGMAS': {'busy_timeout': 7000},
+        'SQLITE_CHECKPOINT_INTERVAL': 0,
+    })
+    with app.app_context():
+        with db.engine.connect() as conn:
+            pragma = lambda name: conn.exec_driver_sql(f'PRAGMA {name}').scalar()
+            assert pragma('journal_mode') == 'wal'
+            assert pragma('synchronous') == 1      # NORMAL
+            assert pragma('temp_store') == 2       # MEMORY
+            assert pragma('busy_timeout') == 7000
+            assert pragma('cache_size') == -64000
+        db.engine.dispose()
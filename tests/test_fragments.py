@@ -0,0 +1,110 @@
+import pytest
+from flask import g
+
+from website import db
+from website.fragments import LRUBackend, MemoryStore, get_fragment_cache
+
+
+@pytest.fixture
+def cache(app):
+    return get_fragment_cache(app)
+
+
+def test_paginas_anonimas_repetidas_salen_de_la_cache(app, client, make_products, cache):
+    # Sin la caché de páginas, que serviría la segunda petición entera
+    app.config['PAGE_CACHE'] = 'null'
+    app.extensions.pop('page_cache', None)
+    make_products(5)
+
+    first = client.get('/').get_data(as_text=True)
+    misses = cache.misses
+    second = client.get('/').get_data(as_text=True)
+
+    assert first == second
+    assert cache.misses == misses
+    assert cache.hits >= 5
+
+
+def test_editar_un_producto_invalida_su_tarjeta(client, make_products, cache):
+    product = make_products(3)[0]
+    assert 'Producto 0' in client.get('/').get_data(as_text=True)
+
+    product.product_name = 'Renombrado'
+    db.session.commit()
+
+    html = client.get('/').get_data(as_text=True)
+    assert 'Renombrado' in html
+    assert 'Producto 0<' not in html
+
+
+def test_editar_una_categoria_invalida_las_tarjetas_que_la_muestran(client, make_products, category):
+    make_products(2)
+    assert 'Categoría: Electrónicos' in client.get('/search?q=producto').get_data(as_text=True)
+
+    category.name = 'Tecnología'
+    db.session.commit()
+
+    html = client.get('/search?q=producto').get_data(as_text=True)
+    assert 'Categoría: Tecnología' in html
+    assert 'Electrónicos' not in html
+
+
+def test_rollback_no_invalida(app, make_products, category, cache):
+    make_products(1)
+    with app.test_request_context():
+        version = cache.category_version(category.id)
+
+    category.name = 'Cambio descartado'
+    db.session.flush()
+    db.session.rollback()
+
+    with app.test_request_context():
+        assert cache.category_version(category.id) == version
+
+
+def test_cada_tipo_de_visitante_tiene_su_fragmento(app, client, customer, make_products):
+    make_products(1)
+    anonymous = client.get('/list-products').get_data(as_text=True)
+    assert 'Inicia sesión para comprar' in anonymous
+
+    with client.session_transaction() as session:
+        session['_user_id'] = str(customer.id)
+        session['_fresh'] = True
+    # El contexto de la prueba comparte g entre peticiones: olvidar al anónimo
+    g.pop('_login_user', None)
+    html = client.get('/list-products').get_data(as_text=True)
+    assert 'Agregar al Carrito' in html
+    assert 'Inicia sesión para comprar' not in html
+
+
+def test_backend_compartido(app, client, make_products, category):
+    store = MemoryStore()
+    app.config.update(FRAGMENT_CACHE='shared', FRAGMENT_CACHE_CLIENT=store)
+    app.extensions.pop('fragment_cache', None)
+    make_products(2)
+
+    client.get('/search?q=producto')
+    assert sum(key.startswith('fragment:search_card:') for key in store._data) == 2
+    version_key = f'fragment:version:category:{category.id}'
+    assert store.get(version_key) is not None
+
+    category.name = 'Otra'
+    db.session.commit()
+
+    # La versión se borra del almacén: vale para todos los procesos que lo usan
+    assert store.get(version_key) is None
+    assert 'Categoría: Otra' in client.get('/search?q=producto').get_data(as_text=True)
+
+
+def test_lru_descarta_los_mas_viejos_y_los_vencidos():
+    backend = LRUBackend(max_size=2, timeout=60)
+    backend.set('a', '1')
+    backend.set('b', '2')
+    backend.get('a')
+    backend.set('c', '3')
+    assert backend.get('b') is None
+    assert backend.get('a') == '1'
+
+    expired = LRUBackend(timeout=0)
+    expired.set('a', '1')
+    assert expired.get('a') is None
@@ -0,0 +1,43 @@
+from website import db
+from website.identity import Principal, get_identity_cache
+from website.models import Customer
+
+
+def test_usuario_en_cache_sin_consultas(logged_client, customer, count_queries):
+    logged_client.get('/api/search/suggestions?q=x')
+    with count_queries() as statements:
+        logged_client.get('/api/search/suggestions?q=x')
+    assert not any('FROM customer' in s for s in statements)
+
+
+def test_principal_liviano_con_fila_completa_bajo_demanda(app, customer, count_queries):
+    customer_id = customer.id
+    db.session.expunge_all()
+    with count_queries() as statements:
+        principal = get_identity_cache().get(customer_id)
+    assert isinstance(principal, Principal)
+    assert principal.username == 'cliente' and not principal.is_admin
+    assert 'bio' not in statements[0] and 'security_questions' not in statements[0]
+
+    assert principal.address == 'Av. Siempre Viva 742'
+    principal.address = 'Calle Nueva 123'
+    db.session.commit()
+    assert db.session.get(Customer, customer_id).address == 'Calle Nueva 123'
+
+
+def test_cambio_de_rol_invalida_la_cache(app, customer):
+    cache = get_identity_cache()
+    assert cache.get(customer.id).role == 'customer'
+
+    customer.role = 'admin'
+    db.session.commit()
+    assert cache.get(customer.id).is_admin
+
+
+def test_rollback_no_invalida(app, customer):
+    cache = get_identity_cache()
+    principal = cache.get(customer.id)
+    customer.role = 'admin'
+    db.session.flush()
+    db.session.rollback()
+    assert cache.get(customer.id) is principal
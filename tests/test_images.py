@@ -0,0 +1,123 @@
+import io
+import os
+
+import pytest
+from PIL import Image
+from werkzeug.datastructures import FileStorage
+
+from website import db
+from website.images import InvalidImageError, dump_meta, process_image, reprocess_image
+
+
+@pytest.fixture
+def upload_folder(app, tmp_path):
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    return tmp_path
+
+
+def jpeg_con_exif(width=1200, height=800):
+    image = Image.new('RGB', (width, height), (200, 30, 30))
+    exif = Image.Exif()
+    exif[0x010F] = 'Camara de prueba'       # Make
+    exif[0x0112] = 6                        # Orientation: rotar 90°
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', exif=exif)
+    buffer.seek(0)
+    return FileStorage(stream=buffer, filename='foto de prueba.jpg')
+
+
+def local_path(folder, url):
+    return os.path.join(folder, *url.split('/')[2:])
+
+
+def test_imagen_sin_metadatos_y_con_orientacion_aplicada(upload_folder):
+    url, meta = process_image(jpeg_con_exif())
+
+    assert url.startswith('/uploads/') and url.endswith('.jpeg')
+    with Image.open(local_path(upload_folder, url)) as image:
+        assert not image.getexif()
+        # La orientación 6 se aplicó: la imagen queda vertical
+        assert image.size == (800, 1200)
+    assert (meta['width'], meta['height']) == (800, 1200)
+
+
+def test_miniaturas_de_ancho_fijo_en_formato_original_y_webp(upload_folder):
+    _, meta = process_image(jpeg_con_exif())
+
+    # Solo las miniaturas más angostas que la imagen
+    assert [v['width'] for v in meta['variants']] == [160, 320, 640]
+    for variant in meta['variants']:
+        assert variant['src'].endswith('.jpeg') and variant['webp'].endswith('.webp')
+        with Image.open(local_path(upload_folder, variant['webp'])) as image:
+            assert image.format == 'WEBP'
+            assert image.size == (variant['width'], variant['height'])
+    assert meta['variants'][1]['height'] == 480
+
+
+def test_imagen_mas_ancha_que_el_maximo_se_reduce(app, upload_folder):
+    app.config['MAX_IMAGE_WIDTH'] = 1000
+    url, meta = process_image(jpeg_con_exif(width=800, height=2000))
+
+    assert (meta['width'], meta['height']) == (1000, 400)
+    with Image.open(local_path(upload_folder, url)) as image:
+        assert image.size == (1000, 400)
+
+
+def test_archivo_que_no_es_imagen_se_rechaza(upload_folder):
+    file = FileStorage(stream=io.BytesIO(b'<?php echo 1; ?>'), filename='foto.jpg')
+    with pytest.raises(InvalidImageError):
+        process_image(file)
+    assert not any(upload_folder.iterdir())
+
+
+def test_bomba_de_descompresion_se_rechaza(upload_folder, monkeypatch):
+    monkeypatch.setattr(Image, 'MAX_IMAGE_PIXELS', 1000)
+    buffer = io.BytesIO()
+    Image.new('RGB', (100, 100)).save(buffer, 'PNG')
+    buffer.seek(0)
+    with pytest.raises(InvalidImageError, match='demasiados píxeles'):
+        process_image(FileStorage(stream=buffer, filename='bomba.png'))
+    assert not any(upload_folder.iterdir())
+
+
+def test_imagen_sobre_el_limite_de_pixeles_de_la_app_se_rechaza(app, upload_folder, monkeypatch):
+    # Entre 1x y 2x el límite de Pillow solo hay DecompressionBombWarning
+    monkeypatch.setattr(Image, 'MAX_IMAGE_PIXELS', 5000)
+    app.config['MAX_IMAGE_PIXELS'] = 5000
+    buffer = io.BytesIO()
+    Image.new('RGB', (100, 70)).save(buffer, 'PNG')
+    buffer.seek(0)
+    with pytest.raises(InvalidImageError, match='demasiados píxeles'):
+        process_image(FileStorage(stream=buffer, filename='grande.png'))
+    assert not any(upload_folder.iterdir())
+
+
+def test_reprocess_image_conserva_el_original(app, upload_folder, tmp_path):
+    app.root_path = str(tmp_path)
+    folder = tmp_path / 'static' / 'uploads' / 'products'
+    folder.mkdir(parents=True)
+    Image.new('RGB', (700, 350)).save(folder / 'vieja.png')
+
+    url, meta = reprocess_image('static/uploads/products/vieja.png')
+
+    assert url.startswith('/uploads/') and url.endswith('.png')
+    assert (meta['width'], meta['height']) == (700, 350)
+    assert [v['width'] for v in meta['variants']] == [160, 320, 640]
+    assert (folder / 'vieja.png').exists()
+    assert reprocess_image('static/uploads/products/no-existe.png') is None
+
+
+def test_home_usa_srcset(client, make_products, upload_folder):
+    url, meta = process_image(jpeg_con_exif())
+    make_products(1, product_picture=url, picture_meta=dump_meta(meta))
+    make_products(1, product_picture='/static/images/default.jpg')
+    db.session.remove()
+
+    html = client.get('/').get_data(as_text=True)
+
+    assert 'type="image/webp"' in html
+    assert f"{meta['variants'][0]['webp']} 160w" in html
+    assert f'{url} 800w' in html
+    assert 'width="800" height="1200"' in html
+    # Imágenes sin metadatos: <img> simple
+    assert '<img src="/static/images/default.jpg"' in html
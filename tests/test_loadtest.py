@@ -0,0 +1,75 @@
+import pytest
+
+from website import create_app, db
+from loadtest.catalog import catalog_for
+from loadtest.runner import compare, run_load
+from loadtest.scenarios import Searcher
+from loadtest.seed import seed
+
+
+@pytest.fixture
+def seeded(tmp_path):
+    """Base SQLite en archivo: los usuarios virtuales corren en threads"""
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "carga.sqlite3"}',
+        'SECRET_KEY': 'test-key',
+    })
+    catalog = catalog_for(120)
+    with app.app_context():
+        counts = seed(catalog, log=lambda message: None)
+        yield app, catalog, counts
+        db.session.remove()
+
+
+def test_siembra_deterministica(seeded):
+    app, catalog, counts = seeded
+    assert counts == {'products': 120, 'customers': 10, 'orders': 50}
+    assert catalog.categories == 2 and catalog.products_per_category() == 60
+
+
+def test_corrida_registra_percentiles_por_ruta(seeded):
+    app, catalog, _ = seeded
+    report = run_load(app, catalog, mix='sale', users=3, iterations=15, warmup=1, seed=1)
+
+    assert report['failures'] == [] and report['errors'] == 0
+    assert report['params']['users'] == 3 and report['throughput_rps'] > 0
+    # Los compradores iniciaron sesión: el carrito y el checkout se midieron
+    assert {'GET /cart', 'GET /add-to-cart/[id]'} <= set(report['routes'])
+    route = report['routes']['GET /cart']
+    assert route['p50_ms'] <= route['p95_ms'] <= route['p99_ms']
+    assert report['requests'] == sum(r['count'] for r in report['routes'].values())
+
+
+def test_compare_detecta_regresiones():
+    def report(p95, throughput=100.0, errors=0):
+        route = {'count': 50, 'errors': errors, 'p50_ms': 10.0, 'p95_ms': p95}
+        return {'routes': {'GET /': route}, 'throughput_rps': throughput}
+
+    baseline = report(20.0)
+    assert compare(report(25.0), baseline) == []
+    # Dentro de la tolerancia relativa pero bajo el piso de ruido: no cuenta
+    assert compare(report(24.0), baseline, tolerance=0.1) == []
+    assert compare(report(40.0), baseline) == ['GET /: p95_ms 40.0 ms (línea base 20.0 ms)']
+    assert compare(report(20.0, throughput=50.0), baseline)
+    assert compare(report(20.0, errors=2), baseline) == ['GET /: 2 respuestas 5xx']
+
+
+def test_error_en_una_tarea_medida_hace_fallar_la_corrida(seeded, monkeypatch):
+    app, catalog, _ = seeded
+
+    run_task = Searcher.run_task
+    calls = []
+
+    def fail_after_warmup(self):
+        # El calentamiento pasa; la primera tarea medida falla como un regex sin match
+        calls.append(1)
+        if len(calls) > 1:
+            raise AttributeError("'NoneType' object has no attribute 'group'")
+        run_task(self)
+
+    monkeypatch.setattr(Searcher, 'run_task', fail_after_warmup)
+    report = run_load(app, catalog, mix='search', users=1, iterations=10, warmup=1, seed=1)
+
+    assert report['failures'] == ["searcher (tarea 1): AttributeError(\"'NoneType' object has no attribute 'group'\")"]
+    assert compare(report, report) == [f'usuario falló: {report["failures"][0]}']
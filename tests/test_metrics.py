@@ -0,0 +1,105 @@
+import os
+import re
+import subprocess
+import sys
+
+from prometheus_client import REGISTRY
+
+from website import db
+from website.models import Cart
+from website.modules.cliente.services import place_order
+
+
+def value(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_latencia_por_blueprint_y_endpoint(client, make_products):
+    make_products(2)
+    before = value('tienda_request_duration_seconds_count',
+                   blueprint='views', endpoint='views.search', method='GET')
+
+    client.get('/search?q=producto')
+    text = client.get('/metrics').get_data(as_text=True)
+
+    assert value('tienda_request_duration_seconds_count',
+                 blueprint='views', endpoint='views.search', method='GET') == before + 1
+    assert 'tienda_request_db_seconds_bucket{blueprint="views",endpoint="views.search"' in text
+    assert 'tienda_template_render_seconds_count{template="search_results.html"}' in text
+    assert 'endpoint="metrics"' not in text
+
+
+def test_aciertos_de_la_cache_de_paginas(client, make_products):
+    make_products(1)
+    hits = value('tienda_cache_requests_total', cache='page', result='hit')
+
+    client.get('/list-products')
+    client.get('/list-products')
+
+    assert value('tienda_cache_requests_total', cache='page', result='hit') == hits + 1
+
+
+def test_cambios_del_carrito_y_pedidos(customer, make_products):
+    product = make_products(1)[0]
+    added = value('tienda_cart_mutations_total', action='add')
+    updated = value('tienda_cart_mutations_total', action='update')
+    removed = value('tienda_cart_mutations_total', action='remove')
+    orders = value('tienda_orders_placed_total')
+
+    item = Cart(customer_id=customer.id, product_id=product.id, quantity=1, total_price=product.current_price)
+    db.session.add(item)
+    db.session.commit()
+    item.quantity = 2
+    db.session.commit()
+    order, failures = place_order(customer.id)
+
+    assert order is not None and not failures
+    assert value('tienda_cart_mutations_total', action='add') == added + 1
+    assert value('tienda_cart_mutations_total', action='update') == updated + 1
+    # Vaciar el carrito al confirmar el pedido no es un cambio del cliente
+    assert value('tienda_cart_mutations_total', action='remove') == removed
+    assert value('tienda_orders_placed_total') == orders + 1
+
+
+def test_inicio_de_sesion_fallido(client, customer):
+    failed = value('tienda_failed_logins_total')
+    page = client.get('/auth/login').get_data(as_text=True)
+    token = re.search(r'name="csrf_token" type="hidden" value="([^"]+)"', page).group(1)
+
+    client.post('/auth/login', data={'csrf_token': token, 'email': customer.email, 'password': 'incorrecta'})
+
+    assert value('tienda_failed_logins_total') == failed + 1
+
+
+def test_token_obligatorio(app, client):
+    app.config['METRICS_TOKEN'] = 'secreto'
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer otro'}).status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer secreto'}).status_code == 200
+
+
+def test_sin_token_no_se_publica_en_produccion(app, client, monkeypatch):
+    monkeypatch.delenv('METRICS_TOKEN', raising=False)
+    app.testing = False
+    assert client.get('/metrics').status_code == 404
+
+
+SCRIPT = '''
+from website import create_app
+from website.metrics import ORDERS_PLACED
+app = create_app({"TESTING": True, "SQLALCHEMY_DATABASE_URI": "sqlite://"})
+ORDERS_PLACED.inc()
+print(app.test_client().get("/metrics").get_data(as_text=True))
+'''
+
+
+def test_metricas_sumadas_entre_procesos(tmp_path):
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path))
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    outputs = [
+        subprocess.run([sys.executable, '-c', SCRIPT], env=env, cwd=root,
+                       capture_output=True, text=True, check=True).stdout
+        for _ in range(2)
+    ]
+    # El segundo proceso ve también el pedido del primero
+    assert 'tienda_orders_placed_total 2.0' in outputs[1]
@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+
+from website import db
+from website.models import Order, OrderItem
+from website.modules.cliente.services import get_order_history
+
+
+def make_orders(customer_id, products, count):
+    base = datetime(2025, 1, 1)
+    for i in range(count):
+        order = Order(customer_id=customer_id, total=100, created_at=base + timedelta(hours=i))
+        db.session.add(order)
+        db.session.flush()
+        for product in products:
+            db.session.add(OrderItem(order_id=order.id, product_id=product.id, quantity=1, price=product.current_price))
+    db.session.commit()
+    db.session.expire_all()
+
+
+def test_historial_paginado_con_consultas_constantes(customer, make_products, count_queries):
+    customer_id = customer.id
+    make_orders(customer_id, make_products(3), 25)
+
+    with count_queries() as statements:
+        page = get_order_history(customer_id, page=1, per_page=10)
+        names = [item.product.product_name for order in page.items for item in order.items]
+
+    assert page.total == 25
+    assert len(page.items) == 10
+    assert len(names) == 30
+    assert len(statements) == 3
+    # El más reciente primero
+    assert page.items[0].created_at > page.items[-1].created_at
+
+
+def test_ruta_orders_muestra_paginacion(logged_client, customer, make_products):
+    make_orders(customer.id, make_products(1), 12)
+
+    response = logged_client.get('/orders?page=2')
+    html = response.get_data(as_text=True)
+
+    assert response.status_code == 200
+    assert html.count('Pedido #') == 2
+    assert 'pagination' in html
+
+
+def test_ruta_cliente_pedidos(logged_client, customer, make_products):
+    make_orders(customer.id, make_products(1), 1)
+
+    response = logged_client.get('/cliente/pedidos')
+    assert response.status_code == 200
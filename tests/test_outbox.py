@@ -0,0 +1,123 @@
+import re
+import smtplib
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from website import db, mail
+from website.models import OutboxMessage
+from website.outbox import claim_batch, deliver_pending, drain, queue_mail, start_outbox_worker
+from website.smtp_debug import DebugSMTPServer
+
+
+@pytest.fixture
+def smtp_server(app):
+    """SMTP local en lugar de smtp.gmail.com; Flask-Mail deja de suprimir envíos"""
+    server = DebugSMTPServer().start()
+    state = app.extensions['mail']
+    state.server, state.port = '127.0.0.1', server.port
+    state.use_tls = state.use_ssl = state.suppress = False
+    yield server
+    server.stop()
+
+
+def queue(n, **kwargs):
+    for i in range(n):
+        queue_mail(f'Correo {i}', recipients=[f'cliente{i}@tienda.com'], body='Hola', **kwargs)
+    db.session.commit()
+
+
+def test_la_peticion_solo_encola(client, customer, smtp_server):
+    page = client.get('/auth/forgot-password').get_data(as_text=True)
+    token = re.search(r'name="csrf_token" type="hidden" value="([^"]+)"', page).group(1)
+
+    response = client.post('/auth/forgot-password', data={'csrf_token': token, 'email': customer.email})
+    assert response.status_code == 302
+    assert smtp_server.connections == 0
+
+    message = OutboxMessage.query.one()
+    assert message.status == 'pending' and message.recipients == customer.email
+
+    assert drain() == 1
+    sender, recipients, email = smtp_server.messages[0]
+    assert recipients == [customer.email]
+    assert email['Subject'] == 'Restablecer Contraseña'
+    assert OutboxMessage.query.one().status == 'sent'
+
+
+def test_lote_por_una_sola_conexion(app, smtp_server):
+    queue(3)
+    assert deliver_pending() == (3, 0)
+    assert smtp_server.connections == 1
+    assert len(smtp_server.messages) == 3
+
+
+def test_reintento_con_espera_y_descarte(app, smtp_server):
+    app.config['MAIL_OUTBOX_MAX_ATTEMPTS'] = 2
+    smtp_server.rejected.add('cliente1@tienda.com')
+    queue(2)
+
+    assert deliver_pending() == (1, 1)
+    failed = OutboxMessage.query.filter_by(recipients='cliente1@tienda.com').one()
+    assert failed.status == 'pending' and failed.attempts == 1
+    assert failed.next_attempt_at > datetime.utcnow() + timedelta(seconds=20)
+    # Todavía no toca reintentar
+    assert deliver_pending() == (0, 0)
+
+    failed.next_attempt_at = datetime.utcnow()
+    db.session.commit()
+    assert deliver_pending() == (0, 1)
+    assert db.session.get(OutboxMessage, failed.id).status == 'failed'
+
+
+def test_servidor_caido_reprograma_el_lote(app, smtp_server):
+    smtp_server.stop()
+    queue(2)
+    assert deliver_pending() == (0, 2)
+    assert {(m.status, m.attempts) for m in OutboxMessage.query} == {('pending', 1)}
+
+
+def test_conexion_caida_a_mitad_de_lote_solo_cuenta_el_correo_en_envio(app, monkeypatch):
+    class Connection:
+        sent = []
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def send(self, message):
+            if self.sent:
+                raise smtplib.SMTPServerDisconnected('conexión cerrada')
+            self.sent.append(message)
+
+    monkeypatch.setattr(mail, 'connect', Connection)
+    queue(4)
+    assert deliver_pending() == (1, 1)
+    attempts = [(m.status, m.attempts) for m in OutboxMessage.query.order_by(OutboxMessage.id)]
+    assert attempts == [('sent', 0), ('pending', 1), ('pending', 0), ('pending', 0)]
+    # Los que no se intentaron se toman en el siguiente lote, sin espera
+    assert len(claim_batch()) == 2
+
+
+def test_el_hilo_entrega_lo_pendiente_al_arrancar(app, smtp_server):
+    queue(2)
+    app.testing = False
+    worker = start_outbox_worker(app)
+    try:
+        deadline = time.monotonic() + 5
+        while len(smtp_server.messages) < 2 and time.monotonic() < deadline:
+            time.sleep(0.02)
+    finally:
+        worker.stop()
+        worker._thread.join(5)
+        app.testing = True
+    assert len(smtp_server.messages) == 2
+
+
+def test_un_correo_no_se_reclama_dos_veces(app):
+    queue(2)
+    assert len(claim_batch()) == 2
+    assert claim_batch() == []
@@ -0,0 +1,110 @@
+import pytest
+from flask import g
+from sqlalchemy import update
+
+from website import db
+from website.modules.product.models import Product
+from website.page_cache import get_page_cache
+
+
+@pytest.fixture
+def cache(app):
+    return get_page_cache(app)
+
+
+def test_segunda_visita_anonima_sale_de_la_cache(client, make_products, cache):
+    make_products(3)
+
+    first = client.get('/')
+    second = client.get('/')
+
+    assert first.headers['X-Page-Cache'] == 'MISS'
+    assert second.headers['X-Page-Cache'] == 'HIT'
+    assert first.get_data() == second.get_data()
+    assert first.headers['ETag'] == second.headers['ETag']
+    assert not first.headers['ETag'].startswith('W/')
+    assert 'no-cache' in second.headers['Cache-Control']
+
+
+def test_if_none_match_responde_304(client, make_products):
+    make_products(2)
+    etag = client.get('/list-products').headers['ETag']
+
+    response = client.get('/list-products', headers={'If-None-Match': etag})
+
+    assert response.status_code == 304
+    assert response.get_data() == b''
+
+
+def test_parametros_normalizados(client, make_products, cache):
+    make_products(2)
+    client.get('/search?q=producto&sort=price_asc')
+
+    # Mismo orden de búsqueda con otro orden de parámetros, vacíos y de campañas
+    response = client.get('/search?sort=price_asc&category=&utm_source=correo&q=producto')
+    assert response.headers['X-Page-Cache'] == 'HIT'
+    assert client.get('/search?q=otro').headers['X-Page-Cache'] == 'MISS'
+
+
+def test_editar_el_catalogo_cambia_la_version(client, make_products, cache):
+    product = make_products(1)[0]
+    etag = client.get(f'/product/detail/{product.id}').headers['ETag']
+
+    product.product_name = 'Renombrado'
+    db.session.commit()
+
+    response = client.get(f'/product/detail/{product.id}', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['X-Page-Cache'] == 'MISS'
+    assert 'Renombrado' in response.get_data(as_text=True)
+
+
+def test_update_directo_del_stock_cambia_la_version(client, make_products, cache):
+    product = make_products(1)[0]
+    version = cache.catalog_version()
+
+    db.session.execute(update(Product).where(Product.id == product.id).values(stock_quantity=0))
+    db.session.commit()
+
+    assert cache.catalog_version() != version
+
+
+def test_rollback_no_cambia_la_version(make_products, cache):
+    product = make_products(1)[0]
+    version = cache.catalog_version()
+
+    product.product_name = 'Descartado'
+    db.session.flush()
+    db.session.rollback()
+
+    assert cache.catalog_version() == version
+
+
+def test_usuarios_con_sesion_no_usan_la_cache(client, customer, make_products, cache):
+    make_products(1)
+    client.get('/')
+
+    with client.session_transaction() as session:
+        session['_user_id'] = str(customer.id)
+        session['_fresh'] = True
+    # El contexto de la prueba comparte g entre peticiones: olvidar al anónimo
+    g.pop('_login_user', None)
+    response = client.get('/')
+
+    assert 'X-Page-Cache' not in response.headers
+    assert 'ETag' not in response.headers
+
+
+def test_paginas_con_mensajes_flash_no_se_guardan(client, make_products, cache):
+    make_products(1)
+    with client.session_transaction() as session:
+        session['_flashes'] = [('info', 'Aviso único')]
+
+    first = client.get('/')
+    assert 'Aviso único' in first.get_data(as_text=True)
+    assert 'X-Page-Cache' not in first.headers
+
+    # El mensaje no quedó guardado para el siguiente visitante
+    second = client.get('/')
+    assert second.headers['X-Page-Cache'] == 'MISS'
+    assert 'Aviso único' not in second.get_data(as_text=True)
@@ -0,0 +1,51 @@
+from website.modules.product.services import decode_cursor, get_product_feed
+
+
+def test_feed_recorre_todo_el_catalogo_sin_repetir(app, make_products):
+    """El feed por cursor devuelve cada producto en stock una sola vez"""
+    products = make_products(7)
+    make_products(2, stock_quantity=0, product_name='Agotado')
+
+    seen = []
+    cursor = None
+    while True:
+        items, cursor = get_product_feed(cursor=cursor, limit=3)
+        seen.extend(item.id for item in items)
+        if cursor is None:
+            break
+
+    expected = [p.id for p in sorted(products, key=lambda p: p.created_at, reverse=True)]
+    assert seen == expected
+
+
+def test_cursor_invalido_se_ignora(app, make_products):
+    make_products(2)
+    assert decode_cursor('no-es-un-cursor') is None
+    items, _ = get_product_feed(cursor='no-es-un-cursor')
+    assert len(items) == 2
+
+
+def test_endpoint_feed_devuelve_html_y_cursor(client, make_products):
+    make_products(5)
+    response = client.get('/api/products/feed?limit=2')
+    data = response.get_json()
+
+    assert response.status_code == 200
+    assert len(data['products']) == 2
+    assert data['html'].count('class="product-card"') == 2
+    assert data['next_cursor']
+
+    response = client.get(f"/api/products/feed?limit=10&cursor={data['next_cursor']}")
+    data = response.get_json()
+    assert len(data['products']) == 3
+    assert data['next_cursor'] is None
+
+
+def test_home_renderiza_solo_la_primera_pagina(client, make_products):
+    make_products(30)
+    response = client.get('/')
+    html = response.get_data(as_text=True)
+
+    assert response.status_code == 200
+    assert html.count('class="product-card"') == 24
+    assert 'productFeedSentinel' in html
@@ -0,0 +1,69 @@
+import pytest
+
+from website import db
+from website.modules.category.models import Category
+from website.modules.product.models import Product
+from website.modules.product.search import build_match_expression, filter_products, fts_enabled
+
+pytestmark = pytest.mark.sqlite_only
+
+def search_ids(text, **kwargs):
+    query, rank = filter_products(Product.query, text, **kwargs)
+    if rank is not None:
+        query = query.order_by(rank)
+    return [p.id for p in query.all()]
+
+
+def test_expresion_match_escapa_sintaxis_fts():
+    assert build_match_expression('Tablet "OR" sam*') == '"tablet"* "or"* "sam"*'
+    assert build_match_expression('!!!') == ''
+
+
+def test_indice_sigue_altas_cambios_y_bajas(app, category):
+    assert fts_enabled()
+    tablet = Product(product_name='Tablet Samsung', description='Pantalla de 10 pulgadas',
+                     current_price=500, category_id=category.id)
+    db.session.add(tablet)
+    db.session.commit()
+    assert search_ids('tab') == [tablet.id]
+
+    tablet.product_name = 'Galaxy Tab'
+    db.session.commit()
+    assert search_ids('samsung') == []
+    assert search_ids('galaxy') == [tablet.id]
+
+    db.session.delete(tablet)
+    db.session.commit()
+    assert search_ids('galaxy') == []
+
+
+def test_busqueda_por_categoria_y_sin_acentos(app, category, make_products):
+    product = make_products(1)[0]
+    assert search_ids('electronicos') == [product.id]
+
+    category.name = 'Tecnología'
+    db.session.commit()
+    assert search_ids('tecnologia') == [product.id]
+    assert search_ids('electronicos') == []
+
+
+def test_relevancia_prioriza_el_nombre(app, category):
+    in_description = Product(product_name='Funda', description='Compatible con teclado',
+                             current_price=20, category_id=category.id)
+    in_name = Product(product_name='Teclado mecánico', description='Switches rojos',
+                      current_price=80, category_id=category.id)
+    db.session.add_all([in_description, in_name])
+    db.session.commit()
+
+    assert search_ids('teclado') == [in_name.id, in_description.id]
+
+
+def test_ruta_search_usa_relevancia(client, category):
+    db.session.add_all([
+        Product(product_name='Cable', description='Para monitor', current_price=5, category_id=category.id),
+        Product(product_name='Monitor 24', description='Full HD', current_price=300, category_id=category.id),
+    ])
+    db.session.commit()
+
+    html = client.get('/search?q=monitor').get_data(as_text=True)
+    assert html.index('Monitor 24') < html.index('Cable')
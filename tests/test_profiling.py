@@ -0,0 +1,81 @@
+import json
+import time
+
+import pytest
+from flask import g
+
+from website import db
+from website.models import Customer
+from website.profiling import init_profiler, list_profiles
+
+
+def lenta():
+    time.sleep(0.05)
+    return 'ok'
+
+
+@pytest.fixture
+def profiler(app, tmp_path):
+    app.config.update(PROFILE_SLOW_REQUESTS=True, PROFILE_THRESHOLD_MS=20, PROFILE_INTERVAL=0.002,
+                      PROFILE_SAMPLE_RATES={'lenta': 1.0}, PROFILE_SAMPLE_RATE=0.0,
+                      PROFILE_FOLDER=str(tmp_path))
+    app.add_url_rule('/lenta', 'lenta', lenta)
+    app.add_url_rule('/rapida', 'rapida', lambda: 'ok')
+    init_profiler(app)
+    return tmp_path
+
+
+def test_peticion_lenta_guarda_perfil_speedscope(client, profiler):
+    client.get('/lenta')
+
+    [profile] = list_profiles()
+    assert profile['endpoint'] == 'lenta' and profile['elapsed_ms'] >= 50
+    data = json.loads((profiler / profile['filename']).read_text())
+    sampled = data['profiles'][0]
+    assert sampled['type'] == 'sampled' and sampled['samples']
+    names = {frame['name'] for frame in data['shared']['frames']}
+    # La pila incluye la vista y el sleep en curso
+    assert 'lenta' in names
+    assert data['name'] == f"GET /lenta ({profile['elapsed_ms']} ms)"
+
+
+def test_formato_collapsed(app, client, profiler):
+    app.config['PROFILE_FORMAT'] = 'collapsed'
+    client.get('/lenta')
+
+    [profile] = list_profiles()
+    lines = (profiler / profile['filename']).read_text().splitlines()
+    assert any(';lenta (test_profiling.py:' in line for line in lines)
+    assert all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+
+
+def test_peticiones_rapidas_y_no_muestreadas_se_descartan(app, client, profiler):
+    app.config['PROFILE_SAMPLE_RATES'] = {'lenta': 1.0, 'rapida': 1.0}
+    client.get('/rapida')
+    app.config['PROFILE_SAMPLE_RATES'] = {'lenta': 0.0}
+    client.get('/lenta')
+
+    assert list_profiles() == []
+    # El thread de muestreo queda sin peticiones que seguir
+    assert app.extensions['profiler']._targets == {}
+
+
+def test_solo_los_administradores_ven_los_perfiles(client, customer, profiler):
+    client.get('/lenta')
+    admin = Customer(username='admin', email='admin@tienda.com', role='admin', is_first_login=False)
+    admin.password = 'Admin123456789'
+    db.session.add(admin)
+    db.session.commit()
+
+    for user, expected in ((customer, 302), (admin, 200)):
+        with client.session_transaction() as session:
+            session['_user_id'] = str(user.id)
+            session['_fresh'] = True
+        # El contexto de la prueba comparte g entre peticiones
+        g.pop('_login_user', None)
+        assert client.get('/admin/profiles').status_code == expected
+
+    filename = list_profiles()[0]['filename']
+    assert client.get(f'/admin/profiles/{filename}').status_code == 200
+    # Solo nombres de perfil: nada fuera de la carpeta
+    assert 'Content-Disposition' not in client.get('/admin/profiles/..%2Fdatabase.sqlite3').headers
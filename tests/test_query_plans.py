@@ -0,0 +1,110 @@
+"""
+Comprueba con EXPLAIN QUERY PLAN que las consultas de las rutas más usadas
+aprovechan los índices declarados en los modelos.
+"""
+
+import re
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event, inspect
+
+from website import db
+from website.migrations import HOT_PATH_INDEXES, upgrade
+from website.models import Cart, Order, OrderItem
+
+pytestmark = pytest.mark.sqlite_only
+
+
+@contextmanager
+def capture_sql():
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            captured.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield captured
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def query_plans(captured, table):
+    """Plan de cada SELECT capturado cuyo FROM principal es ``table``"""
+    plans = []
+    with db.engine.connect() as conn:
+        for statement, parameters in captured:
+            if not re.search(rf'\bFROM "?{table}"?\b', statement):
+                continue
+            rows = conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).all()
+            plans.append(' | '.join(row[-1] for row in rows))
+    return plans
+
+
+def seed(customer, make_products):
+    products = make_products(5)
+    order = Order(customer_id=customer.id, total=10)
+    db.session.add(order)
+    db.session.flush()
+    db.session.add(OrderItem(order_id=order.id, product_id=products[0].id, quantity=1, price=10))
+    db.session.add(Cart(customer_id=customer.id, product_id=products[0].id, quantity=1, total_price=10))
+    db.session.commit()
+    return products
+
+
+def test_modelos_declaran_los_indices(app):
+    names = set()
+    for table in ('cart', 'order', 'order_item', 'product'):
+        names |= {index['name'] for index in inspect(db.engine).get_indexes(table)}
+    assert set(HOT_PATH_INDEXES) <= names
+
+
+def test_migracion_crea_indices_en_bd_existente(app):
+    with db.engine.begin() as conn:
+        for name in HOT_PATH_INDEXES:
+            conn.exec_driver_sql(f'DROP INDEX {name}')
+        conn.exec_driver_sql('DELETE FROM schema_migrations')
+
+    assert upgrade() == ['0001_hot_path_indexes', '0002_product_picture_meta']
+    assert upgrade() == []
+    assert {i['name'] for i in inspect(db.engine).get_indexes('cart')} >= {'ix_cart_customer_product'}
+
+
+def test_feed_usa_indice_parcial(client, make_products):
+    make_products(5)
+    with capture_sql() as captured:
+        client.get('/')
+    plans = query_plans(captured, 'product')
+    assert any('ix_product_in_stock_created' in plan for plan in plans)
+
+
+def test_carrito_usa_indice_de_cliente(logged_client, customer, make_products):
+    seed(customer, make_products)
+    with capture_sql() as captured:
+        logged_client.get('/cart')
+    plans = query_plans(captured, 'cart')
+    assert plans and all('ix_cart_customer_product' in plan for plan in plans)
+
+
+def test_historial_usa_indices_de_pedidos(logged_client, customer, make_products):
+    seed(customer, make_products)
+    with capture_sql() as captured:
+        logged_client.get('/orders')
+    order_plans = query_plans(captured, 'order')
+    item_plans = query_plans(captured, 'order_item')
+    assert order_plans and all('ix_order_customer_created' in plan for plan in order_plans)
+    assert item_plans and all('ix_order_item_order' in plan for plan in item_plans)
+    # El ORDER BY se resuelve con el índice, sin ordenar en memoria
+    assert not any('TEMP B-TREE' in plan for plan in order_plans)
+
+
+def test_categoria_usa_indice_de_categoria(app, category, make_products):
+    from website.modules.product.models import Product
+    make_products(5)
+    # Misma consulta que views.category_products
+    with capture_sql() as captured:
+        Product.query.filter_by(category_id=category.id).paginate(page=1, per_page=12, error_out=False)
+    plans = query_plans(captured, 'product')
+    assert plans and all('ix_product_category' in plan for plan in plans)
@@ -0,0 +1,82 @@
+import json
+import logging
+
+import pytest
+
+from website import create_app, db
+from website.models import Cart
+from website.modules.product.models import Product
+from website.query_stats import assert_query_budget, fingerprint, record_queries
+from test_order_history import make_orders
+
+
+def test_huella_sin_literales_ni_parametros():
+    a = fingerprint("SELECT * FROM product WHERE id = 3 AND name = 'x'")
+    b = fingerprint("SELECT *  FROM product\nWHERE id = ? AND name = 'o''neil'")
+    assert a == b == 'SELECT * FROM product WHERE id = ? AND name = ?'
+    assert fingerprint('SELECT 1 FROM t WHERE id IN (?, ?, ?)') == fingerprint('SELECT 1 FROM t WHERE id IN (?)')
+
+
+def test_detecta_n_mas_1(make_products):
+    make_products(8)
+    ids = [product.id for product in Product.query.all()]
+    db.session.expire_all()
+
+    with record_queries() as stats:
+        for product_id in ids:
+            db.session.get(Product, product_id)
+
+    assert stats.count == 8
+    with pytest.raises(AssertionError, match='N\\+1: 8 veces'):
+        assert_query_budget(stats)
+    with pytest.raises(AssertionError, match='8 consultas \\(máximo 3\\)'):
+        assert_query_budget(stats, max_queries=3, max_repeats=10)
+
+
+def test_server_timing_y_linea_de_log(client, make_products, caplog):
+    make_products(3)
+
+    # Sin configurar logging: el nivel propio del logger "sql" deja pasar la línea
+    response = client.get('/list-products')
+
+    timings = response.headers.getlist('Server-Timing')
+    assert timings[0].startswith('db;dur=') and 'consultas' in timings[0]
+    assert timings[1].startswith('app;dur=')
+    line = json.loads(next(r.getMessage() for r in caplog.records if r.getMessage().startswith('{"event": "sql"')))
+    assert line['endpoint'] == 'views.list_products'
+    assert line['queries'] >= 1
+    assert line['repeated'] == []
+    assert next(r for r in caplog.records if r.name == 'website.sql').levelno == logging.INFO
+
+
+def test_query_log_level_configurable(app):
+    create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'QUERY_LOG_LEVEL': 'warning'})
+    assert logging.getLogger('website.sql').level == logging.WARNING
+
+
+def test_carrito_sin_n_mas_1(logged_client, customer, make_products, query_budget):
+    for product in make_products(10):
+        db.session.add(Cart(customer_id=customer.id, product_id=product.id, quantity=1,
+                            total_price=product.current_price))
+    db.session.commit()
+    db.session.expire_all()
+
+    with query_budget(max_queries=3, max_repeats=1):
+        assert logged_client.get('/cart').status_code == 200
+
+
+def test_pedidos_sin_n_mas_1(logged_client, customer, make_products, query_budget):
+    make_orders(customer.id, make_products(4), 10)
+
+    with query_budget(max_queries=5, max_repeats=1):
+        assert logged_client.get('/orders').status_code == 200
+
+
+def test_busqueda_sin_n_mas_1(app, client, make_products, query_budget):
+    app.config['PAGE_CACHE'] = 'null'
+    app.extensions.pop('page_cache', None)
+    make_products(20)
+    db.session.expire_all()
+
+    with query_budget(max_queries=6, max_repeats=1):
+        assert client.get('/search?q=producto').status_code == 200
@@ -0,0 +1,120 @@
+from website import db
+from website.modules.category.models import Category
+from website.modules.product.models import Product
+from website.modules.product.suggestions import PREFIX_CANDIDATES, SuggestionIndex, get_suggestion_index
+
+
+def add_product(category, name):
+    product = Product(product_name=name, current_price=10, category_id=category.id)
+    db.session.add(product)
+    db.session.commit()
+    return product
+
+
+def test_sugerencias_por_prefijo_e_infijo(app, category):
+    add_product(category, 'Tablet Samsung Galaxy')
+    add_product(category, 'Funda para tablet')
+    index = get_suggestion_index()
+
+    suggestions = index.suggest('tab')
+    assert suggestions[0] == 'Tablet Samsung Galaxy'
+    assert 'Funda para tablet' in suggestions
+    assert 'tablet' in [s.lower() for s in suggestions]
+
+    assert 'Tablet Samsung Galaxy' in index.suggest('amsu')
+
+
+def test_categorias_tienen_bonus(app, category):
+    add_product(category, 'Electrolux')
+    suggestions = get_suggestion_index().suggest('elec')
+    assert suggestions[0] == 'Electrónicos'
+
+
+def test_busqueda_difusa(app, category):
+    add_product(category, 'Teclado inalámbrico')
+    assert 'teclado' in get_suggestion_index().suggest('tecaldo')
+
+
+def test_indice_se_actualiza_al_confirmar(app, category):
+    index = get_suggestion_index()
+    product = add_product(category, 'Monitor curvo')
+    assert 'Monitor curvo' in index.suggest('moni')
+
+    product.product_name = 'Pantalla curva'
+    db.session.commit()
+    assert index.suggest('moni') == []
+    assert 'Pantalla curva' in index.suggest('pant')
+
+    db.session.delete(product)
+    db.session.commit()
+    assert index.suggest('pant') == []
+
+    category.name = 'Computadoras'
+    db.session.commit()
+    assert index.suggest('comp') == ['Computadoras']
+
+
+def test_rollback_no_modifica_el_indice(app, category):
+    index = get_suggestion_index()
+    db.session.add(Product(product_name='Impresora', current_price=10, category_id=category.id))
+    db.session.flush()
+    db.session.rollback()
+    assert index.suggest('impr') == []
+
+
+def test_eliminar_termino_compartido(app):
+    index = SuggestionIndex()
+    index.update_product(1, 'Mouse gamer')
+    index.update_product(2, 'Mouse pad')
+    index.update_product(1, None)
+    assert index.suggest('mous') == ['Mouse pad', 'Mouse']
+    index.update_product(2, None)
+    assert index.suggest('mous') == []
+    assert index._trie == {}
+    assert index._trigrams == {}
+
+
+def test_endpoint_no_consulta_la_bd(client, category, count_queries):
+    add_product(category, 'Audífonos bluetooth')
+    client.get('/api/search/suggestions?q=aud')
+
+    with count_queries() as statements:
+        response = client.get('/api/search/suggestions?q=blue')
+
+    assert response.get_json() == {'suggestions': ['bluetooth', 'Audífonos bluetooth']}
+    assert statements == []
+
+
+def test_prefijo_con_muchos_terminos_conserva_los_mejores(app):
+    index = SuggestionIndex()
+    # Más términos que PREFIX_CANDIDATES; los mejores quedan en el fondo del trie
+    for i in range(PREFIX_CANDIDATES * 2):
+        index.update_product(i, f'au{i:03d}')
+    index.update_product(998, 'Audio')
+    index.update_category(1, 'Audio')
+    index.update_product(999, 'Auriculares inalámbricos')
+
+    assert index.suggest('au')[:2] == ['Audio', 'Auriculares inalámbricos']
+
+    # Al dejar de ser categoría el término baja; al borrarlo se recupera el siguiente
+    index.update_category(1, None)
+    assert index.suggest('au')[0] == 'Auriculares inalámbricos'
+    index.update_product(998, None)
+    index.update_product(999, None)
+    expected = sorted((f'au{i:03d}' for i in range(PREFIX_CANDIDATES * 2)))
+    assert index._prefix_terms('au') == expected[:PREFIX_CANDIDATES]
+
+
+def test_reconstruccion_por_ttl_en_segundo_plano(app, category, count_queries):
+    add_product(category, 'Monitor curvo')
+    index = get_suggestion_index()
+    index.built_at -= app.config.get('SUGGESTIONS_INDEX_TTL', 300) + 1
+    built_at = index.built_at
+
+    with count_queries() as statements:
+        assert get_suggestion_index() is index
+    assert statements == []
+
+    index._rebuilding.join()
+    assert index.built_at > built_at
+    assert 'Monitor curvo' in index.suggest('moni')
@@ -0,0 +1,68 @@
+from website import db
+from website.modules.product.models import Product, SearchTerm
+from website.modules.product.spelling import SpellingIndex, did_you_mean, edit_distance, get_spelling_index
+
+
+def vocabulary():
+    return {row.term: row.doc_freq for row in SearchTerm.query.all()}
+
+
+def test_distancia_de_edicion():
+    assert edit_distance('teclado', 'teclado') == 0
+    assert edit_distance('tecaldo', 'teclado') == 1
+    assert edit_distance('tclado', 'teclado') == 1
+    assert edit_distance('abc', 'xyzabc') == 3
+
+
+def test_vocabulario_persistido_con_frecuencias(app, category):
+    first = Product(product_name='Mouse inalámbrico', current_price=10, category_id=category.id)
+    second = Product(product_name='Mouse gamer', current_price=10, category_id=category.id)
+    db.session.add_all([first, second])
+    db.session.commit()
+    assert vocabulary() == {'mouse': 2, 'inalámbrico': 1, 'gamer': 1}
+
+    first.product_name = 'Teclado inalámbrico'
+    db.session.commit()
+    assert vocabulary() == {'mouse': 1, 'teclado': 1, 'inalámbrico': 1, 'gamer': 1}
+
+    db.session.delete(second)
+    db.session.commit()
+    assert vocabulary() == {'teclado': 1, 'inalámbrico': 1}
+
+
+def test_correccion_prefiere_distancia_y_frecuencia():
+    index = SpellingIndex()
+    index.apply({'laptop': 5, 'lapto': 1, 'tablet': 3})
+    assert index.correct('laptpo') == 'laptop'
+    assert index.correct('tablte') == 'tablet'
+    assert index.correct('zzzzzz') is None
+
+    index.apply({'tablet': -3})
+    assert index.correct('tablte') is None
+
+
+def test_palabras_largas_no_generan_borrados(monkeypatch):
+    index = SpellingIndex()
+    index.apply({'laptop': 5})
+    generated = []
+    monkeypatch.setattr('website.modules.product.spelling.deletes',
+                        lambda word, *args: generated.append(word) or {word})
+    # Una palabra de miles de letras no puede estar a distancia 2 de 'laptop'
+    assert index.correct('a' * 5000) is None
+    assert index.correct('laptopxxx') is None
+    assert generated == []
+
+
+def test_did_you_mean_se_actualiza_al_confirmar(app, category):
+    get_spelling_index()
+    db.session.add(Product(product_name='Audífonos bluetooth', current_price=10, category_id=category.id))
+    db.session.commit()
+    assert did_you_mean('bluetoth audifonos') == 'bluetooth audífonos'
+
+
+def test_ruta_search_sugiere_correccion(client, category):
+    db.session.add(Product(product_name='Licuadora Oster', current_price=10, category_id=category.id))
+    db.session.commit()
+
+    html = client.get('/search?q=licuadroa').get_data(as_text=True)
+    assert 'licuadora' in html
@@ -0,0 +1,103 @@
+import re
+import sys
+
+from flask import render_template_string
+
+from website import db
+from website.models import AdminRecovery, Customer, OutboxMessage
+from website.recovery import RECOVERY_MAX_ATTEMPTS
+
+
+def test_pagina_de_evaluacion_se_carga_en_la_primera_peticion(logged_client, customer):
+    customer.role = 'admin'
+    db.session.commit()
+    sys.modules.pop('website.evaluation', None)
+
+    response = logged_client.get('/evaluation/module-quality')
+    assert response.status_code == 200
+    assert 'website.evaluation' in sys.modules
+
+
+def test_evaluacion_solo_para_administradores(logged_client):
+    response = logged_client.get('/evaluation/usage-quality')
+    assert response.status_code == 302
+
+
+def test_csrf_token_disponible_en_plantillas(app):
+    with app.test_request_context():
+        assert render_template_string('{{ csrf_token() }}')
+
+
+def test_tiempos_de_arranque_por_blueprint(app):
+    names = [name for name, _ in app.extensions['startup_timings']]
+    assert 'blueprint views' in names and 'vistas diferidas' in names
+
+
+def csrf(client, path):
+    page = client.get(path).get_data(as_text=True)
+    return re.search(r'name="csrf_token" type="hidden" value="([^"]+)"', page).group(1)
+
+
+def test_recuperacion_de_admin_diferida_y_con_codigo_por_correo(client, customer):
+    customer.role = 'admin'
+    db.session.commit()
+    sys.modules.pop('website.recovery', None)
+
+    response = client.post('/auth/admin/recovery', data={
+        'csrf_token': csrf(client, '/auth/admin/recovery'), 'email': customer.email})
+    assert response.headers['Location'].endswith('/auth/admin/verify-code')
+    assert 'website.recovery' in sys.modules
+
+    # El código viaja por correo; la cookie de sesión no lo lleva
+    message = OutboxMessage.query.one()
+    code = re.search(r'código de recuperación es: (\w+)', message.body).group(1)
+    with client.session_transaction() as session:
+        assert code not in str(dict(session))
+        assert set(session) <= {'recovery_email', '_flashes', 'csrf_token'}
+
+    # Sin verificar el código no se puede cambiar la contraseña
+    assert client.get('/auth/admin/reset-password').headers['Location'].endswith('/auth/admin/recovery')
+    token = csrf(client, '/auth/admin/verify-code')
+    client.post('/auth/admin/verify-code', data={'csrf_token': token, 'code': 'INCORREC'})
+    response = client.post('/auth/admin/verify-code', data={'csrf_token': token, 'code': code})
+    assert response.headers['Location'].endswith('/auth/admin/reset-password')
+
+    client.post('/auth/admin/reset-password', data={
+        'csrf_token': token, 'new_password': 'NuevaClave123', 'confirm_password': 'NuevaClave123'})
+    assert db.session.get(Customer, customer.id).verify_password('NuevaClave123')
+
+
+def test_recuperacion_no_revela_ni_envia_para_clientes(client, customer):
+    response = client.post('/auth/admin/recovery', data={
+        'csrf_token': csrf(client, '/auth/admin/recovery'), 'email': customer.email}, follow_redirects=True)
+    assert 'Si el correo pertenece a un administrador' in response.get_data(as_text=True)
+    assert OutboxMessage.query.count() == 0
+
+
+def test_recuperacion_rechaza_post_sin_token_csrf(client, customer):
+    customer.role = 'admin'
+    db.session.commit()
+
+    response = client.post('/auth/admin/recovery', data={'email': customer.email})
+    assert response.status_code == 400
+    assert OutboxMessage.query.count() == 0
+
+
+def test_recuperacion_no_reinicia_intentos_al_reenviar_la_cookie(client, customer):
+    customer.role = 'admin'
+    db.session.commit()
+    client.post('/auth/admin/recovery', data={
+        'csrf_token': csrf(client, '/auth/admin/recovery'), 'email': customer.email})
+    code = re.search(r'código de recuperación es: (\w+)', OutboxMessage.query.one().body).group(1)
+    token = csrf(client, '/auth/admin/verify-code')
+    # Cookie de antes del primer fallo, reenviada en cada intento
+    saved = client.get_cookie('session').value
+
+    for _ in range(RECOVERY_MAX_ATTEMPTS + 3):
+        client.set_cookie('session', saved)
+        client.post('/auth/admin/verify-code', data={'csrf_token': token, 'code': 'INCORREC'})
+
+    client.set_cookie('session', saved)
+    response = client.post('/auth/admin/verify-code', data={'csrf_token': token, 'code': code})
+    assert not response.headers['Location'].endswith('/auth/admin/reset-password')
+    assert AdminRecovery.query.count() == 0
@@ -0,0 +1,81 @@
+import io
+import os
+
+import pytest
+from PIL import Image
+from werkzeug.datastructures import FileStorage
+
+from website.images import process_image
+from website.storage import local_path, save_upload
+
+
+@pytest.fixture
+def upload_folder(app, tmp_path):
+    app.config['UPLOAD_FOLDER'] = str(tmp_path / 'uploads')
+    return tmp_path / 'uploads'
+
+
+def archivos(folder):
+    return sorted(p for p in folder.rglob('*') if p.is_file())
+
+
+def test_mismos_bytes_misma_url_y_un_solo_archivo(upload_folder):
+    first = save_upload(b'contenido', 'png')
+    second = save_upload(io.BytesIO(b'contenido'), 'PNG')
+
+    assert first == second
+    digest = first.rsplit('/', 1)[1].split('.')[0]
+    assert first == f'/uploads/{digest[:2]}/{digest[2:4]}/{digest}.png'
+    assert len(digest) == 64
+    assert archivos(upload_folder) == [upload_folder / digest[:2] / digest[2:4] / f'{digest}.png']
+
+
+def test_mismo_nombre_distinto_contenido_no_se_pisa(upload_folder):
+    first = save_upload(FileStorage(io.BytesIO(b'uno'), filename='tablet.jpeg'), 'jpeg')
+    second = save_upload(FileStorage(io.BytesIO(b'dos'), filename='tablet.jpeg'), 'jpeg')
+
+    assert first != second
+    assert open(local_path(first), 'rb').read() == b'uno'
+    assert open(local_path(second), 'rb').read() == b'dos'
+
+
+def test_extension_invalida(upload_folder):
+    with pytest.raises(ValueError):
+        save_upload(b'x', '../py')
+
+
+def test_la_misma_imagen_subida_dos_veces_se_deduplica(upload_folder):
+    buffer = io.BytesIO()
+    Image.new('RGB', (400, 300), (0, 120, 200)).save(buffer, 'PNG')
+
+    urls = set()
+    for name in ('tablet.png', 'otra.png'):
+        url, meta = process_image(FileStorage(io.BytesIO(buffer.getvalue()), filename=name))
+        urls.add((url, meta['variants'][0]['webp']))
+
+    assert len(urls) == 1
+    # Original + miniaturas de 160 y 320 px en PNG y WebP
+    assert len(archivos(upload_folder)) == 5
+
+
+def test_local_path_de_rutas_anteriores(app):
+    assert local_path('static/uploads/products/x.png') == os.path.join(app.root_path, 'static', 'uploads', 'products', 'x.png')
+    assert local_path('./media/x.png') == os.path.join(os.path.dirname(app.root_path), 'media', 'x.png')
+    assert local_path('/static/../../etc/passwd') is None
+    assert local_path('/uploads/aa/bb/x.png') is None
+    assert local_path('https://ejemplo.com/x.png') is None
+
+
+def test_uploads_se_sirven_como_inmutables(client, upload_folder):
+    url = save_upload(b'\x89PNG datos', 'png')
+
+    response = client.get(url)
+
+    assert response.status_code == 200
+    assert response.data == b'\x89PNG datos'
+    assert response.cache_control.immutable
+    assert response.cache_control.max_age == 31536000
+    response.close()
+    # Solo nombres con forma de hash
+    (upload_folder / 'secreto.txt').write_text('x')
+    assert client.get('/uploads/secreto.txt').data != b'x'
@@ -55,26 +55,59 @@ def create_super_admin():
         print('='*50)
 
 
+def init_database():
+    """
+    Crea las tablas que faltan, aplica las migraciones pendientes y prepara
+    los índices de búsqueda. Requiere el contexto de la aplicación.
+
+    Returns:
+        Lista con los identificadores de las migraciones aplicadas.
+    """
+    # Solo crear las tablas si no existen
+    db.create_all()
+
+    # Aplicar migraciones pendientes (índices en tablas existentes, etc.)
+    from .migrations import upgrade
+    applied = upgrade()
+
+    # Índice de búsqueda de texto completo (FTS5 en SQLite)
+    from .modules.product.search import ensure_search_index
+    ensure_search_index(db.engine)
+
+    # Vocabulario para el "Quizás quisiste decir"
+    from .modules.product.spelling import ensure_search_terms
+    ensure_search_terms()
+    return applied
+
+
 def create_database(app):
+    """Esquema y super admin en un solo paso (equivale a db-init + seed-admin)"""
     with app.app_context():
-        # Solo crear las tablas si no existen
-        db.create_all()
-        
-        # Verificar si ya existe un super admin
-        from .models import Customer
-        super_admin = Customer.query.filter_by(role='super_admin').first()
-        if not super_admin:
-            create_super_admin()
+        for version in init_database():
+            print(f'Migración aplicada: {version}')
+        create_super_admin()
     print('Database initialized!')
 
 
-def create_app():
+def create_app(config=None):
+    """
+    Crea la aplicación Flask.
+
+    Args:
+        config: Diccionario opcional con valores que reemplazan la configuración
+            por defecto (por ejemplo, para las pruebas).
+    """
     app = Flask(__name__, instance_relative_config=True)
     # Usar una clave secreta fija para desarrollo
     app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-key-123')
-    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(app.instance_path, DB_NAME)}"
+    from .database import database_uri, engine_options, init_engine
+    from .storage import init_storage
+    from .assets import init_assets
+    from .query_stats import init_query_stats
+    from .profiling import init_profiler
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_uri(app.instance_path)
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-    app.config['UPLOAD_FOLDER'] = 'website/static/uploads'
+    app.config['UPLOAD_FOLDER'] = os.path.join(app.root_path, 'static', 'uploads')
     app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 
     # Configuración para servir archivos estáticos desde media
@@ -83,25 +116,39 @@ def create_app():
         return send_from_directory('../media', filename)
 
     # Configuración de Flask-Mail
-    app.config['MAIL_SERVER'] = 'smtp.gmail.com'
-    app.config['MAIL_PORT'] = 587
-    app.config['MAIL_USE_TLS'] = True
+    # (MAIL_SERVER=localhost MAIL_PORT=1025 MAIL_USE_TLS=0 con "flask smtp-debug")
+    app.config['MAIL_SERVER'] = os.environ.get('MAIL_SERVER', 'smtp.gmail.com')
+    app.config['MAIL_PORT'] = int(os.environ.get('MAIL_PORT', 587))
+    app.config['MAIL_USE_TLS'] = os.environ.get('MAIL_USE_TLS', '1') not in ('0', 'false', 'False')
     app.config['MAIL_USERNAME'] = os.environ.get('MAIL_USERNAME')
     app.config['MAIL_PASSWORD'] = os.environ.get('MAIL_PASSWORD')
     app.config['MAIL_DEFAULT_SENDER'] = os.environ.get('MAIL_DEFAULT_SENDER', 'noreply@tutienda.com')
 
+    if config:
+        app.config.update(config)
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS',
+                          engine_options(app.config['SQLALCHEMY_DATABASE_URI']))
+
     # Crear la carpeta instance si no existe
     try:
         os.makedirs(app.instance_path, exist_ok=True)
     except OSError:
         pass
 
+    from .startup import timed
+
     # Inicializar extensiones
-    db.init_app(app)
-    # Inicializar CSRF después de crear la aplicación
-    csrf = CSRFProtect()
-    csrf.init_app(app)
-    mail.init_app(app)
+    with timed(app, 'extensiones'):
+        db.init_app(app)
+        with app.app_context():
+            init_engine(app)
+        init_query_stats(app)
+        init_profiler(app)
+        # CSRFProtect también publica csrf_token() en las plantillas
+        csrf.init_app(app)
+        mail.init_app(app)
+        init_storage(app)
+        init_assets(app)
     
     # Configurar CSRF para ignorar rutas específicas
     app.config['WTF_CSRF_CHECK_DEFAULT'] = False
@@ -109,7 +156,7 @@ def create_app():
 
     @app.errorhandler(404)
     def page_not_found(error):
-        return render_template('404.html')
+        return render_template('404.html'), 404
 
     @app.errorhandler(500)
     def internal_server_error(error):
@@ -119,52 +166,59 @@ def create_app():
     login_manager.login_view = 'auth.login'  # Esta ruta ahora será /auth/login
     login_manager.init_app(app)
 
-    from .models import Customer, Cart, Order, OrderItem
-    from .modules.product.models import Product
-    from .modules.category.models import Category
+    with timed(app, 'modelos'):
+        from .models import Customer, Cart, Order, OrderItem
+        from .modules.product.models import Product
+        from .modules.category.models import Category
+        from .identity import get_identity_cache
+        from .fragments import init_fragment_cache
+        init_fragment_cache(app)
+        from .metrics import init_metrics
+        init_metrics(app)
 
     @login_manager.user_loader
     def load_user(id):
-        return Customer.query.get(int(id))
+        # Principal liviano en caché; la fila completa se carga solo si se necesita
+        return get_identity_cache().get(int(id))
+
+    # Importar rutas después de crear la aplicación para evitar importaciones circulares.
+    # Cada bloque mide la importación del módulo y el registro del blueprint.
+    with timed(app, 'blueprint views'):
+        from .views import views
+        app.register_blueprint(views, url_prefix='/')
+
+    with timed(app, 'blueprint auth'):
+        from .modules.auth import create_module as create_auth_module
+        auth_bp = create_auth_module(app)
+        app.register_blueprint(auth_bp, url_prefix='/auth')
+
+    with timed(app, 'blueprint admin'):
+        from .modules.admin import init_module as init_admin_module
+        admin_bp = init_admin_module(app)
+
+    # El blueprint antiguo de website/admin.py quedó reemplazado por
+    # modules/admin y ya no se importa al arrancar
+
+    with timed(app, 'blueprint product'):
+        from .modules.product import create_module as create_product_module
+        product_bp = create_product_module()
+        app.register_blueprint(product_bp, url_prefix='/product')
+
+    with timed(app, 'blueprint category'):
+        from .modules.category import create_module as create_category_module
+        category_bp = create_category_module()
+        app.register_blueprint(category_bp, url_prefix='/category')
+
+    with timed(app, 'blueprint cliente'):
+        from .modules.cliente import init_app as init_cliente
+        cliente_bp = init_cliente(app)
+        app.register_blueprint(cliente_bp, url_prefix='/cliente')
+
+    # Páginas poco usadas: se importan en su primera petición
+    with timed(app, 'vistas diferidas'):
+        from .lazy import register_lazy_routes
+        register_lazy_routes(app)
 
-    # Importar rutas después de crear la aplicación para evitar importaciones circulares
-    from .views import views
-    from .admin import admin
-    
-    # Importar y registrar módulos
-    from .modules.auth import create_module as create_auth_module
-    from .modules.product import create_module as create_product_module
-    from .modules.category import create_module as create_category_module
-    from .modules.cliente import cliente_bp
-    from .modules.admin import init_module as init_admin_module
-    
-    # Registrar blueprints con prefijos específicos para evitar conflictos
-    app.register_blueprint(views, url_prefix='/')
-    
-    # Registrar módulo de autenticación
-    auth_bp = create_auth_module(app)
-    app.register_blueprint(auth_bp, url_prefix='/auth')
-    
-    # Registrar módulo de administración
-    admin_bp = init_admin_module(app)
-    
-    # Si necesitas mantener la ruta de administración antigua, usa un nombre diferente
-    # from .admin import admin as old_admin
-    # app.register_blueprint(old_admin, name='old_admin', url_prefix='/admin_old')
-    
-    # Registrar módulo de productos
-    product_bp = create_product_module()
-    app.register_blueprint(product_bp, url_prefix='/product')
-    
-    # Registrar módulo de categorías
-    category_bp = create_category_module()
-    app.register_blueprint(category_bp, url_prefix='/category')
-    
-    # Registrar módulo de cliente
-    from .modules.cliente import init_app as init_cliente
-    cliente_bp = init_cliente(app)
-    app.register_blueprint(cliente_bp, url_prefix='/cliente')
-    
     # Importar modelos después de inicializar la aplicación
     from .modules.cliente.models import DireccionEnvio, ListaDeseos, ProductoListaDeseos
     
@@ -175,13 +229,10 @@ def create_app():
         'ProductoListaDeseos': ProductoListaDeseos
     })
     
-    create_database(app)
-    
-    # Asegurar que el token CSRF esté disponible en todas las plantillas
-    @app.context_processor
-    def inject_csrf_token():
-        from flask_wtf.csrf import generate_csrf
-        return dict(csrf_token=generate_csrf)
+    # El esquema y el super admin se crean con "flask db-init" y
+    # "flask seed-admin"; arrancar un worker no toca la base de datos
+    from .commands import register_commands
+    register_commands(app)
 
     return app
 
@@ -3,7 +3,7 @@ from datetime import datetime
 from flask import Blueprint, render_template, flash, send_from_directory, redirect, request, url_for
 from flask_login import login_required, current_user, login_required
 from .forms import ShopItemsForm, OrderForm, CreateAdminForm
-from werkzeug.utils import secure_filename
+from .images import dump_meta, process_image
 from .models import Order, Customer
 from .modules.product.models import Product
 from . import db
@@ -36,11 +36,9 @@ def add_shop_items():
         flash_sale = form.flash_sale.data
 
         file = form.product_picture.data
-        file_name = secure_filename(file.filename)
-        file_path = f'./media/{file_name}'
         
         try:
-            file.save(file_path)
+            product_picture, meta = process_image(file)
 
             new_shop_item = Product(
                 product_name=product_name,
@@ -48,7 +46,8 @@ def add_shop_items():
                 previous_price=previous_price,
                 in_stock=in_stock,
                 flash_sale=flash_sale,
-                product_picture=file_path,
+                product_picture=product_picture,
+                picture_meta=dump_meta(meta),
                 created_by=current_user.id
             )
 
@@ -220,10 +219,8 @@ def update_item(item_id):
             # Manejar la carga de la nueva imagen si se proporciona
             if form.product_picture.data:
                 file = form.product_picture.data
-                file_name = secure_filename(file.filename)
-                file_path = f'./media/{file_name}'
-                file.save(file_path)
-                item_to_update.product_picture = file_path
+                item_to_update.product_picture, meta = process_image(file)
+                item_to_update.picture_meta = dump_meta(meta)
             
             item_to_update.updated_at = datetime.utcnow()
             
@@ -0,0 +1,206 @@
+"""
+Archivos estáticos con huella de contenido y precomprimidos.
+
+``flask assets-build`` copia ``website/static`` (menos ``uploads/``) a
+``static/dist/`` y agrega, por cada archivo, una copia con el hash de su
+contenido en el nombre (``css/style.css`` -> ``dist/css/style.3fa2c1d04b9e.css``)
+y, para los formatos de texto, sus versiones ``.gz`` y ``.br``. El mapa de
+nombres queda en ``static/dist/manifest.json``.
+
+Con el manifiesto presente, ``url_for('static', filename='css/style.css')``
+devuelve la URL con hash, que se sirve con ``Cache-Control: immutable`` por
+un año y en la versión comprimida que acepte el navegador. Sin manifiesto
+(o con ``DEBUG``) los archivos se sirven como siempre.
+
+Las copias con el nombre original dentro de ``dist/`` mantienen válidas las
+rutas relativas de las hojas de estilo (``url(../webfonts/...)``).
+
+El mismo paso arma los paquetes de ``BUNDLES``: concatena y minifica (con
+``rcssmin``/``rjsmin`` si están instalados) el CSS y el JS del sitio en un
+solo archivo cada uno. Las plantillas los piden con ``bundle_urls()``, que
+sin manifiesto devuelve los archivos sueltos.
+"""
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+
+from flask import current_app, request, send_from_directory, url_for
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - el .br es opcional
+    brotli = None
+
+try:
+    import rcssmin
+    import rjsmin
+except ImportError:  # pragma: no cover - sin minificar solo se concatena
+    rcssmin = rjsmin = None
+
+ASSETS_DIR = 'dist'
+ASSETS_MANIFEST = 'manifest.json'
+ASSETS_EXCLUDE = ('uploads', ASSETS_DIR)
+ASSETS_MAX_AGE = 31536000               # un año, en segundos
+ASSETS_HASH_LENGTH = 12
+# Formatos que vale la pena comprimir (las imágenes y woff ya vienen comprimidos)
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.svg', '.json', '.txt', '.html', '.map', '.ttf', '.eot', '.ico'}
+# Preferencia de codificación: extensión del archivo precomprimido
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+# Paquetes del sitio, en el orden en que se cargan en base.html
+BUNDLES = {
+    'css/site.bundle.css': ('css/base.css', 'css/bootstrap.min.css', 'css/style.css', 'css/search.css'),
+    'js/site.bundle.js': ('js/base.js', 'js/jquery.js', 'js/owl.carousel.min.js', 'js/all.min.js', 'js/myScript.js'),
+}
+
+
+def hashed_name(path, data):
+    """``css/style.css`` -> ``css/style.<hash>.css``"""
+    digest = hashlib.sha256(data).hexdigest()[:ASSETS_HASH_LENGTH]
+    stem, extension = os.path.splitext(path)
+    return f'{stem}.{digest}{extension}'
+
+
+def _compressed(data):
+    yield '.gz', gzip.compress(data, compresslevel=9, mtime=0)
+    if brotli is not None:
+        yield '.br', brotli.compress(data, quality=11)
+
+
+def minify(path, data):
+    """Minifica CSS o JS; los archivos ``.min.`` y sin minificador se dejan igual"""
+    if '.min.' in path or rcssmin is None:
+        return data
+    if path.endswith('.css'):
+        return rcssmin.cssmin(data.decode('utf-8')).encode('utf-8')
+    if path.endswith('.js'):
+        return rjsmin.jsmin(data.decode('utf-8')).encode('utf-8')
+    return data
+
+
+def build_bundle(static_folder, sources):
+    """Concatena y minifica los archivos de un paquete"""
+    parts = []
+    for path in sources:
+        with open(os.path.join(static_folder, *path.split('/')), 'rb') as f:
+            parts.append(minify(path, f.read()).strip())
+    # ";" evita que un script sin punto y coma final se una con el siguiente
+    separator = b'\n;\n' if sources[0].endswith('.js') else b'\n'
+    return separator.join(parts) + b'\n'
+
+
+def _write_asset(staging, path, data):
+    """Escribe la copia con hash y sus versiones comprimidas; devuelve el nombre con hash"""
+    fingerprinted = hashed_name(path, data)
+    target = os.path.join(staging, *fingerprinted.split('/'))
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, 'wb') as f:
+        f.write(data)
+    if os.path.splitext(path)[1].lower() in COMPRESSIBLE_EXTENSIONS:
+        for suffix, compressed in _compressed(data):
+            if len(compressed) < len(data):
+                with open(target + suffix, 'wb') as f:
+                    f.write(compressed)
+    return f'{ASSETS_DIR}/{fingerprinted}'
+
+
+def build_assets(static_folder, bundles=None):
+    """
+    Genera ``static/dist/`` con los archivos, los paquetes (``BUNDLES`` por
+    defecto) y su manifiesto.
+
+    Returns:
+        El manifiesto: diccionario de ruta original a ruta con hash
+        (relativas a ``static/``).
+    """
+    output = os.path.join(static_folder, ASSETS_DIR)
+    staging = output + '.tmp'
+    shutil.rmtree(staging, ignore_errors=True)
+
+    manifest = {}
+    for root, dirs, files in os.walk(static_folder):
+        if root == static_folder:
+            dirs[:] = [d for d in dirs if d not in ASSETS_EXCLUDE and not d.startswith(ASSETS_DIR + '.')]
+        for filename in files:
+            source = os.path.join(root, filename)
+            path = os.path.relpath(source, static_folder).replace(os.sep, '/')
+            with open(source, 'rb') as f:
+                data = f.read()
+            target = os.path.join(staging, *path.split('/'))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(source, target)
+            manifest[path] = _write_asset(staging, path, data)
+
+    for path, sources in (BUNDLES if bundles is None else bundles).items():
+        manifest[path] = _write_asset(staging, path, build_bundle(static_folder, sources))
+
+    with open(os.path.join(staging, ASSETS_MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    shutil.rmtree(output, ignore_errors=True)
+    os.replace(staging, output)
+    return manifest
+
+
+def load_manifest(app):
+    """Lee el manifiesto de ``static/dist``; vacío si no existe o en modo DEBUG"""
+    manifest = {}
+    path = os.path.join(app.static_folder, ASSETS_DIR, ASSETS_MANIFEST)
+    if not app.debug and os.path.exists(path):
+        with open(path) as f:
+            manifest = json.load(f)
+    app.extensions['asset_manifest'] = manifest
+    app.extensions['asset_files'] = frozenset(manifest.values())
+    return manifest
+
+
+def fingerprint_static_url(endpoint, values):
+    """``url_defaults``: cambia el archivo pedido a ``url_for('static')`` por su versión con hash"""
+    if endpoint != 'static':
+        return
+    manifest = current_app.extensions.get('asset_manifest')
+    filename = values.get('filename')
+    if manifest and filename in manifest:
+        values['filename'] = manifest[filename]
+
+
+def bundle_urls(name):
+    """URLs de un paquete de ``BUNDLES``: el archivo armado o, sin manifiesto, sus partes"""
+    manifest = current_app.extensions.get('asset_manifest') or {}
+    if name in manifest:
+        return [url_for('static', filename=name)]
+    return [url_for('static', filename=path) for path in BUNDLES[name]]
+
+
+def serve_static(filename):
+    """Vista ``static``: los archivos con hash se sirven inmutables y precomprimidos"""
+    app = current_app
+    if filename not in app.extensions.get('asset_files', ()):
+        return app.send_static_file(filename)
+
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    download_name = os.path.basename(filename)
+    encoding = None
+    for name, suffix in ENCODINGS:
+        if request.accept_encodings[name] and os.path.exists(os.path.join(app.static_folder, filename + suffix)):
+            encoding, filename = name, filename + suffix
+            break
+
+    response = send_from_directory(app.static_folder, filename, mimetype=mimetype, download_name=download_name,
+                                   max_age=app.config.get('ASSETS_MAX_AGE', ASSETS_MAX_AGE))
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    response.vary.add('Accept-Encoding')
+    if encoding:
+        response.content_encoding = encoding
+    return response
+
+
+def init_assets(app):
+    load_manifest(app)
+    app.url_defaults(fingerprint_static_url)
+    app.view_functions['static'] = serve_static
+    app.jinja_env.globals['bundle_urls'] = bundle_urls
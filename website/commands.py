@@ -0,0 +1,136 @@
+"""
+Comandos de la CLI de Flask para preparar la base de datos.
+
+    flask --app run db-init      # tablas, migraciones e índices de búsqueda
+    flask --app run seed-admin   # super admin inicial, si no existe
+    flask --app run profile-startup   # costo de importaciones y blueprints
+    flask --app run mail-worker  # entrega la bandeja de salida de correos
+    flask --app run smtp-debug   # servidor SMTP local que no entrega nada
+    flask --app run images-rebuild    # miniaturas de las imágenes ya subidas
+    flask --app run assets-build # estáticos con hash y precomprimidos
+
+``create_app`` no ejecuta nada de esto, para que cada worker de gunicorn
+arranque sin consultas ni hash de contraseñas.
+"""
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from . import create_super_admin, init_database
+
+
+@click.command('db-init')
+@with_appcontext
+def db_init_command():
+    """Crea las tablas y aplica las migraciones pendientes."""
+    for version in init_database():
+        click.echo(f'Migración aplicada: {version}')
+    click.echo('Database initialized!')
+
+
+@click.command('seed-admin')
+@with_appcontext
+def seed_admin_command():
+    """Crea el super admin si todavía no existe."""
+    create_super_admin()
+
+
+@click.command('profile-startup')
+@click.option('--limit', default=20, show_default=True, help='Módulos a mostrar.')
+@with_appcontext
+def profile_startup_command(limit):
+    """Muestra el costo de arranque: importaciones y registro de blueprints."""
+    from .startup import import_times
+
+    click.echo('Importaciones (python -X importtime, ms acumulados / propios):')
+    for cumulative, own, name, depth in import_times()[:limit]:
+        click.echo(f'{cumulative:9.1f} {own:8.1f}  {"  " * depth}{name}')
+
+    timings = current_app.extensions.get('startup_timings', [])
+    click.echo('\nPasos de create_app (ms, incluye importar cada módulo):')
+    for name, seconds in timings:
+        click.echo(f'{seconds * 1000:9.1f}  {name}')
+    click.echo(f'{sum(s for _, s in timings) * 1000:9.1f}  total')
+
+
+@click.command('mail-worker')
+@click.option('--once', is_flag=True, help='Vaciar la bandeja una vez y salir.')
+@with_appcontext
+def mail_worker_command(once):
+    """Entrega los correos de la bandeja de salida."""
+    import time
+    from .outbox import MAIL_OUTBOX_POLL_INTERVAL, drain
+
+    interval = current_app.config.get('MAIL_OUTBOX_POLL_INTERVAL', MAIL_OUTBOX_POLL_INTERVAL)
+    while True:
+        sent = drain()
+        if sent:
+            click.echo(f'Correos enviados: {sent}')
+        if once:
+            return
+        time.sleep(interval)
+
+
+@click.command('smtp-debug')
+@click.option('--port', default=1025, show_default=True)
+def smtp_debug_command(port):
+    """Servidor SMTP local que muestra los correos en lugar de enviarlos."""
+    from .smtp_debug import DebugSMTPServer
+
+    server = DebugSMTPServer(port=port, echo=True)
+    click.echo(f'SMTP de depuración en localhost:{server.port}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+@click.command('images-rebuild')
+@click.option('--all', 'rebuild_all', is_flag=True, help='Procesar también los productos que ya tienen miniaturas.')
+@with_appcontext
+def images_rebuild_command(rebuild_all):
+    """Procesa las imágenes de productos ya subidas (miniaturas, WebP y hash)."""
+    from . import db
+    from .images import InvalidImageError, dump_meta, reprocess_image
+    from .modules.product.models import Product
+
+    query = Product.query.filter(Product.product_picture.isnot(None))
+    if not rebuild_all:
+        query = query.filter(Product.picture_meta.is_(None))
+    done = 0
+    for product in query.all():
+        try:
+            result = reprocess_image(product.product_picture)
+        except InvalidImageError as e:
+            click.echo(f'{product.id}: {product.product_picture}: {e}')
+            continue
+        if result is None:
+            click.echo(f'{product.id}: no se encontró {product.product_picture}')
+            continue
+        product.product_picture, meta = result
+        product.picture_meta = dump_meta(meta)
+        done += 1
+    db.session.commit()
+    click.echo(f'Imágenes procesadas: {done}')
+
+
+@click.command('assets-build')
+@with_appcontext
+def assets_build_command():
+    """Genera static/dist: archivos con hash en el nombre, .gz y .br."""
+    from .assets import build_assets, load_manifest
+
+    manifest = build_assets(current_app.static_folder)
+    load_manifest(current_app)
+    click.echo(f'Archivos estáticos: {len(manifest)}')
+
+
+def register_commands(app):
+    app.cli.add_command(db_init_command)
+    app.cli.add_command(seed_admin_command)
+    app.cli.add_command(profile_startup_command)
+    app.cli.add_command(mail_worker_command)
+    app.cli.add_command(smtp_debug_command)
+    app.cli.add_command(images_rebuild_command)
+    app.cli.add_command(assets_build_command)
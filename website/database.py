@@ -0,0 +1,163 @@
+"""
+Configuración del motor de base de datos.
+
+La URL se toma de la variable de entorno ``DATABASE_URL``; sin ella se usa
+el archivo SQLite de ``instance/``. Con PostgreSQL varios nodos de la
+aplicación comparten la misma base, y cada proceso mantiene un pool de
+conexiones del tamaño de sus threads de gunicorn (``GUNICORN_THREADS``).
+
+Con SQLite, cada conexión nueva recibe el perfil de PRAGMAs de
+``SQLITE_PRAGMAS``: WAL para que las lecturas no bloqueen a las escrituras
+entre los workers y threads de gunicorn, ``busy_timeout`` para esperar un
+bloqueo en lugar de fallar con "database is locked", y caché, mmap y
+tablas temporales en memoria. Los valores se pueden cambiar con la clave
+``SQLITE_PRAGMAS`` de la configuración de la aplicación.
+"""
+
+import atexit
+import os
+import threading
+import weakref
+
+from sqlalchemy import event
+
+from . import db, DB_NAME
+
+# Valores por defecto del pool de PostgreSQL; se pueden cambiar con las
+# variables de entorno DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_RECYCLE y
+# DB_STATEMENT_TIMEOUT_MS
+GUNICORN_THREADS = 4                    # igual que --threads en el Procfile
+DB_MAX_OVERFLOW = 2
+DB_POOL_TIMEOUT = 10                    # segundos esperando una conexión libre
+DB_POOL_RECYCLE = 1800                  # segundos antes de renovar una conexión
+DB_STATEMENT_TIMEOUT_MS = 5000
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,               # milisegundos
+    'mmap_size': 256 * 1024 * 1024,     # 256 MB
+    'cache_size': -64000,               # ~64 MB (negativo = KiB)
+    'temp_store': 'MEMORY',
+}
+
+# Segundos entre checkpoints del WAL; 0 lo desactiva
+SQLITE_CHECKPOINT_INTERVAL = 300
+
+
+def database_uri(instance_path):
+    """URL de la base de datos a partir de ``DATABASE_URL``"""
+    url = os.environ.get('DATABASE_URL')
+    if not url:
+        return f"sqlite:///{os.path.join(instance_path, DB_NAME)}"
+    # Heroku y Render entregan el esquema antiguo "postgres://"
+    if url.startswith('postgres://'):
+        url = 'postgresql://' + url[len('postgres://'):]
+    return url
+
+
+def engine_options(uri):
+    """
+    ``SQLALCHEMY_ENGINE_OPTIONS`` para la URL dada.
+
+    Con PostgreSQL cada thread de gunicorn tiene su conexión en el pool,
+    se valida la conexión antes de usarla (``pool_pre_ping``), se renueva
+    cada ``DB_POOL_RECYCLE`` segundos y las consultas se cortan a los
+    ``DB_STATEMENT_TIMEOUT_MS`` milisegundos. SQLite usa los valores de
+    Flask-SQLAlchemy.
+    """
+    if not uri.startswith('postgresql'):
+        return {}
+    threads = int(os.environ.get('GUNICORN_THREADS', GUNICORN_THREADS))
+    statement_timeout = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', DB_STATEMENT_TIMEOUT_MS))
+    return {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', threads)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', DB_MAX_OVERFLOW)),
+        'pool_timeout': DB_POOL_TIMEOUT,
+        'pool_pre_ping': True,
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', DB_POOL_RECYCLE)),
+        'connect_args': {'options': f'-c statement_timeout={statement_timeout}'},
+    }
+
+
+def _is_file_database(engine):
+    return engine.url.database not in (None, '', ':memory:')
+
+
+def init_engine(app):
+    """
+    Prepara el engine de la aplicación: perfil de SQLite y reinicio del pool
+    en los procesos hijos. Con ``gunicorn --preload`` la aplicación se crea
+    una vez en el proceso maestro y los workers la heredan con ``fork``; cada
+    worker debe abrir sus propias conexiones.
+    """
+    engine_ref = weakref.ref(db.engine)
+
+    def reset_pool():
+        engine = engine_ref()
+        if engine is not None:
+            engine.dispose(close=False)
+
+    os.register_at_fork(after_in_child=reset_pool)
+    init_sqlite(app)
+
+
+def init_sqlite(app):
+    """
+    Aplica el perfil de SQLite al engine de la aplicación.
+
+    Debe llamarse dentro del contexto de la aplicación, después de
+    ``db.init_app``. No hace nada si el engine no es SQLite.
+    """
+    engine = db.engine
+    if engine.dialect.name != 'sqlite':
+        return
+
+    pragmas = dict(SQLITE_PRAGMAS)
+    pragmas.update(app.config.get('SQLITE_PRAGMAS') or {})
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+        cursor.close()
+
+    if not _is_file_database(engine):
+        return
+
+    interval = app.config.get('SQLITE_CHECKPOINT_INTERVAL', SQLITE_CHECKPOINT_INTERVAL)
+    if interval and str(pragmas.get('journal_mode', '')).upper() == 'WAL':
+        _start_checkpointer(app, engine, interval)
+
+    atexit.register(_optimize_on_shutdown, app, engine)
+
+
+def _start_checkpointer(app, engine, interval):
+    """Hilo en segundo plano que hace ``wal_checkpoint(PASSIVE)`` periódicamente"""
+    stop = threading.Event()
+
+    def run():
+        while not stop.wait(interval):
+            try:
+                with engine.connect() as conn:
+                    conn.exec_driver_sql('PRAGMA wal_checkpoint(PASSIVE)')
+            except Exception as e:
+                app.logger.warning(f'Error en el checkpoint del WAL: {e}')
+
+    thread = threading.Thread(target=run, name='sqlite-wal-checkpoint', daemon=True)
+    thread.start()
+    app.extensions['sqlite_checkpointer'] = stop
+
+
+def _optimize_on_shutdown(app, engine):
+    """Ejecuta ``PRAGMA optimize`` y cierra las conexiones al terminar el proceso"""
+    stop = app.extensions.get('sqlite_checkpointer')
+    if stop is not None:
+        stop.set()
+    try:
+        with engine.connect() as conn:
+            conn.exec_driver_sql('PRAGMA optimize')
+    except Exception as e:
+        app.logger.warning(f'Error al ejecutar PRAGMA optimize: {e}')
+    engine.dispose()
@@ -0,0 +1,26 @@
+"""
+Páginas de evaluación de calidad (solo administradores).
+
+Se usan muy poco, así que no forman parte del blueprint ``views``: se
+registran con ``LazyView`` (ver ``website/lazy.py``) y este módulo se
+importa en la primera petición.
+"""
+
+from flask import render_template, flash, redirect, url_for
+from flask_login import login_required, current_user
+
+
+@login_required
+def module_quality():
+    if not current_user.is_admin:
+        flash('Acceso no autorizado. Solo los administradores pueden ver esta página.', 'error')
+        return redirect(url_for('views.home'))
+    return render_template('evaluation/module_quality.html')
+
+
+@login_required
+def usage_quality():
+    if not current_user.is_admin:
+        flash('Acceso no autorizado. Solo los administradores pueden ver esta página.', 'error')
+        return redirect(url_for('views.home'))
+    return render_template('evaluation/usage_quality.html')
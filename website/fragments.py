@@ -0,0 +1,312 @@
+"""
+Caché de fragmentos de plantillas.
+
+Las tarjetas de producto del catálogo se renderizan igual para todos los
+visitantes del mismo tipo, así que se guardan ya renderizadas::
+
+    {% cache 'product_card', item %}
+        ... tarjeta ...
+    {% endcache %}
+
+La clave se arma con el nombre del fragmento y sus partes: un ``Product``
+aporta su id, ``updated_at`` y la versión de su categoría, y una
+``Category`` su id y versión. A toda clave se agregan el tipo de visitante
+(anónimo, cliente o administrador) y ``request.path``, que las tarjetas
+usan en el enlace de inicio de sesión.
+
+Editar o borrar un ``Product`` o una ``Category`` cambia, al confirmar la
+transacción, la versión de la categoría afectada: todos sus fragmentos
+dejan de coincidir. Los cambios hechos con ``UPDATE`` directo (el
+descuento de stock del checkout) no pasan por esos eventos, pero cambian
+``updated_at``.
+
+Backends (``FRAGMENT_CACHE``):
+    ``'lru'`` (por defecto): LRU en memoria de cada proceso, con vencimiento
+        ``FRAGMENT_CACHE_TIMEOUT``. Los otros procesos ven los cambios de
+        categorías recién al vencer la entrada.
+    ``'shared'``: almacén compartido con la interfaz de Redis (``get``,
+        ``set(ex=)``, ``delete``) en ``FRAGMENT_CACHE_CLIENT``, o
+        ``redis.from_url(FRAGMENT_CACHE_URL)``. ``MemoryStore`` lo imita
+        en local y en las pruebas.
+    ``'null'``: sin caché.
+"""
+
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from flask import current_app, g, has_app_context, has_request_context, request
+from flask_login import current_user
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from .metrics import record_cache
+from .modules.product.models import Category, Product
+
+FRAGMENT_CACHE = 'lru'
+FRAGMENT_CACHE_SIZE = 5000
+FRAGMENT_CACHE_TIMEOUT = 300            # segundos
+
+
+# -- Backends -----------------------------------------------------------------
+
+class LRUBackend:
+    """LRU en memoria con vencimiento, compartido por los threads del proceso"""
+
+    def __init__(self, max_size=FRAGMENT_CACHE_SIZE, timeout=FRAGMENT_CACHE_TIMEOUT):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()     # clave -> (vence, valor)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SharedBackend:
+    """Almacén compartido entre procesos con la interfaz de Redis"""
+
+    def __init__(self, client, prefix='fragment:', timeout=FRAGMENT_CACHE_TIMEOUT):
+        self.client = client
+        self.prefix = prefix
+        self.timeout = timeout
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        return value.decode('utf-8') if isinstance(value, bytes) else value
+
+    def set(self, key, value):
+        self.client.set(self.prefix + key, value.encode('utf-8'), ex=self.timeout)
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+
+class MemoryStore:
+    """Imitación local de Redis (``get``, ``set(ex=)``, ``delete``) para desarrollo y pruebas"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {}
+
+    def get(self, name):
+        with self._lock:
+            entry = self._data.get(name)
+            if entry is None or (entry[0] is not None and entry[0] <= time.monotonic()):
+                return None
+            return entry[1]
+
+    def set(self, name, value, ex=None):
+        with self._lock:
+            self._data[name] = (time.monotonic() + ex if ex else None, value)
+        return True
+
+    def delete(self, *names):
+        with self._lock:
+            return sum(self._data.pop(name, None) is not None for name in names)
+
+
+class NullBackend:
+    def get(self, key):
+        return None
+
+    def set(self, key, value):
+        pass
+
+    def delete(self, key):
+        pass
+
+
+# -- Caché --------------------------------------------------------------------
+
+class FragmentCache:
+    """Fragmentos renderizados y versiones de categoría sobre un backend"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self.backend.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        record_cache('fragment', value is not None)
+        return value
+
+    def set(self, key, value):
+        self.backend.set(key, value)
+
+    def category_version(self, category_id):
+        """Versión actual de una categoría (memorizada durante la petición)"""
+        versions = g.setdefault('_fragment_versions', {})
+        if category_id not in versions:
+            key = f'version:category:{category_id}'
+            version = self.backend.get(key)
+            if version is None:
+                # Una versión nueva y no un contador: si el backend la descarta,
+                # nunca vuelve a coincidir con fragmentos viejos
+                version = uuid.uuid4().hex[:12]
+                self.backend.set(key, version)
+            versions[category_id] = version
+        return versions[category_id]
+
+    def invalidate_categories(self, category_ids):
+        for category_id in category_ids:
+            self.backend.delete(f'version:category:{category_id}')
+        if has_app_context():
+            g.pop('_fragment_versions', None)
+
+
+def create_backend(app, prefix, max_size, timeout, kind=None):
+    """Backend según ``FRAGMENT_CACHE`` (o ``kind``); también lo usa la caché de páginas"""
+    kind = kind or app.config.get('FRAGMENT_CACHE', FRAGMENT_CACHE)
+    if kind == 'lru':
+        return LRUBackend(max_size, timeout)
+    if kind == 'shared':
+        client = app.config.get('FRAGMENT_CACHE_CLIENT')
+        if client is None:
+            import redis
+            client = redis.from_url(app.config['FRAGMENT_CACHE_URL'])
+        return SharedBackend(client, prefix=prefix, timeout=timeout)
+    if kind == 'null':
+        return NullBackend()
+    raise ValueError(f'Tipo de caché desconocido: {kind!r}')
+
+
+def _create_cache(app):
+    return FragmentCache(create_backend(
+        app, 'fragment:',
+        app.config.get('FRAGMENT_CACHE_SIZE', FRAGMENT_CACHE_SIZE),
+        app.config.get('FRAGMENT_CACHE_TIMEOUT', FRAGMENT_CACHE_TIMEOUT),
+    ))
+
+
+def get_fragment_cache(app=None):
+    app = app or current_app
+    cache = app.extensions.get('fragment_cache')
+    if cache is None:
+        cache = app.extensions['fragment_cache'] = _create_cache(app)
+    return cache
+
+
+# -- Claves -------------------------------------------------------------------
+
+def _key_part(cache, part):
+    if isinstance(part, Product):
+        updated = part.updated_at.isoformat() if part.updated_at else ''
+        return f'p{part.id}@{updated}@{cache.category_version(part.category_id)}'
+    if isinstance(part, Category):
+        return f'c{part.id}@{cache.category_version(part.id)}'
+    if isinstance(part, (list, tuple)):
+        return '[' + ','.join(_key_part(cache, item) for item in part) + ']'
+    return str(part)
+
+
+def _viewer():
+    if not current_user.is_authenticated:
+        return 'anon'
+    return 'admin' if current_user.is_admin else 'customer'
+
+
+def fragment_key(cache, name, parts):
+    raw = '|'.join([_key_part(cache, part) for part in parts] + [_viewer(), request.path])
+    return f'{name}:{hashlib.sha1(raw.encode("utf-8")).hexdigest()}'
+
+
+class FragmentCacheExtension(Extension):
+    """Etiqueta ``{% cache nombre, partes... %}...{% endcache %}``"""
+
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            args.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        call = self.call_method('_render', [args[0], nodes.List(args[1:])])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render(self, name, parts, caller):
+        if not has_request_context():
+            return caller()
+        cache = get_fragment_cache()
+        key = fragment_key(cache, name, parts)
+        value = cache.get(key)
+        if value is None:
+            value = str(caller())
+            cache.set(key, value)
+        return Markup(value)
+
+
+def init_fragment_cache(app):
+    app.jinja_env.add_extension(FragmentCacheExtension)
+
+
+# -- Invalidación al confirmar cambios del catálogo ---------------------------
+
+def _record(session, category_ids):
+    if session is not None:
+        session.info.setdefault('fragment_categories', set()).update(i for i in category_ids if i is not None)
+
+
+def _record_product(mapper, connection, target):
+    # Si el producto cambió de categoría, las dos quedan invalidadas
+    previous = inspect(target).attrs.category_id.history.deleted
+    _record(object_session(target), [target.category_id, *previous])
+
+
+def _record_category(mapper, connection, target):
+    _record(object_session(target), [target.id])
+
+
+event.listen(Product, 'after_update', _record_product)
+event.listen(Product, 'after_delete', _record_product)
+event.listen(Category, 'after_update', _record_category)
+event.listen(Category, 'after_delete', _record_category)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_changed(session):
+    changed = session.info.pop('fragment_categories', None)
+    if not changed or not has_app_context():
+        return
+    cache = current_app.extensions.get('fragment_cache')
+    if cache is not None:
+        cache.invalidate_categories(changed)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changed(session):
+    session.info.pop('fragment_categories', None)
@@ -0,0 +1,159 @@
+"""
+Identidad del usuario en sesión.
+
+Flask-Login llama a ``user_loader`` en cada petición. En lugar de cargar la
+fila completa de ``Customer`` (con ``bio``, ``preferences`` y
+``security_questions``), se devuelve un ``Principal`` con los pocos campos
+que usan los permisos y las plantillas, guardado en una caché en memoria
+por ``USER_CACHE_TTL`` segundos.
+
+La fila completa se carga solo si una vista lee o escribe otro atributo
+(``current_user.email``, ``current_user.address = ...``). Cualquier cambio
+confirmado sobre un ``Customer`` invalida su entrada de la caché; en otros
+procesos la entrada vence con el TTL.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, has_app_context
+from flask_login import UserMixin
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, object_session
+
+from . import db
+from .metrics import record_cache
+from .models import Customer
+
+USER_CACHE_TTL = 60
+USER_CACHE_SIZE = 10000
+
+
+class Principal(UserMixin):
+    """
+    Usuario en sesión con solo id, username, rol y banderas.
+
+    Es compartido entre peticiones y threads, así que nunca se modifica:
+    las asignaciones se hacen sobre la fila completa de ``Customer``.
+    """
+
+    FIELDS = ('id', 'username', 'role', 'is_first_login', 'force_password_change', 'two_factor_enabled')
+
+    def __init__(self, **values):
+        for name in self.FIELDS:
+            object.__setattr__(self, name, values.get(name))
+
+    @property
+    def is_admin(self):
+        return self.role in ['admin', 'super_admin']
+
+    @property
+    def is_super_admin(self):
+        return self.role == 'super_admin'
+
+    @property
+    def customer(self):
+        """Fila completa; el identity map de la sesión evita repetir la consulta"""
+        return db.session.get(Customer, self.id)
+
+    def __getattr__(self, name):
+        # Solo se llama para atributos que el Principal no tiene
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return getattr(self.customer, name)
+
+    def __setattr__(self, name, value):
+        setattr(self.customer, name, value)
+
+    def __repr__(self):
+        return f'<Principal {self.id} {self.username}>'
+
+
+class IdentityCache:
+    """Caché LRU con TTL de ``Principal`` por id de usuario"""
+
+    def __init__(self, ttl=USER_CACHE_TTL, max_size=USER_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()     # id -> (vence, Principal)
+
+    def get(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(user_id)
+                    record_cache('identity', True)
+                    return entry[1]
+                del self._entries[user_id]
+
+        record_cache('identity', False)
+
+        principal = load_principal(user_id)
+        if principal is not None:
+            with self._lock:
+                self._entries[user_id] = (now + self.ttl, principal)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return principal
+
+    def invalidate(self, user_id=None):
+        """Descarta un usuario, o toda la caché si no se indica ninguno"""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+
+def load_principal(user_id):
+    """Consulta solo las columnas del ``Principal``"""
+    columns = [getattr(Customer, name) for name in Principal.FIELDS]
+    row = db.session.execute(select(*columns).where(Customer.id == user_id)).first()
+    return Principal(**row._asdict()) if row else None
+
+
+def get_identity_cache():
+    cache = current_app.extensions.get('identity_cache')
+    if cache is None:
+        cache = current_app.extensions['identity_cache'] = IdentityCache(
+            ttl=current_app.config.get('USER_CACHE_TTL', USER_CACHE_TTL)
+        )
+    return cache
+
+
+def invalidate_user(user_id):
+    """Invalidación explícita, para cambios hechos fuera del ORM"""
+    get_identity_cache().invalidate(user_id)
+
+
+# -- Invalidación al confirmar cambios de un Customer ------------------------
+
+def _record(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault('identity_changes', set()).add(target.id)
+
+
+event.listen(Customer, 'after_update', _record)
+event.listen(Customer, 'after_delete', _record)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_changed(session):
+    changed = session.info.pop('identity_changes', None)
+    if not changed or not has_app_context():
+        return
+    cache = current_app.extensions.get('identity_cache')
+    if cache is not None:
+        for user_id in changed:
+            cache.invalidate(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changed(session):
+    session.info.pop('identity_changes', None)
@@ -0,0 +1,178 @@
+"""
+Procesamiento de imágenes subidas.
+
+Cada imagen se normaliza (orientación EXIF aplicada, sin metadatos, ancho
+máximo ``MAX_IMAGE_WIDTH``) y se generan miniaturas de ancho fijo
+(``THUMBNAIL_WIDTHS``) en el formato original y en WebP. El resultado se
+describe con un diccionario que se guarda como JSON (``Product.picture_meta``)
+y que usan las plantillas para armar ``srcset``::
+
+    {"width": 1200, "height": 900,
+     "variants": [{"width": 320, "height": 240,
+                   "src": "/uploads/ab/cd/abcd...jpeg",
+                   "webp": "/uploads/01/23/0123...webp"}, ...]}
+
+Los archivos se guardan con ``storage.save_upload``: subir dos veces la
+misma imagen produce las mismas URLs.
+"""
+
+import io
+import json
+import os
+
+from flask import current_app
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .storage import local_path, save_upload
+
+ALLOWED_IMAGE_FORMATS = {'JPEG': 'jpeg', 'PNG': 'png', 'GIF': 'png', 'WEBP': 'webp'}
+MAX_IMAGE_WIDTH = 1600
+# Ancho por alto máximo aceptado (unos 40 MP). Pillow solo rechaza por encima
+# de 2 * Image.MAX_IMAGE_PIXELS (~179 MP); entre ese valor y la mitad apenas avisa
+MAX_IMAGE_PIXELS = 40_000_000
+THUMBNAIL_WIDTHS = (160, 320, 640, 1024)
+JPEG_QUALITY = 85
+WEBP_QUALITY = 80
+
+
+class InvalidImageError(ValueError):
+    """El archivo subido no es una imagen en un formato permitido"""
+
+
+def open_image(stream):
+    """Abre y valida la imagen; aplica la orientación EXIF"""
+    max_pixels = current_app.config.get('MAX_IMAGE_PIXELS', MAX_IMAGE_PIXELS)
+    try:
+        image = Image.open(stream)
+        # Se comprueba con la cabecera, antes de decodificar
+        if image.width * image.height > max_pixels:
+            raise InvalidImageError('La imagen tiene demasiados píxeles.')
+        image.load()
+    except Image.DecompressionBombError as e:
+        # Más de 2 * Image.MAX_IMAGE_PIXELS: no es un OSError
+        raise InvalidImageError('La imagen tiene demasiados píxeles.') from e
+    except (UnidentifiedImageError, OSError) as e:
+        raise InvalidImageError('El archivo no es una imagen válida.') from e
+    if image.format not in ALLOWED_IMAGE_FORMATS:
+        raise InvalidImageError('Formato de imagen no permitido. Use PNG, JPG, JPEG, GIF o WEBP.')
+    extension = ALLOWED_IMAGE_FORMATS[image.format]
+    image = ImageOps.exif_transpose(image)
+    return image, extension
+
+
+def _resize(image, width):
+    if image.width <= width:
+        return image
+    height = round(image.height * width / image.width)
+    return image.resize((width, height), Image.LANCZOS)
+
+
+def _normalize_mode(image):
+    """Modo RGB o RGBA (conserva la transparencia de paletas y GIF)"""
+    if image.mode == 'RGBA' or image.mode == 'RGB':
+        return image
+    if image.mode in ('P', 'LA', 'PA') or 'transparency' in image.info:
+        return image.convert('RGBA')
+    return image.convert('RGB')
+
+
+def encode(image, extension):
+    """Codifica sin metadatos (sin EXIF, ICC ni textos PNG)"""
+    buffer = io.BytesIO()
+    if extension == 'jpeg':
+        image.convert('RGB').save(buffer, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+    elif extension == 'webp':
+        _normalize_mode(image).save(buffer, 'WEBP', quality=WEBP_QUALITY, method=4)
+    else:
+        # Las paletas (modo P) se guardan tal cual: suelen pesar mucho menos
+        image.save(buffer, 'PNG', compress_level=6)
+    return buffer.getvalue()
+
+
+def render_variants(image, extension):
+    """
+    Genera los archivos de una imagen ya abierta.
+
+    Returns:
+        Tupla ``(meta, archivos)``: ``meta`` sin URLs todavía y ``archivos``
+        con tuplas ``(clave, extensión, bytes)``. La clave ``''`` es la
+        imagen normalizada y ``'320w'`` la miniatura de 320 px (una en el
+        formato original y otra en WebP).
+    """
+    max_width = current_app.config.get('MAX_IMAGE_WIDTH', MAX_IMAGE_WIDTH)
+    if image.width > max_width:
+        image = _resize(_normalize_mode(image), max_width)
+    # Descartar EXIF, perfiles ICC y textos antes de codificar
+    transparency = image.info.get('transparency')
+    image.info = {'transparency': transparency} if transparency is not None else {}
+
+    files = [('', extension, encode(image, extension))]
+    meta = {'width': image.width, 'height': image.height, 'variants': []}
+    scalable = _normalize_mode(image)
+    for width in current_app.config.get('THUMBNAIL_WIDTHS', THUMBNAIL_WIDTHS):
+        if width >= image.width:
+            break
+        thumbnail = _resize(scalable, width)
+        files.append((f'{width}w', extension, encode(thumbnail, extension)))
+        files.append((f'{width}w', 'webp', encode(thumbnail, 'webp')))
+        meta['variants'].append({'width': thumbnail.width, 'height': thumbnail.height})
+    return meta, files
+
+
+def _save_files(meta, files, extension):
+    """Guarda los archivos y completa las URLs de ``meta``; devuelve la URL principal"""
+    urls = {(key, ext): save_upload(data, ext) for key, ext, data in files}
+    for variant in meta['variants']:
+        key = f"{variant['width']}w"
+        variant['src'] = urls[(key, extension)]
+        variant['webp'] = urls[(key, 'webp')]
+    return urls[('', extension)]
+
+
+def process_image(file):
+    """
+    Procesa una imagen subida (``FileStorage`` o archivo binario) y guarda
+    sus variantes con ``save_upload``.
+
+    Returns:
+        Tupla ``(url, meta)`` con la URL de la imagen normalizada y el
+        diccionario de dimensiones y variantes.
+
+    Raises:
+        InvalidImageError: si el archivo no es una imagen permitida.
+    """
+    image, extension = open_image(getattr(file, 'stream', file))
+    meta, files = render_variants(image, extension)
+    return _save_files(meta, files, extension), meta
+
+
+def reprocess_image(url):
+    """
+    Vuelve a procesar una imagen ya guardada (``product_picture`` como
+    ``static/uploads/products/x.png``). El archivo anterior no se borra.
+
+    Returns:
+        Tupla ``(url, meta)`` como ``process_image``, o ``None`` si el
+        archivo no existe.
+
+    Raises:
+        InvalidImageError: si el archivo no es una imagen permitida.
+    """
+    path = local_path(url)
+    if path is None or not os.path.isfile(path):
+        return None
+    with open(path, 'rb') as f:
+        return process_image(f)
+
+
+def dump_meta(meta):
+    return json.dumps(meta, separators=(',', ':')) if meta else None
+
+
+def load_meta(value):
+    if not value:
+        return None
+    try:
+        return json.loads(value)
+    except ValueError:
+        return None
@@ -1,4 +1,4 @@
-from . import db
+from . import db, init_database
 from .models import Customer, Cart, Order
 from .modules.product.models import Product, Category
 
@@ -7,7 +7,7 @@ def init_db():
     db.drop_all()
     
     # Create all tables
-    db.create_all()
+    init_database()
     
     print("Database initialized successfully!")
 
@@ -0,0 +1,41 @@
+"""
+Registro diferido de vistas poco usadas.
+
+Cada entrada de ``LAZY_ROUTES`` se registra en el arranque solo como regla
+de URL; el módulo que contiene la vista se importa en la primera petición
+que la usa (patrón "Lazy Loading Views" de la documentación de Flask).
+Los endpoints conservan su nombre, así que ``url_for`` no cambia.
+"""
+
+from werkzeug.utils import cached_property, import_string
+
+# (regla, endpoint, vista, métodos)
+LAZY_ROUTES = (
+    # Páginas de evaluación de calidad
+    ('/evaluation/module-quality', 'views.module_quality', 'website.evaluation.module_quality', ('GET',)),
+    ('/evaluation/usage-quality', 'views.usage_quality', 'website.evaluation.usage_quality', ('GET',)),
+    # Recuperación de cuentas de administrador
+    ('/auth/admin/recovery', 'auth.admin_recovery', 'website.recovery.admin_recovery', ('GET', 'POST')),
+    ('/auth/admin/verify-code', 'auth.verify_recovery_code', 'website.recovery.verify_recovery_code', ('GET', 'POST')),
+    ('/auth/admin/reset-password', 'auth.reset_admin_password', 'website.recovery.reset_admin_password', ('GET', 'POST')),
+)
+
+
+class LazyView:
+    """Vista que importa la función real al primer uso"""
+
+    def __init__(self, import_name):
+        self.import_name = import_name
+        self.__module__, self.__name__ = import_name.rsplit('.', 1)
+
+    @cached_property
+    def view(self):
+        return import_string(self.import_name)
+
+    def __call__(self, *args, **kwargs):
+        return self.view(*args, **kwargs)
+
+
+def register_lazy_routes(app, routes=LAZY_ROUTES):
+    for rule, endpoint, import_name, methods in routes:
+        app.add_url_rule(rule, endpoint=endpoint, view_func=LazyView(import_name), methods=list(methods))
@@ -0,0 +1,168 @@
+"""
+Métricas de la aplicación en formato Prometheus (``GET /metrics``).
+
+Por petición, con las etiquetas ``blueprint`` y ``endpoint``
+(``views.search``, ``cliente.carrito``):
+
+    ``tienda_request_duration_seconds``   histograma de latencia (y ``method``)
+    ``tienda_requests_total``             peticiones por código de estado
+    ``tienda_request_db_seconds``         histograma del tiempo en la base
+                                          (medido por ``query_stats``)
+    ``tienda_db_queries_total``           consultas ejecutadas
+
+Además:
+
+    ``tienda_template_render_seconds``    render de cada plantilla
+    ``tienda_cache_requests_total``       lecturas de las cachés ``page``,
+                                          ``fragment`` e ``identity`` con
+                                          ``result`` = ``hit``/``miss``
+    ``tienda_orders_placed_total``        pedidos confirmados
+    ``tienda_cart_mutations_total``       cambios del carrito (``action`` =
+                                          ``add``/``update``/``remove``)
+    ``tienda_failed_logins_total``        inicios de sesión rechazados
+
+La proporción de aciertos de una caché se calcula en Prometheus, por ejemplo
+``rate(tienda_cache_requests_total{result="hit"}[5m])`` sobre el total.
+
+Con gunicorn cada worker tiene sus propios contadores. Si existe la
+variable ``PROMETHEUS_MULTIPROC_DIR`` (``gunicorn.conf.py`` la define), cada
+proceso escribe sus valores en ese directorio y ``/metrics`` devuelve la
+suma de todos, sin importar qué worker atienda la petición.
+
+En producción hay que definir ``METRICS_TOKEN`` (configuración o variable de
+entorno): ``/metrics`` exige ``Authorization: Bearer <token>`` y sin token
+responde 404, salvo con ``DEBUG`` o ``TESTING``.
+"""
+
+import hmac
+import os
+import time
+
+from flask import abort, current_app, g, request
+from flask import before_render_template, template_rendered
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram,
+                               generate_latest, multiprocess)
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from .models import Cart
+
+REQUEST_LABELS = ('blueprint', 'endpoint')
+
+REQUEST_DURATION = Histogram(
+    'tienda_request_duration_seconds', 'Duración de las peticiones',
+    REQUEST_LABELS + ('method',),
+)
+REQUESTS = Counter(
+    'tienda_requests_total', 'Peticiones atendidas',
+    REQUEST_LABELS + ('method', 'status'),
+)
+REQUEST_DB_TIME = Histogram(
+    'tienda_request_db_seconds', 'Tiempo en la base de datos por petición',
+    REQUEST_LABELS,
+    buckets=(.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5),
+)
+DB_QUERIES = Counter('tienda_db_queries_total', 'Consultas SQL ejecutadas', REQUEST_LABELS)
+TEMPLATE_RENDER = Histogram(
+    'tienda_template_render_seconds', 'Render de plantillas', ('template',),
+    buckets=(.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1),
+)
+CACHE_REQUESTS = Counter('tienda_cache_requests_total', 'Lecturas de caché', ('cache', 'result'))
+ORDERS_PLACED = Counter('tienda_orders_placed_total', 'Pedidos confirmados')
+CART_MUTATIONS = Counter('tienda_cart_mutations_total', 'Cambios en carritos', ('action',))
+FAILED_LOGINS = Counter('tienda_failed_logins_total', 'Inicios de sesión rechazados')
+
+# Endpoints que no se miden: el propio /metrics
+EXCLUDED_ENDPOINTS = {'metrics'}
+
+
+def record_cache(cache, hit):
+    CACHE_REQUESTS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+# -- Peticiones ---------------------------------------------------------------
+
+def _request_labels():
+    return request.blueprint or '', request.endpoint or 'sin_ruta'
+
+
+def _start_timer():
+    g._metrics_start = time.perf_counter()
+
+
+def _observe_request(response):
+    start = g.pop('_metrics_start', None)
+    if start is None or request.endpoint in EXCLUDED_ENDPOINTS:
+        return response
+    blueprint, endpoint = _request_labels()
+    REQUEST_DURATION.labels(blueprint, endpoint, request.method).observe(time.perf_counter() - start)
+    REQUESTS.labels(blueprint, endpoint, request.method, str(response.status_code)).inc()
+
+    stats = g.get('_query_stats')
+    if stats is not None:
+        REQUEST_DB_TIME.labels(blueprint, endpoint).observe(stats.duration)
+        if stats.count:
+            DB_QUERIES.labels(blueprint, endpoint).inc(stats.count)
+    return response
+
+
+def _start_render(app, template, context, **extra):
+    g.setdefault('_render_starts', []).append(time.perf_counter())
+
+
+def _observe_render(app, template, context, **extra):
+    starts = g.get('_render_starts')
+    if starts:
+        TEMPLATE_RENDER.labels(template.name or 'string').observe(time.perf_counter() - starts.pop())
+
+
+def metrics_view():
+    token = current_app.config.get('METRICS_TOKEN', os.environ.get('METRICS_TOKEN'))
+    if not token:
+        # Nombres de endpoints y contadores de pedidos o logins fallidos no son públicos
+        if not (current_app.debug or current_app.testing):
+            abort(404)
+    elif not hmac.compare_digest(request.headers.get('Authorization', '').encode(), f'Bearer {token}'.encode()):
+        abort(401)
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), 200, {'Content-Type': CONTENT_TYPE_LATEST}
+
+
+def init_metrics(app):
+    app.before_request(_start_timer)
+    app.after_request(_observe_request)
+    before_render_template.connect(_start_render, app)
+    template_rendered.connect(_observe_render, app)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
+
+
+# -- Carrito ------------------------------------------------------------------
+
+def _record_cart(action):
+    def record(mapper, connection, target):
+        session = object_session(target)
+        if session is not None:
+            session.info.setdefault('cart_mutations', []).append(action)
+    return record
+
+
+# Se cuentan al confirmar; el vaciado del carrito en el checkout es un DELETE
+# directo y no cuenta como cambio
+event.listen(Cart, 'after_insert', _record_cart('add'))
+event.listen(Cart, 'after_update', _record_cart('update'))
+event.listen(Cart, 'after_delete', _record_cart('remove'))
+
+
+@event.listens_for(Session, 'after_commit')
+def _count_cart_mutations(session):
+    for action in session.info.pop('cart_mutations', ()):
+        CART_MUTATIONS.labels(action).inc()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_cart_mutations(session):
+    session.info.pop('cart_mutations', None)
@@ -0,0 +1,86 @@
+"""
+Migraciones del esquema de la base de datos.
+
+``db.create_all()`` solo crea las tablas que faltan: no agrega índices ni
+columnas a tablas que ya existen. Las migraciones de esta lista se aplican
+en orden una sola vez por base de datos y quedan registradas en la tabla
+``schema_migrations``.
+
+Para agregar una migración, definir una función que reciba la conexión y
+añadirla al final de ``MIGRATIONS`` con un identificador nuevo.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+
+from . import db
+
+HOT_PATH_INDEXES = (
+    'ix_cart_customer_product',
+    'ix_cart_product',
+    'ix_order_customer_created',
+    'ix_order_item_order',
+    'ix_order_item_product',
+    'ix_product_in_stock_created',
+    'ix_product_category',
+    'ix_product_current_price',
+    'ix_product_stock_quantity',
+)
+
+
+def _create_hot_path_indexes(conn):
+    """Índices para las claves foráneas y columnas de orden más consultadas"""
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            if index.name in HOT_PATH_INDEXES:
+                index.create(conn, checkfirst=True)
+
+
+def _add_column(conn, table, column, ddl_type):
+    if column not in {c['name'] for c in inspect(conn).get_columns(table)}:
+        conn.execute(text(f'ALTER TABLE {table} ADD COLUMN {column} {ddl_type}'))
+
+
+def _add_product_picture_meta(conn):
+    """Dimensiones y miniaturas de la imagen del producto"""
+    _add_column(conn, 'product', 'picture_meta', 'TEXT')
+
+
+MIGRATIONS = [
+    ('0001_hot_path_indexes', _create_hot_path_indexes),
+    ('0002_product_picture_meta', _add_product_picture_meta),
+]
+
+
+def applied_migrations(conn):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version VARCHAR(100) PRIMARY KEY, applied_at TIMESTAMP NOT NULL)"
+    ))
+    return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def upgrade(engine=None):
+    """
+    Aplica las migraciones pendientes, cada una en su propia transacción.
+
+    Returns:
+        Lista con los identificadores de las migraciones aplicadas.
+    """
+    engine = engine or db.engine
+    with engine.begin() as conn:
+        done = applied_migrations(conn)
+
+    applied = []
+    for version, migrate in MIGRATIONS:
+        if version in done:
+            continue
+        with engine.begin() as conn:
+            migrate(conn)
+            conn.execute(
+                text("INSERT INTO schema_migrations (version, applied_at) VALUES (:version, :applied_at)"),
+                {'version': version, 'applied_at': datetime.utcnow()}
+            )
+        applied.append(version)
+    return applied
@@ -82,6 +82,11 @@ class Customer(db.Model, UserMixin):
 
 
 class Order(db.Model):
+    __table_args__ = (
+        # Historial de pedidos: WHERE customer_id = ? ORDER BY created_at DESC
+        db.Index('ix_order_customer_created', 'customer_id', 'created_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     customer_id = db.Column(db.Integer, db.ForeignKey('customer.id'), nullable=False)
     status = db.Column(db.String(20), default='pending')
@@ -96,6 +101,11 @@ class Order(db.Model):
 
 
 class OrderItem(db.Model):
+    __table_args__ = (
+        db.Index('ix_order_item_order', 'order_id'),
+        db.Index('ix_order_item_product', 'product_id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=False)
     product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False)
@@ -108,6 +118,12 @@ class OrderItem(db.Model):
 
 
 class Cart(db.Model):
+    __table_args__ = (
+        # Carrito del cliente y búsqueda de un producto dentro del carrito
+        db.Index('ix_cart_customer_product', 'customer_id', 'product_id'),
+        db.Index('ix_cart_product', 'product_id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     customer_id = db.Column(db.Integer, db.ForeignKey('customer.id'), nullable=False)
     product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False)
@@ -140,11 +156,45 @@ class Cart(db.Model):
         return '<Cart %r>' % self.id
 
 
+class OutboxMessage(db.Model):
+    """Correo pendiente de envío; lo entrega website/outbox.py fuera de la petición"""
+    __tablename__ = 'mail_outbox'
+    __table_args__ = (
+        # Próximos correos a enviar: WHERE status = ? AND next_attempt_at <= ?
+        db.Index('ix_mail_outbox_status_next', 'status', 'next_attempt_at'),
+        db.Index('ix_mail_outbox_claim', 'claim_token'),
+    )
 
+    id = db.Column(db.Integer, primary_key=True)
+    subject = db.Column(db.String(255), nullable=False)
+    sender = db.Column(db.String(150))
+    recipients = db.Column(db.Text, nullable=False)    # separados por coma
+    body = db.Column(db.Text)
+    html = db.Column(db.Text)
+    status = db.Column(db.String(20), default='pending', nullable=False)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    last_error = db.Column(db.Text)
+    claim_token = db.Column(db.String(32))
+    claimed_at = db.Column(db.DateTime)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
 
+    def __str__(self):
+        return '<OutboxMessage %r>' % self.id
 
 
+class AdminRecovery(db.Model):
+    """Recuperación de administrador en curso; la usa website/recovery.py"""
+    __tablename__ = 'admin_recovery'
 
+    # Una recuperación por correo: pedir un código nuevo reemplaza la anterior
+    email = db.Column(db.String(150), primary_key=True)
+    code_digest = db.Column(db.String(64), nullable=False)
+    reset_digest = db.Column(db.String(64))          # se fija al verificar el código
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
-
-
+    def __str__(self):
+        return '<AdminRecovery %r>' % self.email
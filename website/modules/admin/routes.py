@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app
+from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app, abort, send_from_directory
 from flask_login import login_required, current_user
 from werkzeug.utils import secure_filename
 import os
@@ -6,6 +6,7 @@ from ... import db
 from ...models import Order, Customer
 from ...modules.product.models import Product
 from ...forms import ShopItemsForm, CreateAdminForm
+from ...profiling import is_profile_name, list_profiles, profile_folder
 from werkzeug.security import generate_password_hash
 from datetime import datetime
 
@@ -138,5 +139,24 @@ def create_module():
         
         flash(f'Se ha quitado los privilegios de administrador a {admin_to_delete.username}', 'success')
         return redirect(url_for('admin.admin_management'))
+
+    @admin_bp.route('/profiles')
+    @login_required
+    def profiles():
+        if not current_user.is_admin:
+            flash('Acceso denegado. Se requiere ser administrador.', 'danger')
+            return redirect(url_for('views.home'))
+
+        return render_template('admin/profiles.html', profiles=list_profiles(),
+                               enabled='profiler' in current_app.extensions)
+
+    @admin_bp.route('/profiles/<filename>')
+    @login_required
+    def download_profile(filename):
+        if not current_user.is_admin:
+            abort(403)
+        if not is_profile_name(filename):
+            abort(404)
+        return send_from_directory(profile_folder(), filename, as_attachment=True)
     
     return admin_bp
@@ -5,10 +5,11 @@ from datetime import datetime, timedelta
 import re
 import os
 from itsdangerous import URLSafeTimedSerializer, SignatureExpired, BadSignature
-from flask_mail import Message
 from ... import db
+from ...metrics import FAILED_LOGINS
 from ...models import Customer
-from . import mail, serializer
+from ...outbox import queue_mail
+from . import serializer
 from .forms import (
     LoginForm, 
     SignUpForm, 
@@ -42,6 +43,7 @@ def login():
         user = Customer.query.filter_by(email=email).first()
         
         if not user or not check_password_hash(user.password_hash, password):
+            FAILED_LOGINS.inc()
             flash('Por favor verifica tus credenciales e intenta de nuevo.', 'error')
             return redirect(url_for('auth.login'))
             
@@ -85,21 +87,19 @@ def forgot_password():
                 token = serializer.dumps(user.email, salt='password-reset')
                 reset_url = url_for('auth.reset_password', token=token, _external=True)
                 
-                # Enviar correo electrónico
-                msg = Message(
+                # Encolar el correo; se envía fuera de la petición
+                queue_mail(
                     'Restablecer Contraseña',
-                    sender=current_app.config.get('MAIL_DEFAULT_SENDER'),
-                    recipients=[user.email]
-                )
-                msg.body = f'''Para restablecer tu contraseña, visita el siguiente enlace:
+                    recipients=[user.email],
+                    body=f'''Para restablecer tu contraseña, visita el siguiente enlace:
 {reset_url}
 
 Este enlace expirará en 1 hora.
 
 Si no solicitaste este restablecimiento, ignora este correo.
 '''
-                
-                mail.send(msg)
+                )
+                db.session.commit()
                 flash('Se ha enviado un correo con instrucciones para restablecer tu contraseña.', 'info')
                 return redirect(url_for('auth.login'))
                 
@@ -200,25 +200,20 @@ def signup():
             new_user.password = form.password.data  # Esto usará el setter para hashear la contraseña
             
             db.session.add(new_user)
-            db.session.commit()
-            
-            # Enviar correo de bienvenida
-            try:
-                msg = Message(
-                    '¡Bienvenido a Nuestra Tienda!',
-                    sender=current_app.config.get('MAIL_DEFAULT_SENDER'),
-                    recipients=[new_user.email]
-                )
-                msg.body = f'''¡Gracias por registrarte, {new_user.first_name}!
+
+            # Correo de bienvenida: se guarda junto con el usuario y se envía después
+            queue_mail(
+                '¡Bienvenido a Nuestra Tienda!',
+                recipients=[new_user.email],
+                body=f'''¡Gracias por registrarte, {new_user.username}!
 
 Ahora puedes disfrutar de todos los beneficios de nuestra tienda en línea.
 
 Atentamente,
 El equipo de la tienda'''
-                mail.send(msg)
-            except Exception as e:
-                current_app.logger.error(f"Error al enviar correo de bienvenida: {str(e)}")
-            
+            )
+            db.session.commit()
+
             # Iniciar sesión automáticamente
             login_user(new_user)
             
@@ -277,25 +272,20 @@ def change_password():
             current_user.password = form.new_password.data
             current_user.is_first_login = False
             current_user.password_changed_at = datetime.utcnow()
-            db.session.commit()
-            
-            # Enviar notificación por correo
-            try:
-                msg = Message(
-                    'Contraseña actualizada',
-                    sender=current_app.config.get('MAIL_DEFAULT_SENDER'),
-                    recipients=[current_user.email]
-                )
-                msg.body = f'''Hola {current_user.first_name or 'usuario'},
+
+            # Notificación por correo, en la misma transacción que el cambio
+            queue_mail(
+                'Contraseña actualizada',
+                recipients=[current_user.email],
+                body=f'''Hola {current_user.username or 'usuario'},
 
 Tu contraseña ha sido actualizada exitosamente. Si no realizaste este cambio, por favor contacta a soporte de inmediato.
 
 Atentamente,
 El equipo de la tienda'''
-                mail.send(msg)
-            except Exception as e:
-                current_app.logger.error(f"Error al enviar notificación de cambio de contraseña: {str(e)}")
-            
+            )
+            db.session.commit()
+
             flash('Tu contraseña ha sido actualizada exitosamente.', 'success')
             return redirect(url_for('views.profile'))
             
@@ -1,6 +1,10 @@
+import re
 from functools import wraps
 from flask import redirect, url_for, flash
 from flask_login import current_user
+from ... import db
+from ...outbox import queue_mail
+from . import serializer
 
 def admin_required(f):
     """
@@ -30,24 +34,24 @@ def validate_password(password):
 
 def send_reset_email(user_email):
     """
-    Envía un correo electrónico para restablecer la contraseña.
+    Encola el correo para restablecer la contraseña.
     """
     token = serializer.dumps(user_email, salt='password-reset-salt')
     reset_url = url_for('auth.reset_password', token=token, _external=True)
     
-    msg = Message('Restablecer Contraseña',
-                  sender='noreply@tutienda.com',
-                  recipients=[user_email])
-    
-    msg.body = f'''Para restablecer tu contraseña, visita el siguiente enlace:
+    queue_mail('Restablecer Contraseña',
+               recipients=[user_email],
+               sender='noreply@tutienda.com',
+               body=f'''Para restablecer tu contraseña, visita el siguiente enlace:
     {reset_url}
 
 Si no solicitaste este cambio, ignora este correo.
-'''
+''')
     
     try:
-        mail.send(msg)
+        db.session.commit()
         return True
     except Exception as e:
-        print(f"Error al enviar correo: {e}")
+        db.session.rollback()
+        print(f"Error al encolar correo: {e}")
         return False
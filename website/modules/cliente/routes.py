@@ -4,6 +4,7 @@ from . import cliente_bp
 from .models import db, DireccionEnvio, ListaDeseos, ProductoListaDeseos
 from website.models import Customer, Order, Cart, OrderItem
 from website.modules.product.models import Product
+from .services import CheckoutConflict, get_cart, get_cart_line, get_cart_totals, get_order_history, place_order as checkout
 import json
 
 @cliente_bp.route('/perfil')
@@ -16,10 +17,9 @@ def perfil():
 @login_required
 def pedidos():
     """Mostrar el historial de pedidos del cliente"""
-    pedidos = Order.query.filter_by(customer_id=current_user.id)\
-                         .order_by(Order.created_at.desc())\
-                         .all()
-    return render_template('cliente/pedidos.html', pedidos=pedidos)
+    page = request.args.get('page', 1, type=int)
+    pedidos = get_order_history(current_user.id, page=page)
+    return render_template('cliente/orders.html', orders=pedidos.items, pagination=pedidos)
 
 @cliente_bp.route('/carrito')
 @login_required
@@ -29,11 +29,8 @@ def carrito():
         flash('Los administradores no pueden acceder al carrito.', 'warning')
         return redirect(url_for('views.home'))
         
-    cart = Cart.query.filter_by(customer_id=current_user.id).all()
-    amount = 0
-    for item in cart:
-        amount = item.product.current_price + item.quantity
-    return render_template('cliente/cart.html', cart=cart, amount=amount, total=amount+200)
+    summary = get_cart(current_user.id)
+    return render_template('cliente/cart.html', cart=summary.lines, amount=summary.amount, total=summary.total)
 
 @cliente_bp.route('/agregar_al_carrito/<int:producto_id>', methods=['POST'])
 @login_required
@@ -86,8 +83,8 @@ def eliminar_del_carrito(item_id):
 def actualizar_carrito(item_id):
     """Actualizar la cantidad de un ítem en el carrito"""
     try:
-        item = Cart.query.get_or_404(item_id)
-        if item.customer_id != current_user.id:
+        item = get_cart_line(current_user.id, item_id)
+        if not item:
             return jsonify({'success': False, 'message': 'No autorizado'}), 403
         
         cantidad = int(request.form.get('cantidad', 1))
@@ -97,15 +94,15 @@ def actualizar_carrito(item_id):
             return jsonify({'success': True, 'message': 'Artículo eliminado'})
         
         item.quantity = cantidad
+        item.total_price = item.quantity * item.product.current_price
         db.session.commit()
         
         # Recalcular total
-        cart = Cart.query.filter_by(customer_id=current_user.id).all()
-        amount = sum(item.product.current_price + item.quantity for item in cart)
+        amount, total = get_cart_totals(current_user.id)
         return jsonify({
             'success': True,
             'subtotal': f"S/ {item.product.current_price * item.quantity:.2f}",
-            'total': f"S/ {amount + 200:.2f}",
+            'total': f"S/ {total:.2f}",
             'amount': f"S/ {amount:.2f}"
         })
     except Exception as e:
@@ -116,15 +113,11 @@ def actualizar_carrito(item_id):
 @login_required
 def plus_cart():
     if request.method == 'GET':
-        cart_id = request.args.get('cart_id')
-        cart_item = Cart.query.get(cart_id)
+        cart_item = get_cart_line(current_user.id, request.args.get('cart_id'))
         
         if not cart_item:
             return jsonify({'success': False, 'message': 'Ítem no encontrado'}), 404
             
-        if cart_item.customer_id != current_user.id:
-            return jsonify({'success': False, 'message': 'No autorizado'}), 403
-            
         # Verificar stock
         if cart_item.quantity >= cart_item.product.stock_quantity:
             return jsonify({
@@ -133,61 +126,56 @@ def plus_cart():
                 'status': 2  # Código para indicar stock insuficiente
             })
             
-        cart_item.quantity = cart_item.quantity
+        cart_item.quantity += 1
+        cart_item.total_price = cart_item.quantity * cart_item.product.current_price
         db.session.commit()
         
-        # Obtener el carrito actualizado
-        cart = Cart.query.filter_by(customer_id=current_user.id).all()
-        amount = sum(item.product.current_price + item.quantity for item in cart)
+        # Obtener el total actualizado
+        amount, total = get_cart_totals(current_user.id)
         
         return jsonify({
             'success': True,
             'quantity': cart_item.quantity,
             'amount': f"S/ {amount:.2f}",
-            'total': f"S/ {amount - 400:.2f}"
+            'total': f"S/ {total:.2f}"
         })
 
 @cliente_bp.route('/minuscart')
 @login_required
 def minus_cart():
     if request.method == 'GET':
-        cart_id = request.args.get('cart_id')
-        cart_item = Cart.query.get(cart_id)
+        cart_item = get_cart_line(current_user.id, request.args.get('cart_id'))
         
         if not cart_item:
             return jsonify({'success': False, 'message': 'Ítem no encontrado'}), 404
             
-        if cart_item.customer_id != current_user.id:
-            return jsonify({'success': False, 'message': 'No autorizado'}), 403
-            
         if cart_item.quantity > 1:
             cart_item.quantity -= 1
+            cart_item.total_price = cart_item.quantity * cart_item.product.current_price
             db.session.commit()
             
-            # Obtener el carrito actualizado
-            cart = Cart.query.filter_by(customer_id=current_user.id).all()
-            amount = sum(item.product.current_price * item.quantity for item in cart)
+            # Obtener el total actualizado
+            amount, total = get_cart_totals(current_user.id)
             
             return jsonify({
                 'success': True,
                 'quantity': cart_item.quantity,
                 'amount': f"S/ {amount:.2f}",
-                'total': f"S/ {amount + 200:.2f}"
+                'total': f"S/ {total:.2f}"
             })
         else:
             # Si la cantidad es 1, eliminar el ítem
             db.session.delete(cart_item)
             db.session.commit()
             
-            # Obtener el carrito actualizado
-            cart = Cart.query.filter_by(customer_id=current_user.id).all()
-            amount = sum(item.product.current_price * item.quantity for item in cart)
+            # Obtener el total actualizado
+            amount, total = get_cart_totals(current_user.id)
             
             return jsonify({
                 'success': True,
                 'quantity': 0,
                 'amount': f"S/ {amount:.2f}",
-                'total': f"S/ {amount + 200:.2f}",
+                'total': f"S/ {total:.2f}",
                 'removed': True
             })
 
@@ -195,26 +183,21 @@ def minus_cart():
 @login_required
 def remove_cart():
     if request.method == 'GET':
-        cart_id = request.args.get('cart_id')
-        cart_item = Cart.query.get(cart_id)
+        cart_item = get_cart_line(current_user.id, request.args.get('cart_id'))
         
         if not cart_item:
             return jsonify({'success': False, 'message': 'Ítem no encontrado'}), 404
             
-        if cart_item.customer_id != current_user.id:
-            return jsonify({'success': False, 'message': 'No autorizado'}), 403
-            
         db.session.delete(cart_item)
         db.session.commit()
         
-        # Obtener el carrito actualizado
-        cart = Cart.query.filter_by(customer_id=current_user.id).all()
-        amount = sum(item.product.current_price * item.quantity for item in cart)
+        # Obtener el total actualizado
+        amount, total = get_cart_totals(current_user.id)
         
         return jsonify({
             'success': True,
             'amount': f"S/ {amount:.2f}",
-            'total': f"S/ {amount + 200:.2f}",
+            'total': f"S/ {total:.2f}",
             'removed': True
         })
 
@@ -226,51 +209,25 @@ def place_order():
         flash('Los administradores no pueden realizar pedidos.', 'warning')
         return redirect(url_for('views.home'))
         
-    customer_cart = Cart.query.filter_by(customer_id=current_user.id).all()
-    if not customer_cart:
-        flash('Tu carrito está vacío', 'warning')
-        return redirect(url_for('cliente.carrito'))
-    
-    # Verificar stock antes de procesar el pedido
-    for item in customer_cart:
-        if item.quantity > item.product.stock_quantity:
-            flash(f'No hay suficiente stock para {item.product.product_name}. Stock disponible: {item.product.stock_quantity}', 'warning')
-            return redirect(url_for('cliente.carrito'))
-    
     try:
-        # Crear el pedido
-        order = Order(
-            customer_id=current_user.id,
-            total=sum(item.product.current_price * item.quantity for item in customer_cart) + 200,  # +200 por envío
-            status='Pendiente',
-            shipping_address=current_user.address,
-            payment_method='Contra entrega'  # Por defecto
-        )
-        db.session.add(order)
-        db.session.flush()  # Para obtener el ID del pedido
-        
-        # Agregar los ítems al pedido
-        for item in customer_cart:
-            order_item = OrderItem(
-                order_id=order.id,
-                product_id=item.product_id,
-                quantity=item.quantity,
-                price=item.product.current_price
-            )
-            db.session.add(order_item)
-            
-            # Actualizar el stock del producto
-            item.product.stock_quantity -= item.quantity
-        
-        # Vaciar el carrito
-        Cart.query.filter_by(customer_id=current_user.id).delete()
-        
-        db.session.commit()
-        flash('Pedido realizado exitosamente', 'success')
-        return redirect(url_for('cliente.pedidos'))
-        
+        order, failures = checkout(current_user.id, shipping_address=current_user.address)
+    except CheckoutConflict:
+        flash('Tu carrito o el stock cambiaron mientras se procesaba el pedido. Inténtalo de nuevo.', 'warning')
+        return redirect(url_for('cliente.carrito'))
     except Exception as e:
         db.session.rollback()
         print('Error al procesar el pedido:', e)
         flash('Error al procesar el pedido. Por favor, intente nuevamente.', 'error')
         return redirect(url_for('cliente.carrito'))
+
+    if failures:
+        for failure in failures:
+            flash(f'No hay suficiente stock para {failure["product_name"]}. Stock disponible: {failure["available"]}', 'warning')
+        return redirect(url_for('cliente.carrito'))
+
+    if not order:
+        flash('Tu carrito está vacío', 'warning')
+        return redirect(url_for('cliente.carrito'))
+
+    flash('Pedido realizado exitosamente', 'success')
+    return redirect(url_for('cliente.pedidos'))
@@ -0,0 +1,192 @@
+"""
+Servicios del carrito de compras.
+
+Todas las rutas del carrito (``views`` y ``cliente``) obtienen las líneas y
+los totales desde aquí, para que cada acción ejecute un número fijo de
+consultas sin importar cuántos productos tenga el carrito. El checkout
+(``place_order``) también vive aquí.
+"""
+
+from sqlalchemy import case, insert, update
+from sqlalchemy.orm import contains_eager, joinedload, selectinload
+
+from website import db
+from website.metrics import ORDERS_PLACED
+from website.models import Cart, Order, OrderItem
+from website.modules.product.models import Product
+
+# Costo fijo de envío que se suma al subtotal del carrito
+SHIPPING_COST = 200
+# Intentos del checkout cuando el stock cambió entre la lectura y el UPDATE
+CHECKOUT_ATTEMPTS = 2
+
+
+class CheckoutConflict(Exception):
+    """El carrito o el stock cambiaron durante el checkout y no hubo faltante que informar"""
+
+
+class CartSummary:
+    """Líneas del carrito con su producto ya cargado y los importes calculados"""
+
+    def __init__(self, lines, amount):
+        self.lines = lines
+        self.amount = amount
+        self.total = amount + SHIPPING_COST
+
+
+def _lines_query(customer_id):
+    return Cart.query.join(Cart.product)\
+                     .options(contains_eager(Cart.product))\
+                     .filter(Cart.customer_id == customer_id)
+
+
+def get_cart(customer_id):
+    """
+    Obtiene el carrito completo del cliente en una sola consulta.
+
+    Las líneas se cargan con un JOIN a ``product``, de modo que acceder a
+    ``line.product`` no dispara consultas adicionales.
+    """
+    lines = _lines_query(customer_id).order_by(Cart.id).all()
+    amount = sum(line.product.current_price * line.quantity for line in lines)
+    return CartSummary(lines, amount)
+
+
+def get_cart_line(customer_id, cart_id):
+    """Obtiene una línea del carrito (con su producto) si pertenece al cliente"""
+    if cart_id is None:
+        return None
+    try:
+        cart_id = int(cart_id)
+    except (TypeError, ValueError):
+        return None
+    return _lines_query(customer_id).filter(Cart.id == cart_id).first()
+
+
+def get_cart_totals(customer_id):
+    """
+    Calcula el subtotal del carrito con ``SUM(precio * cantidad)`` en SQL.
+
+    Returns:
+        Tupla ``(subtotal, total_con_envio)``.
+    """
+    amount = db.session.query(
+        db.func.coalesce(db.func.sum(Product.current_price * Cart.quantity), 0)
+    ).join(Cart.product).filter(Cart.customer_id == customer_id).scalar()
+    return amount, amount + SHIPPING_COST
+
+
+def place_order(customer_id, shipping_address=None):
+    """
+    Convierte el carrito del cliente en un pedido dentro de una sola transacción.
+
+    El stock se descuenta con un único ``UPDATE`` condicional
+    (``... WHERE stock_quantity >= cantidad``), de modo que dos compras
+    simultáneas no pueden vender más unidades de las disponibles. Si algún
+    producto no alcanza, se revierte todo y se informa cada producto afectado.
+
+    Returns:
+        Tupla ``(pedido, fallos)``. Si ``fallos`` no está vacío el pedido es
+        ``None``; cada fallo es un diccionario con ``product_name``,
+        ``requested`` y ``available``. ``(None, [])`` si el carrito está vacío.
+
+    Raises:
+        CheckoutConflict: Si el ``UPDATE`` no descontó todos los productos
+            pero al releer no falta stock (una reposición o un cambio del
+            carrito en paralelo) después de ``CHECKOUT_ATTEMPTS`` intentos.
+    """
+    for _ in range(CHECKOUT_ATTEMPTS):
+        order, failures = _try_place_order(customer_id, shipping_address)
+        if order is not None or failures is not None:
+            return order, failures
+    raise CheckoutConflict('El carrito cambió durante el checkout')
+
+
+def _try_place_order(customer_id, shipping_address):
+    """Un intento de ``place_order``; ``(None, None)`` si hay que reintentar"""
+    summary = get_cart(customer_id)
+    if not summary.lines:
+        return None, []
+
+    # Agrupar por producto por si el carrito tiene líneas repetidas
+    requested = {}
+    for line in summary.lines:
+        requested[line.product_id] = requested.get(line.product_id, 0) + line.quantity
+
+    quantity = case(requested, value=Product.id)
+    result = db.session.execute(
+        update(Product)
+        .where(Product.id.in_(requested), Product.stock_quantity >= quantity)
+        .values(
+            stock_quantity=Product.stock_quantity - quantity,
+            in_stock=(Product.stock_quantity - quantity) > 0
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+    if result.rowcount != len(requested):
+        db.session.rollback()
+        return None, _stock_failures(requested) or None
+
+    order = Order(
+        customer_id=customer_id,
+        status='pending',
+        total=summary.total,
+        shipping_address=shipping_address
+    )
+    db.session.add(order)
+    db.session.flush()
+
+    db.session.execute(insert(OrderItem), [
+        {
+            'order_id': order.id,
+            'product_id': line.product_id,
+            'quantity': line.quantity,
+            'price': line.product.current_price
+        }
+        for line in summary.lines
+    ])
+    # Solo las líneas que entraron al pedido: una agregada por otra petición
+    # después de leer el carrito se queda para el siguiente
+    Cart.query.filter(Cart.id.in_([line.id for line in summary.lines]))\
+              .delete(synchronize_session=False)
+
+    db.session.commit()
+    ORDERS_PLACED.inc()
+    return order, []
+
+
+def _stock_failures(requested):
+    """Consulta el stock actual de los productos pedidos y devuelve los insuficientes"""
+    rows = db.session.query(Product.id, Product.product_name, Product.stock_quantity)\
+                     .filter(Product.id.in_(requested)).all()
+    available = {row.id: row for row in rows}
+
+    failures = []
+    for product_id, quantity in requested.items():
+        row = available.get(product_id)
+        stock = row.stock_quantity if row else 0
+        if stock < quantity:
+            failures.append({
+                'product_name': row.product_name if row else f'#{product_id}',
+                'requested': quantity,
+                'available': stock
+            })
+    return failures
+
+
+ORDERS_PER_PAGE = 10
+
+
+def get_order_history(customer_id, page=1, per_page=ORDERS_PER_PAGE):
+    """
+    Obtiene una página del historial de pedidos del cliente.
+
+    Los ítems de todos los pedidos de la página se cargan con una sola
+    consulta ``selectin`` (con su producto en JOIN), así que cada página
+    cuesta unas tres consultas sin importar cuántos pedidos tenga el cliente.
+    """
+    return Order.query.options(selectinload(Order.items).joinedload(OrderItem.product))\
+                      .filter_by(customer_id=customer_id)\
+                      .order_by(Order.created_at.desc(), Order.id.desc())\
+                      .paginate(page=page, per_page=per_page, error_out=False)
@@ -5,6 +5,15 @@ from ..category.models import Category  # Importar Category desde el módulo de
 class Product(db.Model):
     """Modelo para los productos de la tienda"""
     __tablename__ = 'product'
+    __table_args__ = (
+        # Feed de la página de inicio: productos en stock por (created_at, id)
+        db.Index('ix_product_in_stock_created', 'created_at', 'id',
+                 sqlite_where=db.text('stock_quantity > 0'),
+                 postgresql_where=db.text('stock_quantity > 0')),
+        db.Index('ix_product_category', 'category_id', 'id'),
+        db.Index('ix_product_current_price', 'current_price'),
+        db.Index('ix_product_stock_quantity', 'stock_quantity'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     product_name = db.Column(db.String(100), nullable=False)
@@ -15,6 +24,8 @@ class Product(db.Model):
     stock_quantity = db.Column(db.Integer, default=0, nullable=False)
     flash_sale = db.Column(db.Boolean, default=False)
     product_picture = db.Column(db.String(200))
+    # Dimensiones y miniaturas de la imagen (JSON, ver website/images.py)
+    picture_meta = db.Column(db.Text)
     category_id = db.Column(db.Integer, db.ForeignKey('category.id'), nullable=False)
     created_by = db.Column(db.Integer, db.ForeignKey('customer.id'), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -27,6 +38,12 @@ class Product(db.Model):
     
     def __str__(self):
         return self.product_name
+
+    @property
+    def picture(self):
+        """Dimensiones y variantes de ``product_picture``; ``None`` si no se procesó"""
+        from ...images import load_meta
+        return load_meta(self.picture_meta)
     
     def to_dict(self):
         """Convierte el objeto a un diccionario"""
@@ -47,3 +64,14 @@ class Product(db.Model):
         }
 
 # La clase Category ha sido movida a website.modules.category.models
+
+
+class SearchTerm(db.Model):
+    """Vocabulario de los nombres de productos con su frecuencia de documento"""
+    __tablename__ = 'search_term'
+
+    term = db.Column(db.String(100), primary_key=True)
+    doc_freq = db.Column(db.Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f'<SearchTerm {self.term} ({self.doc_freq})>'
@@ -1,10 +1,11 @@
 from flask import Blueprint, render_template, request, flash, redirect, url_for, abort, current_app
 from flask_login import login_required, current_user
 from sqlalchemy import or_, desc, asc
-import os
-from werkzeug.utils import secure_filename
 from .models import Product, Category
+from .search import filter_products
 from ... import db
+from ...images import InvalidImageError, dump_meta, process_image
+from ...page_cache import cached_page
 
 # Crear el blueprint para productos
 product_blueprint = Blueprint('product', __name__, 
@@ -20,13 +21,9 @@ def product_list():
     
     # Búsqueda
     search_query = request.args.get('q', '')
+    rank = None
     if search_query:
-        products = Product.query.filter(
-            or_(
-                Product.product_name.ilike(f'%{search_query}%'),
-                Product.description.ilike(f'%{search_query}%')
-            )
-        )
+        products, rank = filter_products(Product.query, search_query)
     else:
         products = Product.query
     
@@ -38,6 +35,8 @@ def product_list():
         products = products.order_by(asc(Product.product_name) if order == 'asc' else desc(Product.product_name))
     elif sort == 'price':
         products = products.order_by(asc(Product.current_price) if order == 'asc' else desc(Product.current_price))
+    elif rank is not None and sort == 'relevance':
+        products = products.order_by(rank, Product.id.desc())
     else:
         products = products.order_by(Product.id.desc())
     
@@ -65,14 +64,15 @@ def add_product():
             product_picture = request.files.get('product_picture')
             picture_path = '/static/images/default.jpg'
             
+            picture_meta = None
             if product_picture and product_picture.filename:
-                filename = secure_filename(product_picture.filename)
-                # Crear directorio si no existe
-                os.makedirs(os.path.join(current_app.root_path, 'static', 'uploads', 'products'), exist_ok=True)
-                # Guardar el archivo
-                filepath = os.path.join(current_app.root_path, 'static', 'uploads', 'products', filename)
-                product_picture.save(filepath)
-                picture_path = f'/static/uploads/products/{filename}'
+                # Imagen sin metadatos, miniaturas y variantes WebP
+                try:
+                    picture_path, meta = process_image(product_picture)
+                except InvalidImageError as e:
+                    flash(str(e), 'error')
+                    return render_template('product/add.html', categories=categories)
+                picture_meta = dump_meta(meta)
             
             new_product = Product(
                 product_name=product_name,
@@ -81,6 +81,7 @@ def add_product():
                 previous_price=float(previous_price) if previous_price else 0,
                 in_stock=int(in_stock),
                 product_picture=picture_path,
+                picture_meta=picture_meta,
                 category_id=int(category_id) if category_id else None,
                 discount=float(discount) if discount else 0,
                 flash_sale=flash_sale
@@ -118,13 +119,13 @@ def edit_product(id):
             # Manejo de la carga de archivos
             product_picture = request.files.get('product_picture')
             if product_picture and product_picture.filename:
-                filename = secure_filename(product_picture.filename)
-                # Crear directorio si no existe
-                os.makedirs(os.path.join(current_app.root_path, 'static', 'uploads', 'products'), exist_ok=True)
-                # Guardar el archivo
-                filepath = os.path.join(current_app.root_path, 'static', 'uploads', 'products', filename)
-                product_picture.save(filepath)
-                product.product_picture = f'/static/uploads/products/{filename}'
+                try:
+                    product.product_picture, meta = process_image(product_picture)
+                except InvalidImageError as e:
+                    db.session.rollback()
+                    flash(str(e), 'error')
+                    return render_template('product/edit.html', product=product, categories=categories)
+                product.picture_meta = dump_meta(meta)
             
             db.session.commit()
             flash('¡Producto actualizado exitosamente!', 'success')
@@ -159,6 +160,7 @@ def delete_product(id):
         return redirect(url_for('product.product_list'))
 
 @product_blueprint.route('/detail/<int:id>')
+@cached_page
 def detail(id):
     product = Product.query.get_or_404(id)
     return render_template('product/detail.html', product=product)
@@ -175,13 +177,9 @@ def category_products(category_id):
     search_query = request.args.get('q', '')
     products = Product.query.filter_by(category_id=category_id)
     
+    rank = None
     if search_query:
-        products = products.filter(
-            or_(
-                Product.product_name.ilike(f'%{search_query}%'),
-                Product.description.ilike(f'%{search_query}%')
-            )
-        )
+        products, rank = filter_products(products, search_query)
     
     # Ordenamiento
     sort = request.args.get('sort', 'id')
@@ -191,6 +189,8 @@ def category_products(category_id):
         products = products.order_by(asc(Product.product_name) if order == 'asc' else desc(Product.product_name))
     elif sort == 'price':
         products = products.order_by(asc(Product.current_price) if order == 'asc' else desc(Product.current_price))
+    elif rank is not None and sort == 'relevance':
+        products = products.order_by(rank, Product.id.desc())
     else:
         products = products.order_by(Product.id.desc())
     
@@ -0,0 +1,211 @@
+"""
+Índice de búsqueda de texto completo para productos.
+
+En SQLite se usa una tabla virtual FTS5 (``product_fts``) que replica el
+nombre, la descripción y el nombre de la categoría de cada producto. Los
+triggers de la base de datos la mantienen sincronizada, y las búsquedas se
+ordenan por relevancia con ``bm25``. En otros motores, o si SQLite no trae
+FTS5, se vuelve a la búsqueda con ``ILIKE``.
+"""
+
+import re
+import weakref
+
+from sqlalchemy import Float, Integer, or_, text
+from sqlalchemy.exc import OperationalError
+
+from website import db
+from .models import Product, Category
+
+FTS_TABLE = 'product_fts'
+
+# Pesos de bm25 por columna: nombre, descripción, categoría
+BM25_WEIGHTS = (10.0, 1.0, 4.0)
+
+_SCHEMA = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        product_name, description, category_name,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS product_fts_ai AFTER INSERT ON product BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, product_name, description, category_name)
+        VALUES (new.id, new.product_name, new.description,
+                (SELECT name FROM category WHERE id = new.category_id));
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS product_fts_au
+        AFTER UPDATE OF product_name, description, category_id ON product BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+        INSERT INTO {FTS_TABLE}(rowid, product_name, description, category_name)
+        VALUES (new.id, new.product_name, new.description,
+                (SELECT name FROM category WHERE id = new.category_id));
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS product_fts_ad AFTER DELETE ON product BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS category_fts_au AFTER UPDATE OF name ON category BEGIN
+        UPDATE {FTS_TABLE} SET category_name = new.name
+        WHERE rowid IN (SELECT id FROM product WHERE category_id = new.id);
+    END""",
+]
+
+# Estado del índice por engine (True si la tabla FTS5 existe)
+_fts_enabled = weakref.WeakKeyDictionary()
+
+
+def ensure_search_index(engine):
+    """
+    Crea la tabla FTS5 y sus triggers si no existen y la llena si está vacía.
+
+    Returns:
+        True si el índice quedó disponible.
+    """
+    if engine.dialect.name != 'sqlite':
+        _fts_enabled[engine] = False
+        return False
+
+    try:
+        with engine.begin() as conn:
+            for statement in _SCHEMA:
+                conn.exec_driver_sql(statement)
+            indexed = conn.exec_driver_sql(f"SELECT count(*) FROM {FTS_TABLE}").scalar()
+            if not indexed:
+                rebuild_search_index(conn)
+    except OperationalError:
+        # SQLite compilado sin FTS5
+        _fts_enabled[engine] = False
+        return False
+
+    _fts_enabled[engine] = True
+    return True
+
+
+def rebuild_search_index(conn):
+    """Vuelve a poblar el índice a partir de las tablas ``product`` y ``category``"""
+    conn.exec_driver_sql(f"DELETE FROM {FTS_TABLE}")
+    conn.exec_driver_sql(
+        f"""INSERT INTO {FTS_TABLE}(rowid, product_name, description, category_name)
+            SELECT p.id, p.product_name, p.description, c.name
+            FROM product p LEFT JOIN category c ON c.id = p.category_id"""
+    )
+
+
+def fts_enabled():
+    """Indica si el engine actual tiene el índice FTS5 disponible"""
+    engine = db.engine
+    if engine not in _fts_enabled:
+        if engine.dialect.name != 'sqlite':
+            _fts_enabled[engine] = False
+        else:
+            with engine.connect() as conn:
+                _fts_enabled[engine] = conn.exec_driver_sql(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                    (FTS_TABLE,)
+                ).first() is not None
+    return _fts_enabled[engine]
+
+
+def build_match_expression(search_text):
+    """
+    Convierte el texto del usuario en una expresión MATCH segura.
+
+    Cada palabra se cita y se busca como prefijo, y todas deben aparecer
+    (``"tab"* "sam"*``), así que la sintaxis de FTS5 del usuario nunca se
+    interpreta.
+    """
+    terms = re.findall(r'\w+', search_text.lower())
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def match_products(search_text):
+    """
+    Subconsulta ``(product_id, rank)`` con los productos que coinciden.
+
+    ``rank`` es el valor de ``bm25``: cuanto menor, más relevante.
+    """
+    weights = ', '.join(str(w) for w in BM25_WEIGHTS)
+    return text(
+        f"SELECT rowid AS product_id, bm25({FTS_TABLE}, {weights}) AS rank "
+        f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match"
+    ).bindparams(match=build_match_expression(search_text))\
+     .columns(product_id=Integer, rank=Float)\
+     .subquery('fts')
+
+
+def filter_products(query, search_text, with_category=False):
+    """
+    Aplica la búsqueda de texto a una consulta de ``Product``.
+
+    Args:
+        query: Consulta de productos a filtrar.
+        search_text: Texto introducido por el usuario.
+        with_category: Si la consulta ya hace JOIN con ``Category``, incluir
+            también el nombre de la categoría en la búsqueda con ``ILIKE``.
+
+    Returns:
+        Tupla ``(consulta, columna_de_relevancia)``. La columna es ``None``
+        cuando no se usa FTS5; si no, ordenar por ella de forma ascendente.
+    """
+    if fts_enabled() and build_match_expression(search_text):
+        fts = match_products(search_text)
+        return query.join(fts, fts.c.product_id == Product.id), fts.c.rank
+
+    pattern = f'%{search_text}%'
+    conditions = [Product.product_name.ilike(pattern), Product.description.ilike(pattern)]
+    if with_category:
+        conditions.append(Category.name.ilike(pattern))
+    return query.filter(or_(*conditions)), None
+
+
+def related_searches(query, category_ids=(), limit=5):
+    """
+    Búsquedas relacionadas que se muestran junto a los resultados.
+
+    Combina la consulta con palabras de productos parecidos, la consulta
+    con una palabra menos y, si se filtró por categoría, los productos
+    recientes de esas categorías.
+    """
+    related = []
+
+    # 1. Búsquedas con palabras similares (usando búsqueda difusa)
+    if len(query) > 3:
+        # Buscar productos con nombres similares
+        similar_products = Product.query.filter(
+            Product.product_name.ilike(f"%{query}%")
+        ).limit(3).all()
+
+        for product in similar_products:
+            # Extraer palabras clave únicas del nombre del producto
+            product_words = set(word.lower() for word in product.product_name.split() if len(word) > 3)
+            query_words = set(word.lower() for word in query.split() if len(word) > 3)
+
+            # Añadir palabras del producto que no estén en la consulta
+            new_terms = list(product_words - query_words)
+            if new_terms:
+                related_search = f"{query} {new_terms[0]}"
+                if related_search not in related:
+                    related.append(related_search)
+
+    # 2. Búsquedas con una palabra menos (solo si no hay suficientes sugerencias)
+    if len(related) < 3 and len(query.split()) > 1:
+        words = query.split()
+        for i in range(min(3, len(words))):
+            shorter_query = ' '.join(words[:i] + words[i+1:])
+            if shorter_query and shorter_query not in related:
+                related.append(shorter_query)
+
+    # 3. Búsquedas populares en la misma categoría
+    if category_ids:
+        popular_in_category = Product.query.filter(
+            Product.category_id.in_(category_ids),
+            Product.product_name != query,
+            Product.in_stock > 0
+        ).order_by(
+            Product.created_at.desc()
+        ).limit(3).all()
+
+        for product in popular_in_category:
+            if len(related) < limit:  # Limitar el número total de sugerencias
+                related.append(product.product_name)
+
+    # Eliminar duplicados y limitar el número de sugerencias
+    return list(dict.fromkeys(related))[:limit]
@@ -0,0 +1,69 @@
+"""
+Servicios de consulta del catálogo de productos.
+
+Contiene la lógica de paginación por cursor (keyset) usada por el feed de la
+página de inicio, de modo que el costo de cada página no dependa del tamaño
+del catálogo.
+"""
+
+import base64
+import binascii
+from datetime import datetime
+
+from sqlalchemy import tuple_
+
+from .models import Product
+
+FEED_PAGE_SIZE = 24
+FEED_MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(product):
+    """Codifica la posición ``(created_at, id)`` de un producto como token opaco."""
+    raw = f"{product.created_at.isoformat()}|{product.id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(token):
+    """
+    Decodifica un token generado por ``encode_cursor``.
+
+    Returns:
+        Tupla ``(created_at, id)`` o ``None`` si el token no es válido.
+    """
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token.encode('ascii')).decode('utf-8')
+        created_at, product_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(product_id)
+    except (ValueError, UnicodeError, binascii.Error):
+        return None
+
+
+def get_product_feed(cursor=None, limit=FEED_PAGE_SIZE):
+    """
+    Obtiene una página de productos en stock, del más reciente al más antiguo.
+
+    La paginación usa la clave ``(created_at, id)`` en lugar de OFFSET, así que
+    cada página lee como máximo ``limit + 1`` filas.
+
+    Args:
+        cursor: Token devuelto en la página anterior (o ``None`` para la primera).
+        limit: Número de productos por página.
+
+    Returns:
+        Tupla ``(productos, siguiente_cursor)``; el cursor es ``None`` en la última página.
+    """
+    limit = max(1, min(limit or FEED_PAGE_SIZE, FEED_MAX_PAGE_SIZE))
+
+    query = Product.query.filter(Product.stock_quantity > 0)
+    position = decode_cursor(cursor)
+    if position:
+        query = query.filter(tuple_(Product.created_at, Product.id) < position)
+
+    rows = query.order_by(Product.created_at.desc(), Product.id.desc()).limit(limit + 1).all()
+
+    items = rows[:limit]
+    next_cursor = encode_cursor(items[-1]) if len(rows) > limit else None
+    return items, next_cursor
@@ -0,0 +1,246 @@
+"""
+Corrección ortográfica para el "Quizás quisiste decir" de la búsqueda.
+
+El vocabulario de los nombres de productos se guarda en la tabla
+``search_term`` junto con su frecuencia de documento (en cuántos productos
+aparece cada palabra). La tabla se mantiene en la misma transacción que
+crea, renombra o elimina productos.
+
+Para corregir una palabra se usa un índice en memoria al estilo SymSpell:
+cada término se registra bajo todas sus variantes con hasta
+``MAX_EDIT_DISTANCE`` letras borradas, y una consulta solo compara contra
+los términos que comparten alguna de esas variantes. El costo no depende
+del tamaño del catálogo.
+"""
+
+import threading
+import time
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import Session, object_session
+
+from website import db
+from .models import Product, SearchTerm
+
+MAX_EDIT_DISTANCE = 2
+MIN_WORD_LENGTH = 3
+# Palabras más largas no se corrigen: los borrados crecen con el cuadrado
+# de la longitud y la consulta llega sin filtrar desde /search
+MAX_WORD_LENGTH = 30
+
+_UPSERT = text(
+    "INSERT INTO search_term (term, doc_freq) VALUES (:term, :delta) "
+    "ON CONFLICT (term) DO UPDATE SET doc_freq = search_term.doc_freq + excluded.doc_freq"
+)
+_PRUNE = text("DELETE FROM search_term WHERE doc_freq <= 0")
+
+
+def product_terms(name):
+    """Palabras distintas (en minúsculas) que aporta el nombre de un producto"""
+    return {word.lower() for word in (name or '').split() if len(word) >= MIN_WORD_LENGTH}
+
+
+def deletes(word, distance=MAX_EDIT_DISTANCE):
+    """Todas las variantes de ``word`` con hasta ``distance`` letras borradas"""
+    results = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        results |= frontier
+    return results
+
+
+def edit_distance(a, b, max_distance=MAX_EDIT_DISTANCE):
+    """
+    Distancia de Damerau-Levenshtein (transposiciones adyacentes) entre
+    ``a`` y ``b``; devuelve ``max_distance + 1`` si se supera el límite.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous2 is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class SpellingIndex:
+    """Diccionario de borrados (SymSpell) sobre el vocabulario persistido"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._freq = {}       # término -> frecuencia de documento
+        self._deletes = {}    # variante -> {términos}
+        self._longest = 0     # longitud del término más largo registrado
+        self.built_at = 0.0
+
+    def rebuild(self):
+        """Carga el vocabulario desde ``search_term`` (una consulta)"""
+        rows = db.session.query(SearchTerm.term, SearchTerm.doc_freq).all()
+        fresh = SpellingIndex()
+        fresh.apply({term: freq for term, freq in rows})
+        with self._lock:
+            self._freq = fresh._freq
+            self._deletes = fresh._deletes
+            self._longest = fresh._longest
+            self.built_at = time.monotonic()
+
+    def apply(self, delta):
+        """Suma ``delta`` (término -> cambio de frecuencia) al índice"""
+        with self._lock:
+            for term, change in delta.items():
+                freq = self._freq.get(term, 0) + change
+                if freq > 0:
+                    if term not in self._freq:
+                        self._longest = max(self._longest, len(term))
+                        for variant in deletes(term):
+                            self._deletes.setdefault(variant, set()).add(term)
+                    self._freq[term] = freq
+                elif term in self._freq:
+                    del self._freq[term]
+                    for variant in deletes(term):
+                        terms = self._deletes[variant]
+                        terms.discard(term)
+                        if not terms:
+                            del self._deletes[variant]
+
+    def correct(self, word):
+        """
+        Término conocido más cercano a ``word``: primero la menor distancia
+        de edición y luego la mayor frecuencia. ``None`` si no hay ninguno.
+        """
+        word = word.lower()
+        with self._lock:
+            if word in self._freq:
+                return word
+            longest = self._longest
+        # Más allá del término más largo + MAX_EDIT_DISTANCE no hay candidatos
+        if len(word) > min(MAX_WORD_LENGTH, longest + MAX_EDIT_DISTANCE):
+            return None
+        # Las variantes se generan fuera del lock para no frenar otras búsquedas
+        variants = deletes(word)
+        with self._lock:
+            candidates = set()
+            for variant in variants:
+                candidates |= self._deletes.get(variant, set())
+            best = None
+            for term in candidates:
+                distance = edit_distance(word, term)
+                if distance <= MAX_EDIT_DISTANCE:
+                    key = (distance, -self._freq[term], term)
+                    if best is None or key < best:
+                        best = key
+            return best[2] if best else None
+
+
+def get_spelling_index():
+    """Índice de la aplicación actual, construido o refrescado si hace falta"""
+    index = current_app.extensions.get('spelling_index')
+    if index is None:
+        index = current_app.extensions['spelling_index'] = SpellingIndex()
+    ttl = current_app.config.get('SUGGESTIONS_INDEX_TTL', 300)
+    if not index.built_at or time.monotonic() - index.built_at > ttl:
+        index.rebuild()
+    return index
+
+
+def did_you_mean(query):
+    """Corrige cada palabra de 3 o más letras de la consulta; ``None`` si no hay nada"""
+    index = get_spelling_index()
+    suggested_terms = []
+    for word in query.lower().split():
+        if len(word) >= MIN_WORD_LENGTH:
+            match = index.correct(word)
+            if match:
+                suggested_terms.append(match)
+    return ' '.join(suggested_terms) or None
+
+
+def rebuild_search_terms():
+    """Recalcula ``search_term`` a partir de todos los nombres de productos"""
+    counts = {}
+    for (name,) in db.session.query(Product.product_name):
+        for term in product_terms(name):
+            counts[term] = counts.get(term, 0) + 1
+    SearchTerm.query.delete()
+    db.session.add_all(SearchTerm(term=term, doc_freq=freq) for term, freq in counts.items())
+    db.session.commit()
+
+
+def ensure_search_terms():
+    """Llena ``search_term`` si está vacía y ya hay productos"""
+    if not db.session.query(SearchTerm.term).first() and db.session.query(Product.id).first():
+        rebuild_search_terms()
+
+
+# -- Mantenimiento del vocabulario -------------------------------------------
+
+def _record(connection, target, delta):
+    delta = {term: change for term, change in delta.items() if change}
+    if not delta:
+        return
+    connection.execute(_UPSERT, [{'term': term, 'delta': change} for term, change in delta.items()])
+    if any(change < 0 for change in delta.values()):
+        connection.execute(_PRUNE)
+
+    session = object_session(target)
+    if session is not None:
+        pending = session.info.setdefault('spelling_changes', {})
+        for term, change in delta.items():
+            pending[term] = pending.get(term, 0) + change
+
+
+@event.listens_for(Product, 'after_insert')
+def _product_inserted(mapper, connection, target):
+    _record(connection, target, {term: 1 for term in product_terms(target.product_name)})
+
+
+@event.listens_for(Product.product_name, 'set', active_history=True)
+def _load_previous_name(target, value, oldvalue, initiator):
+    # active_history carga el nombre anterior aunque esté expirado, para
+    # poder descontar sus palabras en after_update
+    pass
+
+
+@event.listens_for(Product, 'after_update')
+def _product_updated(mapper, connection, target):
+    history = inspect(target).attrs.product_name.history
+    if not history.has_changes():
+        return
+    old_terms = set()
+    for name in history.deleted:
+        old_terms |= product_terms(name)
+    new_terms = product_terms(target.product_name)
+    delta = {term: -1 for term in old_terms - new_terms}
+    delta.update({term: 1 for term in new_terms - old_terms})
+    _record(connection, target, delta)
+
+
+@event.listens_for(Product, 'after_delete')
+def _product_deleted(mapper, connection, target):
+    _record(connection, target, {term: -1 for term in product_terms(target.product_name)})
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_changes(session):
+    changes = session.info.pop('spelling_changes', None)
+    if not changes or not has_app_context():
+        return
+    index = current_app.extensions.get('spelling_index')
+    if index is not None and index.built_at:
+        index.apply(changes)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changes(session):
+    session.info.pop('spelling_changes', None)
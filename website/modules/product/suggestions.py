@@ -0,0 +1,432 @@
+"""
+Índice en memoria para el autocompletado de la búsqueda.
+
+``/api/search/suggestions`` se llama en cada pulsación de tecla, así que las
+sugerencias se calculan sobre un índice local del proceso en lugar de ir a
+la base de datos:
+
+- Un trie con los nombres de productos, las palabras de esos nombres y los
+  nombres de categorías, para las coincidencias por prefijo.
+- Un índice de trigramas sobre los mismos términos, para las coincidencias
+  en medio de la palabra y para la búsqueda difusa.
+
+Cada nodo del trie guarda sus ``PREFIX_CANDIDATES`` mejores términos según
+la puntuación de una coincidencia por prefijo (que solo depende del término),
+así que un prefijo corto no recorre todo el subárbol ni se queda con los
+primeros que encuentra.
+
+El índice se construye en la primera petición y se actualiza al confirmar
+cada transacción que crea, modifica o elimina productos o categorías. Como
+cada worker de gunicorn tiene su propia copia, además se reconstruye
+cuando pasa ``SUGGESTIONS_INDEX_TTL`` segundos, para recoger los cambios
+hechos en otros procesos; esa reconstrucción corre en un hilo y mientras
+tanto las peticiones usan el índice anterior.
+"""
+
+import bisect
+import threading
+import time
+from difflib import SequenceMatcher
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from website import db
+from .models import Product, Category
+
+MAX_SUGGESTIONS = 8
+FUZZY_THRESHOLD = 5
+FUZZY_CUTOFF = 0.6
+# Mejores términos guardados en cada nodo del trie (más que MAX_SUGGESTIONS:
+# el término igual a la consulta se descarta)
+PREFIX_CANDIDATES = 32
+FUZZY_CANDIDATES = 64
+
+# Tipos de término
+NAME, WORD, CATEGORY = 'name', 'word', 'category'
+
+# Clave de la lista de mejores términos en cada nodo del trie (ningún carácter es '')
+_TOP = ''
+
+
+def calculate_relevance(term, source_term, is_category=False):
+    """Puntuación de una sugerencia: posición de la coincidencia, categoría y longitud"""
+    term = term.lower()
+    source_term = source_term.lower()
+
+    # Puntuación base basada en la posición de coincidencia
+    position = term.find(source_term)
+    if position == 0:
+        score = 1.0  # Coincidencia al inicio
+    else:
+        score = 0.5  # Coincidencia en otra parte
+
+    # Bonus por ser categoría
+    if is_category:
+        score += 0.2
+
+    # Bonus por longitud (preferir términos más largos)
+    score += min(0.3, len(term) * 0.02)
+
+    return score
+
+
+def trigrams(term):
+    return {term[i:i + 3] for i in range(len(term) - 2)}
+
+
+class _Term:
+    """Término indexado con las fuentes (producto/categoría) que lo aportan"""
+
+    __slots__ = ('display', 'kinds')
+
+    def __init__(self, display):
+        self.display = display
+        self.kinds = {}  # tipo -> número de fuentes
+
+    def add(self, kind):
+        self.kinds[kind] = self.kinds.get(kind, 0) + 1
+
+    def remove(self, kind):
+        self.kinds[kind] -= 1
+        if not self.kinds[kind]:
+            del self.kinds[kind]
+
+
+class SuggestionIndex:
+    """Trie + índice de trigramas sobre los términos del catálogo"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._terms = {}      # término en minúsculas -> _Term
+        self._sources = {}    # ('product'|'category', id) -> [(término, tipo)]
+        self._trie = {}
+        self._trigrams = {}   # trigrama -> {términos}
+        self._replay = None   # cambios recibidos durante una reconstrucción
+        self._rebuilding = None
+        self.built_at = 0.0
+
+    # -- Construcción ---------------------------------------------------------
+
+    def rebuild(self):
+        """Carga todos los productos y categorías (dos consultas)"""
+        with self._lock:
+            self._replay = []
+        try:
+            products = db.session.query(Product.id, Product.product_name).all()
+            categories = db.session.query(Category.id, Category.name).all()
+            fresh = SuggestionIndex()
+            for product_id, name in products:
+                fresh._add_source(('product', product_id), self._product_terms(name))
+            for category_id, name in categories:
+                fresh._add_source(('category', category_id), self._category_terms(name))
+        except Exception:
+            with self._lock:
+                self._replay = None
+            raise
+
+        with self._lock:
+            # Los commits que llegaron mientras se leía la base pueden no estar
+            # en la lectura: se vuelven a aplicar sobre el índice nuevo
+            for key, terms in self._replay:
+                fresh._remove_source(key)
+                if terms:
+                    fresh._add_source(key, terms)
+            self._replay = None
+            self._terms = fresh._terms
+            self._sources = fresh._sources
+            self._trie = fresh._trie
+            self._trigrams = fresh._trigrams
+            self.built_at = time.monotonic()
+
+    def rebuild_in_background(self, app):
+        """Reconstruye en un hilo (uno a la vez); devuelve el hilo"""
+        with self._lock:
+            thread = self._rebuilding
+            # Tras un fork el hilo del proceso padre no existe en el hijo
+            if thread is None or not thread.is_alive():
+                thread = self._rebuilding = threading.Thread(
+                    target=self._rebuild_for, args=(app,), name='suggestion-index', daemon=True)
+                thread.start()
+            return thread
+
+    def _rebuild_for(self, app):
+        try:
+            with app.app_context():
+                self.rebuild()
+        except Exception as e:
+            app.logger.error(f'Error al reconstruir el índice de sugerencias: {e}')
+
+    def update_product(self, product_id, name):
+        terms = self._product_terms(name) if name is not None else None
+        self._update(('product', product_id), terms)
+
+    def update_category(self, category_id, name):
+        terms = self._category_terms(name) if name is not None else None
+        self._update(('category', category_id), terms)
+
+    def _update(self, key, terms):
+        with self._lock:
+            self._remove_source(key)
+            if terms:
+                self._add_source(key, terms)
+            if self._replay is not None:
+                self._replay.append((key, terms))
+
+    @staticmethod
+    def _product_terms(name):
+        terms = [(name, NAME)] if name else []
+        terms.extend((word, WORD) for word in (name or '').split() if len(word) > 2)
+        return terms
+
+    @staticmethod
+    def _category_terms(name):
+        return [(name, CATEGORY)] if name else []
+
+    def _add_source(self, key, terms):
+        self._sources[key] = terms
+        for display, kind in terms:
+            term = display.lower()
+            entry = self._terms.get(term)
+            if entry is None:
+                entry = self._terms[term] = _Term(display)
+                entry.add(kind)
+                self._insert(term)
+            else:
+                rank = self._rank(term)
+                entry.add(kind)
+                if self._rank(term) != rank:
+                    self._rerank(term)
+
+    def _remove_source(self, key):
+        for display, kind in self._sources.pop(key, []):
+            term = display.lower()
+            entry = self._terms[term]
+            rank = self._rank(term)
+            entry.remove(kind)
+            if not entry.kinds:
+                del self._terms[term]
+                self._discard(term)
+            elif self._rank(term) != rank:
+                self._rerank(term)
+
+    def _rank(self, term):
+        """
+        Orden de ``suggest`` para una coincidencia por prefijo: la puntuación
+        de ``calculate_relevance`` con posición 0 solo depende del término
+        """
+        entry = self._terms[term]
+        score = calculate_relevance(entry.display, term, is_category=CATEGORY in entry.kinds)
+        return (-score, len(entry.display), term)
+
+    def _path(self, term):
+        path = [self._trie]
+        for char in term:
+            path.append(path[-1][char])
+        return path
+
+    def _insert(self, term):
+        node = self._trie
+        rank = self._rank(term)
+        for char in term:
+            self._push_top(node, rank)
+            node = node.setdefault(char, {})
+        self._push_top(node, rank)
+        node[None] = term
+        for gram in trigrams(term):
+            self._trigrams.setdefault(gram, set()).add(term)
+
+    @staticmethod
+    def _push_top(node, rank):
+        top = node.setdefault(_TOP, [])
+        if any(other[2] == rank[2] for other in top):
+            return
+        if len(top) < PREFIX_CANDIDATES or rank < top[-1]:
+            bisect.insort(top, rank)
+            del top[PREFIX_CANDIDATES:]
+
+    def _drop_top(self, term, path):
+        """Quita ``term`` de las listas del camino y las completa desde los hijos"""
+        for node in reversed(path):
+            top = node.get(_TOP, [])
+            if not any(rank[2] == term for rank in top):
+                break
+            full = len(top) >= PREFIX_CANDIDATES
+            top[:] = [rank for rank in top if rank[2] != term]
+            if full:
+                # Pudo quedar afuera un término del subárbol: se recalcula
+                candidates = [rank for char, child in node.items() if char not in (None, _TOP)
+                              for rank in child.get(_TOP, ())]
+                if None in node:
+                    candidates.append(self._rank(node[None]))
+                top[:] = sorted(candidates)[:PREFIX_CANDIDATES]
+            if not top:
+                del node[_TOP]
+
+    def _rerank(self, term):
+        path = self._path(term)
+        self._drop_top(term, path)
+        rank = self._rank(term)
+        for node in path:
+            self._push_top(node, rank)
+
+    def _discard(self, term):
+        path = self._path(term)
+        del path[-1][None]
+        self._drop_top(term, path)
+        # Podar las ramas que quedaron vacías
+        for depth in range(len(term), 0, -1):
+            if path[depth]:
+                break
+            del path[depth - 1][term[depth - 1]]
+        for gram in trigrams(term):
+            terms = self._trigrams[gram]
+            terms.discard(term)
+            if not terms:
+                del self._trigrams[gram]
+
+    # -- Consultas ------------------------------------------------------------
+
+    def _prefix_terms(self, prefix):
+        node = self._trie
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return []
+        return [rank[2] for rank in node.get(_TOP, ())]
+
+    def _infix_terms(self, query):
+        grams = trigrams(query)
+        if not grams:
+            return []
+        postings = sorted((self._trigrams.get(gram, set()) for gram in grams), key=len)
+        candidates = set.intersection(*postings) if postings[0] else set()
+        return [term for term in candidates if query in term]
+
+    def suggest(self, query, limit=MAX_SUGGESTIONS):
+        """
+        Devuelve hasta ``limit`` sugerencias para ``query`` (ya en minúsculas),
+        con las mismas reglas de puntuación que ``calculate_relevance``.
+        """
+        with self._lock:
+            suggestions = {}
+            for term in set(self._prefix_terms(query)) | set(self._infix_terms(query)):
+                entry = self._terms[term]
+                for kind in entry.kinds:
+                    if kind == WORD and term == query:
+                        continue
+                    score = calculate_relevance(entry.display, query, is_category=kind == CATEGORY)
+                    suggestions[entry.display] = max(score, suggestions.get(entry.display, 0))
+
+            sorted_suggestions = sorted(suggestions.items(), key=lambda x: (-x[1], len(x[0])))
+
+            unique_suggestions = []
+            seen_terms = set()
+            for term, _ in sorted_suggestions:
+                term_lower = term.lower()
+                if term_lower not in seen_terms and term_lower != query:
+                    unique_suggestions.append(term)
+                    seen_terms.add(term_lower)
+                    if len(unique_suggestions) >= limit:
+                        break
+
+            # Si hay pocas sugerencias, completar con palabras parecidas
+            if len(unique_suggestions) < FUZZY_THRESHOLD and len(query) > 2:
+                for match in self.close_words(query, n=5):
+                    if match not in seen_terms:
+                        unique_suggestions.append(match)
+                        seen_terms.add(match)
+                        if len(unique_suggestions) >= limit:
+                            break
+
+            return unique_suggestions
+
+    def close_words(self, word, n=5, cutoff=FUZZY_CUTOFF):
+        """
+        Equivalente a ``difflib.get_close_matches`` sobre las palabras de los
+        nombres de productos, pero comparando solo con los términos que
+        comparten trigramas con ``word``.
+        """
+        with self._lock:
+            shared = {}
+            for gram in trigrams(word):
+                for term in self._trigrams.get(gram, ()):
+                    if WORD in self._terms[term].kinds:
+                        shared[term] = shared.get(term, 0) + 1
+            candidates = sorted(shared, key=shared.get, reverse=True)[:FUZZY_CANDIDATES]
+
+        matcher = SequenceMatcher()
+        matcher.set_seq2(word)
+        scored = []
+        for term in candidates:
+            matcher.set_seq1(term)
+            if matcher.real_quick_ratio() >= cutoff and matcher.quick_ratio() >= cutoff:
+                ratio = matcher.ratio()
+                if ratio >= cutoff:
+                    scored.append((ratio, term))
+        scored.sort(reverse=True)
+        return [term for _, term in scored[:n]]
+
+
+def get_suggestion_index():
+    """Índice de la aplicación actual, construido o refrescado si hace falta"""
+    index = current_app.extensions.get('suggestion_index')
+    if index is None:
+        index = current_app.extensions['suggestion_index'] = SuggestionIndex()
+    ttl = current_app.config.get('SUGGESTIONS_INDEX_TTL', 300)
+    if not index.built_at:
+        index.rebuild()
+    elif time.monotonic() - index.built_at > ttl:
+        index.rebuild_in_background(current_app._get_current_object())
+    return index
+
+
+# -- Sincronización con la base de datos -------------------------------------
+
+def _pending(session):
+    return session.info.setdefault('suggestion_changes', [])
+
+
+def _changed(obj, attr):
+    return inspect(obj).attrs[attr].history.has_changes()
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changes(session, flush_context):
+    changes = _pending(session)
+    for obj in session.new:
+        if isinstance(obj, Product):
+            changes.append(('product', obj.id, obj.product_name))
+        elif isinstance(obj, Category):
+            changes.append(('category', obj.id, obj.name))
+    for obj in session.dirty:
+        if isinstance(obj, Product) and _changed(obj, 'product_name'):
+            changes.append(('product', obj.id, obj.product_name))
+        elif isinstance(obj, Category) and _changed(obj, 'name'):
+            changes.append(('category', obj.id, obj.name))
+    for obj in session.deleted:
+        if isinstance(obj, Product):
+            changes.append(('product', obj.id, None))
+        elif isinstance(obj, Category):
+            changes.append(('category', obj.id, None))
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_changes(session):
+    changes = session.info.pop('suggestion_changes', None)
+    if not changes:
+        return
+    index = current_app.extensions.get('suggestion_index') if has_app_context() else None
+    if index is None or not index.built_at:
+        return
+    for kind, obj_id, name in changes:
+        if kind == 'product':
+            index.update_product(obj_id, name)
+        else:
+            index.update_category(obj_id, name)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changes(session):
+    session.info.pop('suggestion_changes', None)
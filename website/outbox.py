@@ -0,0 +1,260 @@
+"""
+Bandeja de salida de correos.
+
+Las vistas no hablan con el servidor SMTP: ``queue_mail`` guarda el correo
+en la tabla ``mail_outbox`` dentro de la misma transacción de la petición,
+y un hilo en segundo plano (o el comando ``flask mail-worker``) lo entrega
+después del commit. Cada lote de correos se envía por una sola conexión
+SMTP; si un envío falla se reintenta con espera exponencial hasta
+``MAIL_OUTBOX_MAX_ATTEMPTS`` veces.
+
+Configuración:
+    MAIL_OUTBOX_WORKER: ``'thread'`` (por defecto) entrega desde cada proceso
+        web; ``'off'`` deja la entrega a ``flask mail-worker``. En las
+        pruebas (``TESTING``) el hilo no se inicia.
+    MAIL_OUTBOX_BATCH_SIZE, MAIL_OUTBOX_POLL_INTERVAL,
+    MAIL_OUTBOX_MAX_ATTEMPTS, MAIL_OUTBOX_RETRY_DELAY
+
+El hilo arranca con el proceso (``start_outbox_worker``: ``run.py``,
+``run_production.py`` y el hook ``post_worker_init`` de ``gunicorn.conf.py``,
+ya dentro de cada worker) y lo primero que hace es vaciar los correos
+pendientes o con reintento vencido que dejó el despliegue anterior.
+"""
+
+import os
+import smtplib
+import threading
+import uuid
+from datetime import datetime, timedelta
+
+from flask import current_app, has_app_context
+from flask_mail import Message
+from sqlalchemy import event, or_, select, update
+from sqlalchemy.orm import Session
+
+from . import db, mail
+from .models import OutboxMessage
+
+MAIL_OUTBOX_BATCH_SIZE = 50
+MAIL_OUTBOX_POLL_INTERVAL = 30        # segundos entre revisiones de la bandeja
+MAIL_OUTBOX_MAX_ATTEMPTS = 5
+MAIL_OUTBOX_RETRY_DELAY = 30          # segundos; se duplica en cada intento
+MAIL_OUTBOX_MAX_RETRY_DELAY = 3600
+# Un correo "sending" más viejo que esto quedó de un proceso que murió
+MAIL_OUTBOX_CLAIM_TIMEOUT = timedelta(minutes=10)
+
+# Errores que dejan inutilizable la conexión SMTP: se reprograma el resto del lote
+_CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+
+def queue_mail(subject, recipients, body=None, html=None, sender=None):
+    """
+    Agrega un correo a la bandeja de salida de la sesión actual.
+
+    Se guarda con el siguiente ``db.session.commit()`` de la vista y se
+    entrega después, fuera de la petición.
+    """
+    if isinstance(recipients, str):
+        recipients = [recipients]
+    message = OutboxMessage(
+        subject=subject,
+        sender=sender or current_app.config.get('MAIL_DEFAULT_SENDER'),
+        recipients=','.join(recipients),
+        body=body,
+        html=html,
+        next_attempt_at=datetime.utcnow(),
+    )
+    db.session.add(message)
+    db.session.info['outbox_queued'] = True
+    return message
+
+
+def retry_delay(attempts):
+    """Espera antes del siguiente intento: 30 s, 60 s, 120 s... hasta 1 hora"""
+    base = current_app.config.get('MAIL_OUTBOX_RETRY_DELAY', MAIL_OUTBOX_RETRY_DELAY)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), MAIL_OUTBOX_MAX_RETRY_DELAY))
+
+
+def claim_batch(limit=None):
+    """
+    Marca como ``sending`` hasta ``limit`` correos listos para enviar y los
+    devuelve. El token de reclamo evita que dos procesos tomen el mismo correo.
+    """
+    limit = limit or current_app.config.get('MAIL_OUTBOX_BATCH_SIZE', MAIL_OUTBOX_BATCH_SIZE)
+    now = datetime.utcnow()
+    token = uuid.uuid4().hex
+    claimable = or_(
+        (OutboxMessage.status == 'pending') & (OutboxMessage.next_attempt_at <= now),
+        (OutboxMessage.status == 'sending') & (OutboxMessage.claimed_at < now - MAIL_OUTBOX_CLAIM_TIMEOUT),
+    )
+    ready = (
+        select(OutboxMessage.id)
+        .where(claimable)
+        .order_by(OutboxMessage.next_attempt_at, OutboxMessage.id)
+        .limit(limit)
+        .scalar_subquery()
+    )
+    db.session.execute(
+        update(OutboxMessage)
+        # La condición se repite afuera: en PostgreSQL (READ COMMITTED) dos
+        # procesos pueden leer los mismos ids en la subconsulta, pero al
+        # tomar el bloqueo de la fila se vuelve a evaluar el WHERE y el
+        # segundo ya no la ve reclamable
+        .where(OutboxMessage.id.in_(ready), claimable)
+        .values(status='sending', claim_token=token, claimed_at=now),
+        execution_options={'synchronize_session': False},
+    )
+    db.session.commit()
+    return OutboxMessage.query.filter_by(claim_token=token).order_by(OutboxMessage.id).all()
+
+
+def _to_message(outbox_message):
+    return Message(
+        subject=outbox_message.subject,
+        sender=outbox_message.sender,
+        recipients=outbox_message.recipients.split(','),
+        body=outbox_message.body,
+        html=outbox_message.html,
+    )
+
+
+def _mark_failed(outbox_message, error):
+    max_attempts = current_app.config.get('MAIL_OUTBOX_MAX_ATTEMPTS', MAIL_OUTBOX_MAX_ATTEMPTS)
+    outbox_message.attempts += 1
+    outbox_message.last_error = str(error)[:1000]
+    outbox_message.claim_token = None
+    if outbox_message.attempts >= max_attempts:
+        outbox_message.status = 'failed'
+        current_app.logger.error(f'Correo {outbox_message.id} descartado tras {outbox_message.attempts} intentos: {error}')
+    else:
+        outbox_message.status = 'pending'
+        outbox_message.next_attempt_at = datetime.utcnow() + retry_delay(outbox_message.attempts)
+
+
+def _release(outbox_message):
+    # No se llegó a intentar: vuelve a la bandeja sin contar un intento
+    outbox_message.status = 'pending'
+    outbox_message.claim_token = None
+
+
+def deliver_pending(limit=None):
+    """
+    Envía un lote de la bandeja de salida por una sola conexión SMTP.
+
+    Returns:
+        Tupla ``(enviados, fallidos)`` del lote.
+    """
+    batch = claim_batch(limit)
+    if not batch:
+        return 0, 0
+
+    sent = failed = 0
+    try:
+        with mail.connect() as connection:
+            for index, outbox_message in enumerate(batch):
+                try:
+                    connection.send(_to_message(outbox_message))
+                except _CONNECTION_ERRORS as e:
+                    # La conexión se cayó: el intento cuenta solo para este
+                    # correo; el resto del lote vuelve a la bandeja
+                    _mark_failed(outbox_message, e)
+                    failed += 1
+                    for pending in batch[index + 1:]:
+                        _release(pending)
+                    break
+                except Exception as e:
+                    _mark_failed(outbox_message, e)
+                    failed += 1
+                else:
+                    outbox_message.status = 'sent'
+                    outbox_message.sent_at = datetime.utcnow()
+                    outbox_message.claim_token = None
+                    sent += 1
+    except Exception as e:
+        # No se pudo conectar (o cerrar) con el servidor SMTP
+        current_app.logger.warning(f'Error de conexión SMTP: {e}')
+        for outbox_message in batch:
+            if outbox_message.status == 'sending':
+                _mark_failed(outbox_message, e)
+                failed += 1
+    db.session.commit()
+    return sent, failed
+
+
+def drain(limit=None):
+    """Envía lotes hasta que no quede nada listo; devuelve el total enviado"""
+    total = 0
+    while True:
+        sent, failed = deliver_pending(limit)
+        total += sent
+        if not sent and not failed:
+            return total
+
+
+# -- Envío en segundo plano --------------------------------------------------
+
+class OutboxWorker:
+    """Hilo que vacía la bandeja al recibir aviso o cada ``poll_interval`` segundos"""
+
+    def __init__(self, app):
+        self.app = app
+        self.poll_interval = app.config.get('MAIL_OUTBOX_POLL_INTERVAL', MAIL_OUTBOX_POLL_INTERVAL)
+        self.pid = os.getpid()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='mail-outbox', daemon=True)
+        self._thread.start()
+
+    def notify(self):
+        self._wakeup.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+
+    @property
+    def alive(self):
+        # Tras un fork (gunicorn --preload) el hilo no existe en el proceso hijo
+        return self.pid == os.getpid() and self._thread.is_alive()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                with self.app.app_context():
+                    drain()
+            except Exception as e:
+                self.app.logger.error(f'Error en el envío de la bandeja de correo: {e}')
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+
+def get_outbox_worker(app):
+    """Hilo de envío del proceso actual; lo inicia si no está corriendo"""
+    if app.testing or app.config.get('MAIL_OUTBOX_WORKER', 'thread') != 'thread':
+        return None
+    worker = app.extensions.get('outbox_worker')
+    if worker is None or not worker.alive:
+        worker = app.extensions['outbox_worker'] = OutboxWorker(app)
+    return worker
+
+
+def start_outbox_worker(app):
+    """
+    Inicia el hilo al arrancar el proceso para entregar lo que quedó
+    pendiente. Con gunicorn llamarlo después del fork (``post_worker_init``).
+    """
+    return get_outbox_worker(app)
+
+
+@event.listens_for(Session, 'after_commit')
+def _notify_worker(session):
+    if not session.info.pop('outbox_queued', False) or not has_app_context():
+        return
+    worker = get_outbox_worker(current_app._get_current_object())
+    if worker is not None:
+        worker.notify()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_notification(session):
+    session.info.pop('outbox_queued', None)
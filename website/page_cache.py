@@ -0,0 +1,198 @@
+"""
+Caché de páginas completas para visitantes anónimos.
+
+Las vistas públicas del catálogo (inicio, búsqueda, listados, categorías y
+detalle de producto) devuelven el mismo HTML a todos los anónimos, así que
+se guardan enteras con ``@cached_page``. La clave es la ruta, los
+parámetros de la consulta normalizados (ordenados, sin valores vacíos ni
+los de campañas como ``utm_*``) y la versión del catálogo.
+
+Cada respuesta lleva un ``ETag`` fuerte (hash del HTML) y
+``Cache-Control: no-cache``: el navegador o el rastreador vuelve a preguntar
+con ``If-None-Match`` y recibe un 304 sin cuerpo si nada cambió.
+
+La versión del catálogo es un token guardado en el mismo backend. Cualquier
+alta, edición o baja de un ``Product`` o una ``Category`` lo borra al
+confirmar la transacción, incluidos los ``UPDATE`` directos como el
+descuento de stock del checkout; con eso todas las páginas dejan de
+coincidir a la vez.
+
+No se guarda nada para usuarios con sesión iniciada, peticiones que no sean
+GET/HEAD, respuestas distintas de 200 ni páginas que modifiquen la sesión
+(mensajes ``flash``, tokens CSRF).
+
+Backends (``PAGE_CACHE``, por defecto el mismo tipo que ``FRAGMENT_CACHE``):
+``'lru'`` por proceso, con vencimiento ``PAGE_CACHE_TIMEOUT``; ``'shared'``
+sobre el almacén de ``FRAGMENT_CACHE_CLIENT``/``FRAGMENT_CACHE_URL``, y
+``'null'`` para desactivarla. Con ``'lru'`` los otros procesos ven los
+cambios del catálogo recién al vencer sus entradas.
+"""
+
+import hashlib
+import json
+import uuid
+from functools import wraps
+from urllib.parse import urlencode
+
+from flask import current_app, has_app_context, make_response, request, session
+from flask_login import current_user
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from .fragments import create_backend
+from .metrics import record_cache
+from .modules.product.models import Category, Product
+
+PAGE_CACHE_SIZE = 500
+PAGE_CACHE_TIMEOUT = 60                 # segundos
+# Parámetros que no cambian la página (seguimiento de campañas)
+IGNORED_ARGS = ('fbclid', 'gclid')
+IGNORED_PREFIXES = ('utm_',)
+
+VERSION_KEY = 'catalog_version'
+
+
+class PageCache:
+    """Páginas renderizadas y versión del catálogo sobre un backend de ``fragments``"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    def catalog_version(self):
+        version = self.backend.get(VERSION_KEY)
+        if version is None:
+            version = uuid.uuid4().hex[:12]
+            self.backend.set(VERSION_KEY, version)
+        return version
+
+    def bump(self):
+        """Invalida todas las páginas guardadas"""
+        self.backend.delete(VERSION_KEY)
+
+    def get(self, key):
+        value = self.backend.get(key)
+        record_cache('page', value is not None)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(value)
+
+    def set(self, key, entry):
+        self.backend.set(key, json.dumps(entry))
+
+
+def get_page_cache(app=None):
+    app = app or current_app
+    cache = app.extensions.get('page_cache')
+    if cache is None:
+        backend = create_backend(
+            app, 'page:',
+            app.config.get('PAGE_CACHE_SIZE', PAGE_CACHE_SIZE),
+            app.config.get('PAGE_CACHE_TIMEOUT', PAGE_CACHE_TIMEOUT),
+            kind=app.config.get('PAGE_CACHE'),
+        )
+        cache = app.extensions['page_cache'] = PageCache(backend)
+    return cache
+
+
+def normalized_query():
+    """Parámetros de la consulta ordenados, sin vacíos ni los de seguimiento"""
+    items = sorted(
+        (name, value)
+        for name, values in request.args.lists()
+        if name not in IGNORED_ARGS and not name.startswith(IGNORED_PREFIXES)
+        for value in values if value != ''
+    )
+    return urlencode(items)
+
+
+def page_key(cache):
+    raw = f'{request.path}?{normalized_query()}|{cache.catalog_version()}'
+    return 'page:' + hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def _cacheable_request():
+    return (request.method in ('GET', 'HEAD')
+            and not current_user.is_authenticated
+            and '_flashes' not in session)
+
+
+def _finish(response, etag, state):
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    response.vary.add('Cookie')
+    response.headers['X-Page-Cache'] = state
+    return response.make_conditional(request)
+
+
+def cached_page(view):
+    """Guarda la página completa de ``view`` para los visitantes anónimos"""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not _cacheable_request():
+            return view(*args, **kwargs)
+
+        cache = get_page_cache()
+        key = page_key(cache)
+        entry = cache.get(key)
+        if entry is not None:
+            response = current_app.response_class(entry['body'], status=entry['status'],
+                                                  content_type=entry['content_type'])
+            return _finish(response, entry['etag'], 'HIT')
+
+        response = make_response(view(*args, **kwargs))
+        if response.status_code != 200 or response.direct_passthrough:
+            return response
+        body = response.get_data(as_text=True)
+        etag = hashlib.sha256(body.encode('utf-8')).hexdigest()[:32]
+        # Una página que tocó la sesión (flash, CSRF) es propia de este visitante
+        if not session.modified and 'Set-Cookie' not in response.headers:
+            cache.set(key, {
+                'etag': etag,
+                'status': response.status_code,
+                'content_type': response.content_type,
+                'body': body,
+            })
+        return _finish(response, etag, 'MISS')
+
+    return wrapper
+
+
+# -- Versión del catálogo -----------------------------------------------------
+
+def _record(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info['catalog_changed'] = True
+
+
+for _model in (Product, Category):
+    for _name in ('after_insert', 'after_update', 'after_delete'):
+        event.listen(_model, _name, _record)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _record_bulk(orm_execute_state):
+    # UPDATE/DELETE directos (el stock del checkout) no pasan por los eventos del mapper
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ in (Product, Category):
+        orm_execute_state.session.info['catalog_changed'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _bump_version(session):
+    if not session.info.pop('catalog_changed', False) or not has_app_context():
+        return
+    # Aunque este proceso no haya servido páginas: con 'shared' otros sí
+    get_page_cache().bump()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changes(session):
+    session.info.pop('catalog_changed', None)
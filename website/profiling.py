@@ -0,0 +1,244 @@
+"""
+Perfiles por muestreo de las peticiones lentas.
+
+Desactivado por defecto; se enciende con ``PROFILE_SLOW_REQUESTS = True`` en
+la configuración o la variable de entorno ``PROFILE_SLOW_REQUESTS=1``.
+Una fracción de las peticiones de cada endpoint (``PROFILE_SAMPLE_RATES``,
+o ``PROFILE_SAMPLE_RATE`` para los demás) se muestrea: un único thread del
+proceso toma la pila del thread que atiende la petición cada
+``PROFILE_INTERVAL`` segundos. Si la petición tarda ``PROFILE_THRESHOLD_MS``
+o más, las muestras se guardan en ``instance/profiles/``; si no, se
+descartan.
+
+Formatos (``PROFILE_FORMAT``):
+    ``'speedscope'`` (por defecto): JSON para https://www.speedscope.app.
+    ``'collapsed'``: una línea ``marco;marco;marco cantidad`` por pila, para
+        ``flamegraph.pl`` o speedscope.
+
+Sin peticiones muestreadas el thread queda dormido, y con el perfilador
+apagado no se registra ningún hook. Se conservan los ``PROFILE_KEEP``
+perfiles más recientes; el panel de administración los lista en
+``/admin/profiles``.
+"""
+
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+
+from flask import current_app, g, request
+
+PROFILE_SLOW_REQUESTS = False
+PROFILE_THRESHOLD_MS = 500
+PROFILE_INTERVAL = 0.005                # segundos entre muestras
+PROFILE_SAMPLE_RATE = 0.1               # fracción de peticiones muestreadas
+# Endpoints sospechosos: se muestrean siempre
+PROFILE_SAMPLE_RATES = {
+    'views.search': 1.0,
+    'views.place_order': 1.0,
+    'cliente.place_order': 1.0,
+}
+PROFILE_FORMAT = 'speedscope'
+PROFILE_KEEP = 100
+
+EXTENSIONS = {'speedscope': '.speedscope.json', 'collapsed': '.collapsed.txt'}
+# 20261018-125620-views.search-812ms.speedscope.json
+_PROFILE_NAME = re.compile(r'^(\d{8}-\d{6})-([\w.]+)-(\d+)ms(\.speedscope\.json|\.collapsed\.txt)$')
+_UNSAFE = re.compile(r'[^\w.]')
+
+
+class StackSampler:
+    """Thread que toma la pila de los threads registrados cada ``interval`` segundos"""
+
+    def __init__(self, interval=PROFILE_INTERVAL):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._targets = {}                  # thread id -> lista de pilas
+        self._thread = None
+
+    def start(self, thread_id):
+        with self._lock:
+            self._targets[thread_id] = []
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def stop(self, thread_id):
+        """Deja de muestrear el thread y devuelve sus pilas (de la raíz a la hoja)"""
+        with self._lock:
+            return self._targets.pop(thread_id, [])
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            frames = sys._current_frames()
+            with self._lock:
+                if not self._targets:
+                    # Dormir hasta la próxima petición muestreada
+                    self._wake.clear()
+                    continue
+                for thread_id, samples in self._targets.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        samples.append(_stack(frame))
+            del frames
+            time.sleep(self.interval)
+
+
+def _stack(frame):
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+        frame = frame.f_back
+    stack.reverse()
+    return tuple(stack)
+
+
+def _frame_name(frame):
+    name, filename, line = frame
+    return f'{name} ({os.path.basename(filename)}:{line})'
+
+
+def to_collapsed(samples):
+    counts = {}
+    for stack in samples:
+        key = ';'.join(_frame_name(frame) for frame in stack)
+        counts[key] = counts.get(key, 0) + 1
+    return ''.join(f'{key} {count}\n' for key, count in sorted(counts.items()))
+
+
+def to_speedscope(samples, name, interval):
+    frames, index, encoded = [], {}, []
+    for stack in samples:
+        indices = []
+        for frame in stack:
+            if frame not in index:
+                index[frame] = len(frames)
+                frames.append({'name': frame[0], 'file': frame[1], 'line': frame[2]})
+            indices.append(index[frame])
+        encoded.append(indices)
+    weight = round(interval * 1000, 3)
+    return {
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'name': name,
+        'exporter': 'tienda-profiler',
+        'activeProfileIndex': 0,
+        'shared': {'frames': frames},
+        'profiles': [{
+            'type': 'sampled',
+            'name': name,
+            'unit': 'milliseconds',
+            'startValue': 0,
+            'endValue': round(weight * len(encoded), 3),
+            'samples': encoded,
+            'weights': [weight] * len(encoded),
+        }],
+    }
+
+
+def profile_folder(app=None):
+    app = app or current_app
+    return app.config.get('PROFILE_FOLDER') or os.path.join(app.instance_path, 'profiles')
+
+
+def save_profile(samples, endpoint, elapsed_ms, title, app=None):
+    """Escribe el perfil en ``profile_folder()`` y devuelve la ruta del archivo"""
+    app = app or current_app
+    fmt = app.config.get('PROFILE_FORMAT', PROFILE_FORMAT)
+    interval = app.config.get('PROFILE_INTERVAL', PROFILE_INTERVAL)
+    folder = profile_folder(app)
+    os.makedirs(folder, exist_ok=True)
+
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+    filename = f'{stamp}-{_UNSAFE.sub("_", endpoint)}-{int(elapsed_ms)}ms{EXTENSIONS[fmt]}'
+    path = os.path.join(folder, filename)
+    with open(path, 'w') as f:
+        if fmt == 'collapsed':
+            f.write(to_collapsed(samples))
+        else:
+            json.dump(to_speedscope(samples, title, interval), f)
+    _prune(folder, app.config.get('PROFILE_KEEP', PROFILE_KEEP))
+    return path
+
+
+def _prune(folder, keep):
+    names = sorted((name for name in os.listdir(folder) if _PROFILE_NAME.match(name)), reverse=True)
+    for name in names[keep:]:
+        try:
+            os.remove(os.path.join(folder, name))
+        except OSError:
+            pass
+
+
+def list_profiles(app=None):
+    """Perfiles guardados, del más reciente al más antiguo"""
+    folder = profile_folder(app)
+    if not os.path.isdir(folder):
+        return []
+    profiles = []
+    for name in os.listdir(folder):
+        match = _PROFILE_NAME.match(name)
+        if not match:
+            continue
+        stamp, endpoint, elapsed, extension = match.groups()
+        profiles.append({
+            'filename': name,
+            'created_at': datetime.strptime(stamp, '%Y%m%d-%H%M%S'),
+            'endpoint': endpoint,
+            'elapsed_ms': int(elapsed),
+            'format': 'collapsed' if extension == EXTENSIONS['collapsed'] else 'speedscope',
+            'size': os.path.getsize(os.path.join(folder, name)),
+        })
+    profiles.sort(key=lambda profile: profile['filename'], reverse=True)
+    return profiles
+
+
+def is_profile_name(filename):
+    return bool(_PROFILE_NAME.match(filename))
+
+
+# -- Peticiones ---------------------------------------------------------------
+
+def _sample_rate(app, endpoint):
+    rates = app.config.get('PROFILE_SAMPLE_RATES', PROFILE_SAMPLE_RATES)
+    return rates.get(endpoint, app.config.get('PROFILE_SAMPLE_RATE', PROFILE_SAMPLE_RATE))
+
+
+def _start_profile():
+    app = current_app
+    if random.random() >= _sample_rate(app, request.endpoint):
+        return
+    app.extensions['profiler'].start(threading.get_ident())
+    g._profile_start = time.perf_counter()
+
+
+def _finish_profile(exc):
+    start = g.pop('_profile_start', None)
+    if start is None:
+        return
+    app = current_app
+    samples = app.extensions['profiler'].stop(threading.get_ident())
+    elapsed_ms = round((time.perf_counter() - start) * 1000)
+    if samples and elapsed_ms >= app.config.get('PROFILE_THRESHOLD_MS', PROFILE_THRESHOLD_MS):
+        try:
+            save_profile(samples, request.endpoint or 'sin_ruta', elapsed_ms,
+                         f'{request.method} {request.full_path.rstrip("?")} ({elapsed_ms} ms)')
+        except OSError as e:
+            app.logger.warning(f'No se pudo guardar el perfil: {e}')
+
+
+def init_profiler(app):
+    enabled = app.config.get('PROFILE_SLOW_REQUESTS',
+                             os.environ.get('PROFILE_SLOW_REQUESTS', '0') not in ('', '0', 'false', 'False'))
+    if not enabled:
+        return
+    app.extensions['profiler'] = StackSampler(app.config.get('PROFILE_INTERVAL', PROFILE_INTERVAL))
+    app.before_request(_start_profile)
+    app.teardown_request(_finish_profile)
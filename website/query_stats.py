@@ -0,0 +1,195 @@
+"""
+Medición de las consultas SQL de cada petición.
+
+Los eventos ``before_cursor_execute``/``after_cursor_execute`` del engine
+cuentan las sentencias ejecutadas, su tiempo total y cuántas veces se
+repite cada sentencia con otros valores (su *huella*: el SQL sin literales
+ni parámetros). Una misma huella repetida muchas veces en una petición es
+el síntoma de un N+1: una carga diferida (``item.product``,
+``order.items``) dentro de un bucle.
+
+Cada respuesta lleva los resultados en ``Server-Timing``, visibles en la
+pestaña de red del navegador::
+
+    Server-Timing: db;dur=4.21;desc="12 consultas", app;dur=18.40
+
+y se registra una línea JSON por petición en el logger ``<app>.sql``
+(como advertencia si alguna huella llega a ``QUERY_REPEAT_THRESHOLD``
+repeticiones). Su nivel es ``QUERY_LOG_LEVEL`` (configuración o variable de
+entorno, ``INFO`` por defecto; ``WARNING`` deja solo los N+1) y las líneas
+salen por el handler de la aplicación. ``QUERY_STATS = False`` en la
+configuración lo desactiva.
+
+En las pruebas, ``record_queries()`` mide un bloque cualquiera y
+``assert_query_budget()`` falla si se pasa de un máximo de consultas o
+muestra un N+1.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from flask import current_app, g, request
+from sqlalchemy import event
+
+from . import db
+
+QUERY_STATS = True
+# Repeticiones de una misma huella en una petición que se consideran N+1
+QUERY_REPEAT_THRESHOLD = 5
+QUERY_LOG_LEVEL = 'INFO'
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PARAMETER = re.compile(r'%\(\w+\)s|%s|:\w+|\?')
+_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_SPACES = re.compile(r'\s+')
+
+# Mediciones abiertas en cada thread: la de la petición y las de las pruebas
+_local = threading.local()
+
+
+def fingerprint(statement):
+    """SQL sin literales ni parámetros; las listas ``IN (...)`` quedan como ``(?)``"""
+    statement = _STRING.sub('?', statement)
+    statement = _PARAMETER.sub('?', statement)
+    statement = _NUMBER.sub('?', statement)
+    statement = _LIST.sub('(?)', statement)
+    return _SPACES.sub(' ', statement).strip()
+
+
+class QueryStats:
+    """Consultas ejecutadas mientras la medición está abierta"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0             # segundos
+        self.fingerprints = Counter()
+
+    def record(self, statement, duration):
+        self.count += 1
+        self.duration += duration
+        self.fingerprints[fingerprint(statement)] += 1
+
+    def repeated(self, threshold=QUERY_REPEAT_THRESHOLD):
+        """Huellas ejecutadas ``threshold`` veces o más, de mayor a menor"""
+        return [(sql, count) for sql, count in self.fingerprints.most_common() if count >= threshold]
+
+
+def _active():
+    if not hasattr(_local, 'stats'):
+        _local.stats = []
+    return _local.stats
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info['query_start'] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info.pop('query_start', None)
+    duration = time.perf_counter() - start if start is not None else 0.0
+    for stats in _active():
+        stats.record(statement, duration)
+
+
+@contextmanager
+def record_queries():
+    """Mide las consultas del bloque (en este thread)"""
+    stats = QueryStats()
+    _active().append(stats)
+    try:
+        yield stats
+    finally:
+        _active().remove(stats)
+
+
+def assert_query_budget(stats, max_queries=None, max_repeats=QUERY_REPEAT_THRESHOLD):
+    """
+    Falla con ``AssertionError`` si la medición se pasó del presupuesto.
+
+    Args:
+        stats: ``QueryStats`` de ``record_queries()``.
+        max_queries: Máximo de consultas; ``None`` no lo controla.
+        max_repeats: Máximo de ejecuciones de una misma huella (N+1).
+    """
+    problems = []
+    if max_queries is not None and stats.count > max_queries:
+        problems.append(f'{stats.count} consultas (máximo {max_queries})')
+    for sql, count in stats.repeated(max_repeats + 1):
+        problems.append(f'N+1: {count} veces {sql}')
+    if problems:
+        raise AssertionError('Presupuesto de consultas excedido:\n  ' + '\n  '.join(problems))
+
+
+# -- Peticiones ---------------------------------------------------------------
+
+def _start_request():
+    stats = QueryStats()
+    _active().append(stats)
+    g._query_stats = stats
+    g._request_start = time.perf_counter()
+
+
+def _stop_request(keep=False):
+    """Deja de medir; con ``keep`` la medición sigue en ``g`` para ``metrics``"""
+    stats = g.get('_query_stats') if keep else g.pop('_query_stats', None)
+    if stats is not None and stats in _active():
+        _active().remove(stats)
+    return stats
+
+
+def _report(response):
+    stats = _stop_request(keep=True)
+    if stats is None:
+        return response
+    total = time.perf_counter() - g.get('_request_start')
+    response.headers.add('Server-Timing', f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} consultas"')
+    response.headers.add('Server-Timing', f'app;dur={total * 1000:.2f}')
+
+    if stats.count:
+        threshold = current_app.config.get('QUERY_REPEAT_THRESHOLD', QUERY_REPEAT_THRESHOLD)
+        repeated = stats.repeated(threshold)
+        line = json.dumps({
+            'event': 'sql',
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint,
+            'status': response.status_code,
+            'queries': stats.count,
+            'db_ms': round(stats.duration * 1000, 2),
+            'total_ms': round(total * 1000, 2),
+            'repeated': [{'sql': sql, 'count': count} for sql, count in repeated],
+        }, ensure_ascii=False)
+        logger = current_app.logger.getChild('sql')
+        if repeated:
+            logger.warning(line)
+        else:
+            logger.info(line)
+    return response
+
+
+def _discard(exc):
+    _stop_request()
+
+
+def init_query_stats(app):
+    """Registra los eventos del engine y la medición por petición"""
+    if not app.config.get('QUERY_STATS', QUERY_STATS):
+        return
+    with app.app_context():
+        engine = db.engine
+    # El logger de la aplicación queda en WARNING; el hijo tiene su propio nivel
+    # y sus líneas se propagan a los handlers de la aplicación
+    level = app.config.get('QUERY_LOG_LEVEL') or os.environ.get('QUERY_LOG_LEVEL', QUERY_LOG_LEVEL)
+    app.logger.getChild('sql').setLevel(level.upper() if isinstance(level, str) else level)
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    app.before_request(_start_request)
+    app.after_request(_report)
+    app.teardown_request(_discard)
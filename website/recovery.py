@@ -0,0 +1,150 @@
+"""
+Recuperación de la cuenta de un administrador con un código por correo.
+
+Son los flujos de ``website/auth.py`` (que ya no se registra). Se usan muy
+poco, así que se registran con ``LazyView`` (ver ``website/lazy.py``) bajo
+los endpoints ``auth.*`` y este módulo se importa en la primera petición.
+
+El estado vive en la tabla ``admin_recovery`` (una fila por correo): el
+HMAC del código con ``SECRET_KEY``, el vencimiento y los intentos fallidos.
+La sesión solo lleva el correo y, tras verificar el código, un token de
+un solo uso para el cambio de contraseña, así que reenviar una cookie
+anterior no devuelve intentos. Los POST validan el token CSRF aunque la
+aplicación tenga ``WTF_CSRF_CHECK_DEFAULT`` desactivado.
+"""
+
+import hashlib
+import hmac
+import re
+import secrets
+import string
+from datetime import datetime, timedelta
+
+from flask import current_app, flash, redirect, render_template, request, session, url_for
+
+from . import csrf, db
+from .models import AdminRecovery, Customer
+from .outbox import queue_mail
+
+RECOVERY_CODE_LENGTH = 8
+RECOVERY_CODE_TTL = 15 * 60          # segundos
+RECOVERY_MAX_ATTEMPTS = 5
+
+_PASSWORD_RULES = (re.compile(r'.{8,}'), re.compile(r'[A-Z]'), re.compile(r'[a-z]'), re.compile(r'\d'))
+
+
+def _digest(email, value):
+    key = current_app.config['SECRET_KEY'].encode()
+    return hmac.new(key, f'{email}:{value}'.encode(), hashlib.sha256).hexdigest()
+
+
+def _clear():
+    for key in ('recovery_email', 'recovery_token'):
+        session.pop(key, None)
+
+
+def _pending():
+    """La recuperación en curso de esta sesión, si no venció"""
+    email = session.get('recovery_email')
+    recovery = db.session.get(AdminRecovery, email) if email else None
+    if recovery is None or recovery.expires_at < datetime.utcnow():
+        _clear()
+        return None
+    return recovery
+
+
+def admin_recovery():
+    if request.method == 'POST':
+        csrf.protect()
+        email = (request.form.get('email') or '').strip()
+        user = Customer.query.filter_by(email=email).first()
+        code = ''.join(secrets.choice(string.ascii_uppercase + string.digits) for _ in range(RECOVERY_CODE_LENGTH))
+        # También hay fila para correos que no son de administradores, con un
+        # código que nadie recibe: el resto del flujo se ve igual
+        AdminRecovery.query.filter_by(email=email).delete()
+        db.session.add(AdminRecovery(
+            email=email, code_digest=_digest(email, code),
+            expires_at=datetime.utcnow() + timedelta(seconds=RECOVERY_CODE_TTL)))
+        if user and user.is_admin:
+            queue_mail(
+                'Código de recuperación de administrador',
+                recipients=[email],
+                body=f'''Tu código de recuperación es: {code}
+
+Vence en {RECOVERY_CODE_TTL // 60} minutos. Si no lo solicitaste, ignora este correo.'''
+            )
+        db.session.commit()
+        _clear()
+        session['recovery_email'] = email
+        # El mismo mensaje exista o no la cuenta, para no revelar qué correos son de administradores
+        flash('Si el correo pertenece a un administrador, recibirás un código de recuperación.', 'info')
+        return redirect(url_for('auth.verify_recovery_code'))
+
+    return render_template('auth/admin_recovery.html')
+
+
+def verify_recovery_code():
+    recovery = _pending()
+    if recovery is None:
+        flash('Sesión de recuperación expirada.', 'error')
+        return redirect(url_for('auth.admin_recovery'))
+
+    if request.method == 'POST':
+        csrf.protect()
+        email = recovery.email
+        # El intento se cuenta antes de comparar y en un solo UPDATE, así
+        # que peticiones en paralelo tampoco superan el máximo
+        counted = AdminRecovery.query.filter(
+            AdminRecovery.email == email,
+            AdminRecovery.attempts < RECOVERY_MAX_ATTEMPTS,
+            AdminRecovery.reset_digest.is_(None),
+        ).update({AdminRecovery.attempts: AdminRecovery.attempts + 1}, synchronize_session=False)
+        code = (request.form.get('code') or '').strip().upper()
+        if counted and hmac.compare_digest(_digest(email, code), recovery.code_digest):
+            token = secrets.token_urlsafe(32)
+            recovery.reset_digest = _digest(email, token)
+            db.session.commit()
+            session['recovery_token'] = token
+            return redirect(url_for('auth.reset_admin_password'))
+
+        db.session.commit()
+        db.session.refresh(recovery)
+        if recovery.attempts >= RECOVERY_MAX_ATTEMPTS:
+            db.session.delete(recovery)
+            db.session.commit()
+            _clear()
+            flash('Demasiados intentos. Solicita un código nuevo.', 'error')
+            return redirect(url_for('auth.admin_recovery'))
+        flash('Código incorrecto.', 'error')
+
+    return render_template('auth/verify_recovery_code.html')
+
+
+def reset_admin_password():
+    recovery = _pending()
+    token = session.get('recovery_token') or ''
+    if recovery is None or not recovery.reset_digest or \
+            not hmac.compare_digest(_digest(recovery.email, token), recovery.reset_digest):
+        flash('Sesión de recuperación expirada.', 'error')
+        return redirect(url_for('auth.admin_recovery'))
+
+    if request.method == 'POST':
+        csrf.protect()
+        new_password = request.form.get('new_password') or ''
+        if new_password != request.form.get('confirm_password'):
+            flash('Las contraseñas no coinciden.', 'error')
+            return render_template('auth/reset_admin_password.html')
+        if not all(rule.search(new_password) for rule in _PASSWORD_RULES):
+            flash('La contraseña debe tener al menos 8 caracteres, una mayúscula, una minúscula y un número.', 'error')
+            return render_template('auth/reset_admin_password.html')
+
+        user = Customer.query.filter_by(email=recovery.email).first()
+        if user and user.is_admin:
+            user.password = new_password
+        db.session.delete(recovery)
+        db.session.commit()
+        _clear()
+        flash('Contraseña actualizada exitosamente.', 'success')
+        return redirect(url_for('auth.login'))
+
+    return render_template('auth/reset_admin_password.html')
@@ -0,0 +1,95 @@
+"""
+Servidor SMTP local para desarrollo y pruebas.
+
+Acepta cualquier correo y lo guarda en memoria (y lo muestra por consola si
+``echo`` es verdadero); no entrega nada. Sirve para probar la bandeja de
+salida sin depender de smtp.gmail.com:
+
+    flask --app run smtp-debug --port 1025
+    MAIL_SERVER=localhost MAIL_PORT=1025 MAIL_USE_TLS=0 python run.py
+"""
+
+import socketserver
+import threading
+from email import message_from_bytes, policy
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        envelope = {'from': None, 'to': []}
+        self.reply('220 localhost SMTP de depuración')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors='replace').strip()
+            verb = command[:4].upper()
+            if verb in ('HELO', 'EHLO'):
+                self.reply('250 localhost')
+            elif verb == 'MAIL':
+                envelope = {'from': command.split(':', 1)[1].strip(' <>'), 'to': []}
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                address = command.split(':', 1)[1].strip(' <>')
+                if address in server.rejected:
+                    self.reply('550 Buzón no disponible')
+                else:
+                    envelope['to'].append(address)
+                    self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 Terminar con <CRLF>.<CRLF>')
+                lines = []
+                while True:
+                    data = self.rfile.readline()
+                    if not data or data in (b'.\r\n', b'.\n'):
+                        break
+                    lines.append(data[1:] if data.startswith(b'..') else data)
+                message = message_from_bytes(b''.join(lines), policy=policy.default)
+                with server.lock:
+                    server.messages.append((envelope['from'], envelope['to'], message))
+                if server.echo:
+                    print(f"--- Correo para {', '.join(envelope['to'])}: {message['Subject']}")
+                self.reply('250 OK')
+            elif verb in ('RSET', 'NOOP'):
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Adiós')
+                return
+            else:
+                self.reply('502 Comando no implementado')
+
+
+class DebugSMTPServer(socketserver.ThreadingTCPServer):
+    """
+    Servidor SMTP en un hilo. ``messages`` guarda tuplas
+    ``(remitente, destinatarios, email.message.Message)``.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host='127.0.0.1', port=0, echo=False, rejected=()):
+        super().__init__((host, port), _SMTPHandler)
+        self.echo = echo
+        self.rejected = set(rejected)
+        self.messages = []
+        self.connections = 0
+        self.lock = threading.Lock()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name='smtp-debug', daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
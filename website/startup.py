@@ -0,0 +1,48 @@
+"""
+Medición del arranque de la aplicación.
+
+``create_app`` registra cuánto tarda cada paso (extensiones y blueprints,
+incluida la importación de sus módulos) en
+``app.extensions['startup_timings']``. El comando ``flask profile-startup``
+muestra esos tiempos junto con los de ``python -X importtime``.
+"""
+
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+IMPORTTIME_SCRIPT = 'from website import create_app; create_app()'
+
+
+@contextmanager
+def timed(app, name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        app.extensions.setdefault('startup_timings', []).append((name, time.perf_counter() - start))
+
+
+def import_times(script=IMPORTTIME_SCRIPT, max_depth=1):
+    """
+    Ejecuta ``script`` en un intérprete nuevo con ``-X importtime``.
+
+    Returns:
+        Lista de tuplas ``(acumulado_ms, propio_ms, módulo, profundidad)``
+        hasta ``max_depth`` niveles de anidamiento, de mayor a menor costo.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', script],
+        capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '[us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth <= max_depth:
+            rows.append((int(cumulative_us) / 1000, int(self_us) / 1000, name.strip(), depth))
+    rows.sort(reverse=True)
+    return rows
@@ -0,0 +1,436 @@
+function toggleThemeMenu() {
+    const menu = document.getElementById('themeMenu');
+    menu.classList.toggle('show');
+}
+
+function setTheme(theme) {
+    document.documentElement.setAttribute('data-theme', theme);
+    localStorage.setItem('theme', theme);
+    toggleThemeMenu();
+}
+
+// Cargar tema guardado
+const savedTheme = localStorage.getItem('theme') || 'light';
+document.documentElement.setAttribute('data-theme', savedTheme);
+
+// Search functionality
+document.addEventListener('DOMContentLoaded', function() {
+    const searchInput = document.getElementById('searchInput');
+    const searchForm = document.getElementById('searchForm');
+    const searchSuggestions = document.getElementById('searchSuggestions');
+    const suggestionsList = document.getElementById('suggestionsList');
+    const recentSearches = document.getElementById('recentSearches');
+
+    let debounceTimer;
+    let lastQuery = '';
+    let lastSuggestions = [];
+    let currentFocus = -1;
+    let isLoading = false;
+
+    // Load recent searches from localStorage
+    const RECENT_SEARCHES_KEY = 'recentSearches';
+    const MAX_RECENT_SEARCHES = 5;
+
+    function getRecentSearches() {
+        const searches = localStorage.getItem(RECENT_SEARCHES_KEY);
+        return searches ? JSON.parse(searches) : [];
+    }
+
+    function saveRecentSearch(query) {
+        if (!query.trim()) return;
+
+        let searches = getRecentSearches();
+        // Remove if already exists
+        searches = searches.filter(item => item.toLowerCase() !== query.toLowerCase());
+        // Add to beginning
+        searches.unshift(query);
+        // Keep only the most recent searches
+        searches = searches.slice(0, MAX_RECENT_SEARCHES);
+
+        localStorage.setItem(RECENT_SEARCHES_KEY, JSON.stringify(searches));
+    }
+
+    function showRecentSearches() {
+        const searches = getRecentSearches();
+        if (searches.length === 0) return;
+
+        recentSearches.classList.remove('d-none');
+        recentSearches.innerHTML = `
+            <div class="suggestion-header px-3 py-2">
+                <i class="fas fa-clock me-2"></i>Búsquedas recientes
+                <button class="btn btn-sm btn-link float-end p-0 text-muted" id="clearRecentSearches">
+                    <small>Limpiar</small>
+                </button>
+            </div>
+        `;
+
+        searches.forEach(search => {
+            const item = document.createElement('div');
+            item.className = 'suggestion-item';
+            item.role = 'option';
+            item.id = `search-${search.replace(/\s+/g, '-').toLowerCase()}`;
+            item.innerHTML = `
+                <i class="fas fa-history me-2 text-muted"></i>
+                <span class="flex-grow-1">${search}</span>
+                <button class="btn btn-sm btn-link p-0 text-muted remove-search" data-query="${search}">
+                    <i class="fas fa-times"></i>
+                </button>
+            `;
+            recentSearches.appendChild(item);
+        });
+
+        // Add event listener for clear button
+        document.getElementById('clearRecentSearches')?.addEventListener('click', function(e) {
+            e.stopPropagation();
+            localStorage.removeItem(RECENT_SEARCHES_KEY);
+            recentSearches.classList.add('d-none');
+        });
+
+        // Add event listeners for remove buttons
+        document.querySelectorAll('.remove-search').forEach(btn => {
+            btn.addEventListener('click', function(e) {
+                e.stopPropagation();
+                const query = this.getAttribute('data-query');
+                let searches = getRecentSearches();
+                searches = searches.filter(item => item !== query);
+                localStorage.setItem(RECENT_SEARCHES_KEY, JSON.stringify(searches));
+                showRecentSearches();
+            });
+        });
+    }
+
+    // Show search suggestions with improved performance
+    searchInput.addEventListener('input', function(e) {
+        const query = e.target.value.trim();
+
+        // Clear previous timer
+        clearTimeout(debounceTimer);
+
+        // Show recent searches when input is empty
+        if (query.length === 0) {
+            showRecentSearches();
+            searchSuggestions.classList.add('show');
+            return;
+        }
+
+        // Hide suggestions if query is too short
+        if (query.length < 2) {
+            searchSuggestions.classList.remove('show');
+            return;
+        }
+
+        // Show cached suggestions if available and query is similar
+        if (lastQuery && query.toLowerCase().startsWith(lastQuery.toLowerCase()) && 
+            lastSuggestions.length > 0) {
+            const filtered = lastSuggestions.filter(s => 
+                s.toLowerCase().includes(query.toLowerCase())
+            );
+            if (filtered.length > 0) {
+                displaySuggestions(filtered);
+                return;
+            }
+        }
+
+        // Show loading state
+        isLoading = true;
+        suggestionsList.querySelectorAll('.suggestion-item').forEach(el => el.remove());
+        document.getElementById('noSuggestions').style.display = 'none';
+        document.getElementById('searchLoading').style.display = 'flex';
+        searchSuggestions.classList.add('show');
+
+        // Debounce the API call
+        debounceTimer = setTimeout(() => {
+            // Add cache buster to prevent browser caching
+            const timestamp = new Date().getTime();
+            // Show loading state with a slight delay to prevent flickering
+            setTimeout(() => {
+                if (!isLoading) return;
+
+                fetch(`/api/search/suggestions?q=${encodeURIComponent(query)}&_=${Date.now()}`, {
+                    headers: {
+                        'X-Requested-With': 'XMLHttpRequest',
+                        'Accept': 'application/json'
+                    },
+                    cache: 'no-store',
+                    credentials: 'same-origin'
+                })
+                .then(response => {
+                    if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
+                    return response.json();
+                })
+                .then(data => {
+                    if (!isLoading) return; // Ignore if a new request was made
+
+                    document.getElementById('searchLoading').style.display = 'none';
+                    if (data.suggestions && data.suggestions.length > 0) {
+                        // Cache the results
+                        lastQuery = query;
+                        lastSuggestions = data.suggestions;
+                        displaySuggestions(data.suggestions);
+                    } else {
+                        document.getElementById('noSuggestions').style.display = 'block';
+                    }
+                })
+                .catch(error => {
+                    if (error.name !== 'AbortError') {
+                        console.error('Error fetching suggestions:', error);
+                        document.getElementById('searchLoading').style.display = 'none';
+                        document.getElementById('noSuggestions').style.display = 'block';
+                        // Show cached suggestions if available
+                        if (lastSuggestions.length > 0) {
+                            displaySuggestions(lastSuggestions);
+                        }
+                    }
+                })
+                .finally(() => {
+                    isLoading = false;
+                });
+            }, 150);
+        }, 250); // Reduced debounce time for better responsiveness
+    });
+
+    // Handle suggestion click
+    suggestionsList.addEventListener('click', function(e) {
+        const suggestionItem = e.target.closest('.suggestion-item');
+        if (suggestionItem) {
+            const searchText = suggestionItem.querySelector('.search-text')?.textContent || '';
+            if (searchText) {
+                searchInput.value = searchText.trim();
+                saveRecentSearch(searchText.trim());
+                searchForm.submit();
+            }
+        }
+    });
+
+    // Handle form submission
+    searchForm.addEventListener('submit', function(e) {
+        const query = searchInput.value.trim();
+        if (query) {
+            saveRecentSearch(query);
+        }
+    });
+
+    // Handle keyboard navigation with improved UX
+    searchInput.addEventListener('keydown', function(e) {
+        const items = Array.from(suggestionsList.querySelectorAll('.suggestion-item'));
+
+        // Handle tab key to navigate through suggestions
+        if (e.key === 'Tab' && items.length > 0) {
+            e.preventDefault();
+            if (currentFocus === -1) {
+                currentFocus = 0;
+            } else {
+                items[currentFocus].classList.remove('active');
+                items[currentFocus].removeAttribute('aria-selected');
+                currentFocus = (currentFocus + (e.shiftKey ? -1 : 1) + items.length) % items.length;
+            }
+            if (currentFocus >= 0) {
+                const selectedItem = items[currentFocus];
+                selectedItem.classList.add('active');
+                selectedItem.setAttribute('aria-selected', 'true');
+                const searchText = selectedItem.querySelector('.search-text')?.textContent || selectedItem.textContent;
+                searchInput.value = searchText.trim();
+                selectedItem.scrollIntoView({ block: 'nearest', behavior: 'smooth' });
+            }
+            return;
+        }
+
+        if (e.key === 'ArrowDown' || e.key === 'ArrowUp') {
+            e.preventDefault();
+            if (items.length === 0) return;
+
+            // Remove active class from all items
+            items.forEach(item => {
+                item.classList.remove('active');
+                item.removeAttribute('aria-selected');
+            });
+
+            // Calculate new index
+            if (e.key === 'ArrowDown') {
+                currentFocus = (currentFocus + 1) % items.length;
+            } else {
+                currentFocus = (currentFocus - 1 + items.length) % items.length;
+            }
+
+            // Update UI
+            const selectedItem = items[currentFocus];
+            selectedItem.classList.add('active');
+            selectedItem.setAttribute('aria-selected', 'true');
+
+            const searchText = selectedItem.querySelector('.search-text')?.textContent || selectedItem.textContent;
+            searchInput.value = searchText.trim();
+
+            // Update aria-activedescendant for accessibility
+            searchInput.setAttribute('aria-activedescendant', selectedItem.id);
+
+            // Scroll into view if needed
+            selectedItem.scrollIntoView({ block: 'nearest', behavior: 'smooth' });
+        } else if (e.key === 'Enter') {
+            e.preventDefault();
+            const activeItem = suggestionsList.querySelector('.suggestion-item.active');
+            if (activeItem) {
+                const searchText = activeItem.querySelector('.search-text')?.textContent || activeItem.textContent;
+                searchInput.value = searchText.trim();
+                saveRecentSearch(searchText.trim());
+            }
+            searchForm.submit();
+        } else if (e.key === 'Escape') {
+            searchSuggestions.classList.remove('show');
+            currentFocus = -1;
+        }
+    });
+
+    // Hide suggestions when clicking outside
+    document.addEventListener('click', function(e) {
+        if (!searchInput.contains(e.target) && !searchSuggestions.contains(e.target)) {
+            searchSuggestions.classList.remove('show');
+            currentFocus = -1;
+        }
+    });
+
+    // Show recent searches when input is focused
+    searchInput.addEventListener('focus', function() {
+        if (searchInput.value.trim() === '') {
+            showRecentSearches();
+            searchSuggestions.classList.add('show');
+        }
+    });
+
+    // Close suggestions when tabbing out
+    searchInput.addEventListener('blur', function(e) {
+        // Use setTimeout to allow click events to be processed first
+        setTimeout(() => {
+            if (!searchSuggestions.contains(document.activeElement)) {
+                searchSuggestions.classList.remove('show');
+            }
+        }, 200);
+    });
+
+    function displaySuggestions(suggestions) {
+        // Clear previous suggestions but keep loading and no results elements
+        const loadingElement = document.getElementById('searchLoading');
+        const noResultsElement = document.getElementById('noSuggestions');
+
+        // Hide loading and no results by default
+        if (loadingElement) loadingElement.style.display = 'none';
+        if (noResultsElement) noResultsElement.style.display = 'none';
+
+        // Clear all suggestion items
+        if (suggestionsList) {
+            const itemsToRemove = [];
+            suggestionsList.querySelectorAll('.suggestion-item, .suggestion-header').forEach(el => {
+                if (el.id !== 'searchLoading' && el.id !== 'noSuggestions') {
+                    itemsToRemove.push(el);
+                }
+            });
+            itemsToRemove.forEach(el => el.remove());
+        }
+
+        // Show popular searches if no results
+        if (!suggestions || suggestions.length === 0) {
+            const popularSearches = [
+                'Ofertas del día',
+                'Electrónica',
+                'Hogar',
+                'Moda',
+                'Deportes'
+            ];
+
+            // Add header for popular searches
+            const header = document.createElement('div');
+            header.className = 'suggestion-header px-3 py-2';
+            header.innerHTML = '<i class="fas fa-fire me-2 text-danger"></i>Búsquedas populares';
+            if (suggestionsList && loadingElement) {
+                suggestionsList.insertBefore(header, loadingElement);
+            }
+
+            // Add popular searches
+            popularSearches.forEach((suggestion, index) => {
+                const item = createSuggestionItem(suggestion, 'trending');
+                if (item && suggestionsList && loadingElement) {
+                    item.id = `popular-${index}`;
+                    suggestionsList.insertBefore(item, loadingElement);
+                }
+            });
+        } else {
+            // Add header for search results
+            const header = document.createElement('div');
+            header.className = 'suggestion-header px-3 py-2';
+            header.innerHTML = '<i class="fas fa-search me-2 text-primary"></i>Sugerencias';
+            if (suggestionsList && loadingElement) {
+                suggestionsList.insertBefore(header, loadingElement);
+            }
+
+            // Add search suggestions
+            suggestions.forEach((suggestion, index) => {
+                if (suggestion) {
+                    const item = createSuggestionItem(suggestion, 'search');
+                    if (item && suggestionsList && loadingElement) {
+                        item.id = `suggestion-${index}`;
+                        suggestionsList.insertBefore(item, loadingElement);
+                    }
+                }
+            });
+        }
+
+        // Show recent searches if applicable
+        const recentSearches = getRecentSearches();
+        if (recentSearches && recentSearches.length > 0 && searchInput && searchInput.value.trim() === '') {
+            showRecentSearches();
+        }
+
+        // Show the suggestions container with animation
+        if (searchSuggestions) {
+            searchSuggestions.classList.add('show');
+        }
+        currentFocus = -1; // Reset focus index
+
+        // Update aria attributes
+        if (searchInput) {
+            searchInput.setAttribute('aria-expanded', 'true');
+            searchInput.setAttribute('aria-owns', 'suggestionsList');
+        }
+    }
+
+    function createSuggestionItem(text, type = 'recent') {
+        if (!text) return null;
+
+        const item = document.createElement('div');
+        item.className = 'suggestion-item d-flex align-items-center p-2';
+        item.setAttribute('role', 'option');
+        item.setAttribute('tabindex', '-1');
+
+        const iconClass = type === 'recent' ? 'fa-clock' : (type === 'trending' ? 'fa-fire' : 'fa-search');
+        const iconColor = type === 'recent' ? 'text-primary' : (type === 'trending' ? 'text-danger' : 'text-muted');
+
+        // Sanitize text to prevent XSS
+        const sanitizedText = text.replace(/[&<>"']/g, function(match) {
+            return {
+                '&': '&amp;',
+                '<': '&lt;',
+                '>': '&gt;',
+                '"': '&quot;',
+                "'": '&#39;'
+            }[match];
+        });
+
+        item.innerHTML = `
+            <i class="fas ${iconClass} me-2 ${iconColor}"></i>
+            <span class="flex-grow-1 search-text">${sanitizedText}</span>
+            ${type === 'trending' ? '<span class="badge bg-warning text-dark ms-2">Popular</span>' : ''}
+        `;
+
+        // Add click handler
+        item.addEventListener('click', function(e) {
+            e.preventDefault();
+            if (searchInput) {
+                searchInput.value = text;
+                if (searchForm) {
+                    searchForm.submit();
+                }
+            }
+        });
+
+        return item;
+    }
+});
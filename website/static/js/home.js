@@ -0,0 +1,34 @@
+document.addEventListener('DOMContentLoaded', function() {
+    const sentinel = document.getElementById('productFeedSentinel');
+    const grid = document.querySelector('.product-grid');
+    if (!sentinel || !grid || !('IntersectionObserver' in window)) {
+        return;
+    }
+    let loading = false;
+
+    const observer = new IntersectionObserver(function(entries) {
+        if (!entries[0].isIntersecting || loading) {
+            return;
+        }
+        const cursor = sentinel.dataset.nextCursor;
+        if (!cursor) {
+            return;
+        }
+        loading = true;
+        fetch(`${sentinel.dataset.feedUrl}?cursor=${encodeURIComponent(cursor)}`)
+            .then(response => response.json())
+            .then(data => {
+                grid.insertAdjacentHTML('beforeend', data.html);
+                if (data.next_cursor) {
+                    sentinel.dataset.nextCursor = data.next_cursor;
+                } else {
+                    observer.disconnect();
+                    sentinel.remove();
+                }
+            })
+            .catch(error => console.error('Error al cargar productos:', error))
+            .finally(() => { loading = false; });
+    }, { rootMargin: '400px' });
+
+    observer.observe(sentinel);
+});
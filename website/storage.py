@@ -0,0 +1,104 @@
+"""
+Almacenamiento de archivos subidos direccionado por contenido.
+
+Cada archivo se guarda con el nombre de su hash SHA-256, repartido en
+subdirectorios por los primeros caracteres del hash::
+
+    UPLOAD_FOLDER/3a/7f/3a7f...c2.webp   ->   /uploads/3a/7f/3a7f...c2.webp
+
+Subir dos veces los mismos bytes devuelve la misma URL y no ocupa espacio
+extra, y dos archivos distintos nunca se pisan aunque se llamen igual. Como
+el contenido de una URL no cambia nunca, ``/uploads/`` se sirve con
+``Cache-Control: immutable`` y un año de vigencia.
+"""
+
+import hashlib
+import os
+import re
+import threading
+
+from flask import abort, current_app, send_from_directory
+
+UPLOAD_URL_PREFIX = '/uploads'
+UPLOAD_MAX_AGE = 31536000           # un año, en segundos
+
+_EXTENSION = re.compile(r'^[a-z0-9]{1,8}$')
+_CONTENT_PATH = re.compile(r'^([0-9a-f]{2})/([0-9a-f]{2})/(\1\2[0-9a-f]{60})\.[a-z0-9]{1,8}$')
+
+
+def upload_folder():
+    return current_app.config['UPLOAD_FOLDER']
+
+
+def content_path(digest, extension):
+    """Ruta relativa (con ``/``) de un archivo a partir de su hash"""
+    return f'{digest[:2]}/{digest[2:4]}/{digest}.{extension}'
+
+
+def save_upload(data, extension):
+    """
+    Guarda un archivo subido y devuelve su URL.
+
+    Args:
+        data: Bytes del archivo, o un objeto con ``read()`` (por ejemplo el
+            ``FileStorage`` de ``request.files``).
+        extension: Extensión sin punto, en minúsculas (``'webp'``).
+
+    Returns:
+        URL inmutable del archivo (``/uploads/ab/cd/<sha256>.<extensión>``).
+    """
+    if hasattr(data, 'read'):
+        data = data.read()
+    extension = extension.lower().lstrip('.')
+    if not _EXTENSION.match(extension):
+        raise ValueError(f'Extensión de archivo no válida: {extension!r}')
+
+    relative = content_path(hashlib.sha256(data).hexdigest(), extension)
+    path = os.path.join(upload_folder(), *relative.split('/'))
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Escribir aparte y renombrar: otro proceso nunca ve un archivo a medias
+        temporary = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temporary, 'wb') as f:
+            f.write(data)
+        os.replace(temporary, path)
+    return f'{UPLOAD_URL_PREFIX}/{relative}'
+
+
+def local_path(url):
+    """
+    Archivo en disco de una URL guardada en la base de datos, o ``None``.
+
+    Acepta las URLs de ``save_upload`` y las rutas anteriores
+    (``static/uploads/...``, ``/static/...`` y ``./media/...``).
+    """
+    if not url:
+        return None
+    if url.startswith(UPLOAD_URL_PREFIX + '/'):
+        relative = url[len(UPLOAD_URL_PREFIX) + 1:]
+        if not _CONTENT_PATH.match(relative):
+            return None
+        return os.path.join(upload_folder(), *relative.split('/'))
+    relative = url.lstrip('./')
+    if relative.startswith('static/'):
+        base = current_app.root_path
+    elif relative.startswith('media/'):
+        base = os.path.dirname(current_app.root_path)
+    else:
+        return None
+    path = os.path.normpath(os.path.join(base, relative))
+    return path if path.startswith(os.path.normpath(base) + os.sep) else None
+
+
+def serve_upload(filename):
+    if not _CONTENT_PATH.match(filename):
+        abort(404)
+    response = send_from_directory(upload_folder(), filename,
+                                   max_age=current_app.config.get('UPLOAD_MAX_AGE', UPLOAD_MAX_AGE))
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+def init_storage(app):
+    app.add_url_rule(f'{UPLOAD_URL_PREFIX}/<path:filename>', 'uploads', serve_upload)
@@ -1,16 +1,20 @@
 from flask import Blueprint, render_template, flash, redirect, request, jsonify, url_for
 from .models import Cart, Order, Customer, OrderItem
 from .modules.product.models import Product, Category
+from .modules.product.services import get_product_feed
+from .modules.product.search import filter_products, related_searches
+from .modules.product.suggestions import get_suggestion_index
+from .modules.product.spelling import did_you_mean
+from .modules.cliente.services import CheckoutConflict, get_cart, get_cart_line, get_cart_totals, get_order_history, place_order as checkout
 from flask_login import login_required, current_user
 from . import db
 # from intasend import APIService
 from .forms import ShopItemsForm, EditProfileForm
-from werkzeug.utils import secure_filename
-import os
+from .images import InvalidImageError, dump_meta, process_image
+from .page_cache import cached_page
 from flask_wtf import FlaskForm
 from wtforms import StringField, TextAreaField
 from wtforms.validators import DataRequired
-from datetime import datetime
 
 
 views = Blueprint('views', __name__)
@@ -21,6 +25,7 @@ API_TOKEN = 'YOUR_API_TOKEN'
 
 
 @views.route('/')
+@cached_page
 def home():
     show_profile_modal = False
     form = None
@@ -32,15 +37,32 @@ def home():
         form.address.data = current_user.address
         show_profile_modal = True
     try:
-        items = Product.query.filter(Product.stock_quantity > 0).all()
+        # Solo la primera página; el resto se carga con /api/products/feed
+        items, next_cursor = get_product_feed()
         categories = Category.query.all()
         cart = Cart.query.filter_by(customer_id=current_user.id).all() if current_user.is_authenticated else []
     except Exception as e:
         print(f"Error loading data: {e}")
         items = []
+        next_cursor = None
         categories = []
         cart = []
-    return render_template('home.html', items=items, categories=categories, cart=cart, show_profile_modal=show_profile_modal, form=form)
+    return render_template('home.html', items=items, next_cursor=next_cursor, categories=categories, cart=cart, show_profile_modal=show_profile_modal, form=form)
+
+
+@views.route('/api/products/feed')
+def product_feed():
+    cursor = request.args.get('cursor')
+    limit = request.args.get('limit', type=int)
+    items, next_cursor = get_product_feed(cursor=cursor, limit=limit)
+
+    # Las tarjetas se renderizan con la misma plantilla que la página de inicio
+    html = render_template('shared/product_cards.html', items=items, next_url=url_for('views.home'))
+    return jsonify({
+        'products': [item.to_dict() for item in items],
+        'html': html,
+        'next_cursor': next_cursor
+    })
 
 
 @views.route('/add-to-cart/<int:item_id>')
@@ -105,33 +127,28 @@ def show_cart():
     if current_user.is_admin:
         flash('Los administradores no pueden acceder al carrito.', 'warning')
         return redirect(url_for('views.home'))
-    cart = Cart.query.filter_by(customer_id=current_user.id).all()
-    amount = 0
-    for item in cart:
-        amount += item.product.current_price * item.quantity
-    return render_template('cliente/cart.html', cart=cart, amount=amount, total=amount+200)
+    summary = get_cart(current_user.id)
+    return render_template('cliente/cart.html', cart=summary.lines, amount=summary.amount, total=summary.total)
 
 
 @views.route('/pluscart')
 @login_required
 def plus_cart():
     if request.method == 'GET':
-        cart_id = request.args.get('cart_id')
-        cart_item = Cart.query.get(cart_id)
+        cart_item = get_cart_line(current_user.id, request.args.get('cart_id'))
+        if not cart_item:
+            return jsonify({'message': 'Ítem no encontrado'}), 404
+
         cart_item.quantity = cart_item.quantity + 1
         cart_item.total_price = cart_item.quantity * cart_item.product.current_price
         db.session.commit()
 
-        cart = Cart.query.filter_by(customer_id=current_user.id).all()
-
-        amount = 0
-        for item in cart:
-            amount += item.product.current_price * item.quantity
+        amount, total = get_cart_totals(current_user.id)
 
         data = {
             'quantity': cart_item.quantity,
             'amount': amount,
-            'total': amount + 200
+            'total': total
         }
 
         return jsonify(data)
@@ -140,23 +157,21 @@ def plus_cart():
 @login_required
 def minus_cart():
     if request.method == 'GET':
-        cart_id = request.args.get('cart_id')
-        cart_item = Cart.query.get(cart_id)
+        cart_item = get_cart_line(current_user.id, request.args.get('cart_id'))
+        if not cart_item:
+            return jsonify({'message': 'Ítem no encontrado'}), 404
+
         if cart_item.quantity > 1:
             cart_item.quantity = cart_item.quantity - 1
             cart_item.total_price = cart_item.quantity * cart_item.product.current_price
             db.session.commit()
 
-        cart = Cart.query.filter_by(customer_id=current_user.id).all()
-
-        amount = 0
-        for item in cart:
-            amount += item.product.current_price * item.quantity
+        amount, total = get_cart_totals(current_user.id)
 
         data = {
             'quantity': cart_item.quantity,
             'amount': amount,
-            'total': amount + 200
+            'total': total
         }
 
         return jsonify(data)
@@ -165,20 +180,18 @@ def minus_cart():
 @login_required
 def remove_cart():
     if request.method == 'GET':
-        cart_id = request.args.get('cart_id')
-        cart_item = Cart.query.get(cart_id)
+        cart_item = get_cart_line(current_user.id, request.args.get('cart_id'))
+        if not cart_item:
+            return jsonify({'message': 'Ítem no encontrado'}), 404
+
         db.session.delete(cart_item)
         db.session.commit()
 
-        cart = Cart.query.filter_by(customer_id=current_user.id).all()
-
-        amount = 0
-        for item in cart:
-            amount += item.product.current_price * item.quantity
+        amount, total = get_cart_totals(current_user.id)
 
         data = {
             'amount': amount,
-            'total': amount + 200
+            'total': total
         }
 
         return jsonify(data)
@@ -192,83 +205,37 @@ def place_order():
         flash('Los administradores no pueden realizar pedidos.', 'warning')
         return redirect(url_for('views.home'))
         
-    customer_cart = Cart.query.filter_by(customer_id=current_user.id).all()
-    if not customer_cart:
-        flash('Tu carrito está vacío', 'warning')
-        return redirect(url_for('views.home'))
-    
     try:
-        # Verificar stock y calcular total
-        total = 0
-        for item in customer_cart:
-            product = Product.query.get(item.product_id)
-            if not product:
-                flash(f'El producto {item.product.product_name} ya no está disponible', 'error')
-                return redirect(url_for('views.show_cart'))
-            
-            if product.stock_quantity < item.quantity:
-                flash(f'No hay suficiente stock de {product.product_name}. Stock disponible: {product.stock_quantity}', 'error')
-                return redirect(url_for('views.show_cart'))
-            
-            total += product.current_price * item.quantity
-
-        # Crear la orden
-        new_order = Order(
-            customer_id=current_user.id,
-            status='pending',
-            total=total,
-            shipping_address=current_user.address
-        )
-        db.session.add(new_order)
-        
-        # Crear items de la orden y actualizar stock
-        for item in customer_cart:
-            product = Product.query.get(item.product_id)
-            
-            # Crear item de la orden
-            order_item = OrderItem(
-                order=new_order,
-                product_id=product.id,
-                quantity=item.quantity,
-                price=product.current_price
-            )
-            db.session.add(order_item)
-            
-            # Actualizar stock
-            product.stock_quantity -= item.quantity
-            product.in_stock = product.stock_quantity > 0
-            
-            # Eliminar item del carrito
-            db.session.delete(item)
-        
-        db.session.commit()
-        flash('Pedido realizado exitosamente', 'success')
-        return redirect(url_for('views.order'))
-        
+        order, failures = checkout(current_user.id, shipping_address=current_user.address)
+    except CheckoutConflict:
+        flash('Tu carrito o el stock cambiaron mientras se procesaba el pedido. Inténtalo de nuevo.', 'warning')
+        return redirect(url_for('views.show_cart'))
     except Exception as e:
         db.session.rollback()
         print('Error al procesar el pedido:', e)
         flash('Error al procesar el pedido. Por favor, intente nuevamente.', 'error')
         return redirect(url_for('views.show_cart'))
 
+    if failures:
+        for failure in failures:
+            flash(f'No hay suficiente stock de {failure["product_name"]}. Stock disponible: {failure["available"]}', 'error')
+        return redirect(url_for('views.show_cart'))
+
+    if not order:
+        flash('Tu carrito está vacío', 'warning')
+        return redirect(url_for('views.home'))
+
+    flash('Pedido realizado exitosamente', 'success')
+    return redirect(url_for('views.order'))
+
 
 @views.route('/orders')
 @login_required
 def order():
     # Obtener los pedidos del usuario actual ordenados por fecha descendente
-    orders = Order.query.filter_by(customer_id=current_user.id)\
-                      .order_by(Order.created_at.desc())\
-                      .all()
-    
-    # Para cada pedido, cargar explícitamente los ítems y sus productos asociados
-    for order in orders:
-        # Esto asegura que los ítems y sus productos estén cargados
-        order_items = OrderItem.query.filter_by(order_id=order.id).all()
-        for item in order_items:
-            # Cargar el producto asociado a cada ítem
-            _ = item.product
-    
-    return render_template('cliente/orders.html', orders=orders)
+    page = request.args.get('page', 1, type=int)
+    orders = get_order_history(current_user.id, page=page)
+    return render_template('cliente/orders.html', orders=orders.items, pagination=orders)
 
 
 @views.route('/api/search/suggestions')
@@ -277,102 +244,11 @@ def search_suggestions():
     if len(query) < 2:
         return jsonify({'suggestions': []})
     
-    # Obtener productos que coincidan con la consulta (con límite razonable)
-    products = Product.query.filter(
-        (Product.product_name.ilike(f'%{query}%')) |
-        (Product.description.ilike(f'%{query}%'))
-    ).limit(10).all()
-    
-    # Obtener categorías que coincidan con la consulta
-    categories = Category.query.filter(
-        Category.name.ilike(f'%{query}%')
-    ).limit(5).all()
-    
-    # Diccionario para mantener seguimiento de sugerencias y su relevancia
-    suggestions = {}
-    
-    # Función para calcular la puntuación de relevancia
-    def calculate_relevance(term, source_term, is_category=False):
-        term = term.lower()
-        source_term = source_term.lower()
-        
-        # Puntuación base basada en la posición de coincidencia
-        position = term.find(source_term)
-        if position == 0:
-            score = 1.0  # Coincidencia al inicio
-        else:
-            score = 0.5  # Coincidencia en otra parte
-            
-        # Bonus por ser categoría
-        if is_category:
-            score += 0.2
-            
-        # Bonus por longitud (preferir términos más largos)
-        score += min(0.3, len(term) * 0.02)
-        
-        return score
-    
-    # Procesar productos
-    for product in products:
-        # Añadir el nombre completo del producto
-        if query in product.product_name.lower():
-            score = calculate_relevance(product.product_name, query)
-            suggestions[product.product_name] = max(score, suggestions.get(product.product_name, 0))
-        
-        # Añadir palabras clave del nombre del producto
-        for word in product.product_name.split():
-            word_lower = word.lower()
-            if len(word) > 2 and query in word_lower and word_lower != query:
-                score = calculate_relevance(word, query)
-                suggestions[word] = max(score, suggestions.get(word, 0))
-    
-    # Procesar categorías
-    for category in categories:
-        if query in category.name.lower():
-            score = calculate_relevance(category.name, query, is_category=True)
-            suggestions[category.name] = max(score, suggestions.get(category.name, 0))
-    
-    # Ordenar sugerencias por puntuación (más relevantes primero)
-    sorted_suggestions = sorted(
-        suggestions.items(),
-        key=lambda x: (-x[1], len(x[0]))  # Primero por puntuación, luego por longitud
-    )
-    
-    # Tomar las 8 mejores sugerencias únicas
-    unique_suggestions = []
-    seen_terms = set()
-    
-    for term, _ in sorted_suggestions:
-        term_lower = term.lower()
-        if term_lower not in seen_terms and term_lower != query:
-            unique_suggestions.append(term)
-            seen_terms.add(term_lower)
-            if len(unique_suggestions) >= 8:
-                break
-    
-    # Si hay pocas sugerencias, intentar con búsqueda difusa
-    if len(unique_suggestions) < 5 and len(query) > 2:
-        from difflib import get_close_matches
-        
-        # Obtener todos los términos de productos y categorías para búsqueda difusa
-        all_terms = set()
-        for product in Product.query.with_entities(Product.product_name).limit(1000).all():
-            all_terms.update(word.lower() for word in product[0].split() if len(word) > 2)
-        
-        # Buscar términos similares
-        fuzzy_matches = get_close_matches(query, all_terms, n=5, cutoff=0.6)
-        
-        # Añadir sugerencias difusas únicas
-        for match in fuzzy_matches:
-            if match not in seen_terms:
-                unique_suggestions.append(match)
-                seen_terms.add(match)
-                if len(unique_suggestions) >= 8:
-                    break
-    
-    return jsonify({'suggestions': unique_suggestions})
+    # Sugerencias desde el índice en memoria (trie + trigramas), sin consultar la BD
+    return jsonify({'suggestions': get_suggestion_index().suggest(query)})
 
 @views.route('/search')
+@cached_page
 def search():
     # Obtener el término de búsqueda
     query = request.args.get('q', '').strip()
@@ -395,15 +271,8 @@ def search():
     in_stock = request.args.get('in_stock') == '1'
     category_ids = request.args.getlist('category', type=int)
     
-    # Construir la consulta de búsqueda
-    search_query = f"%{query}%"
-    
     # Búsqueda en nombres de productos, descripciones y categorías
-    products_query = Product.query.join(Category).filter(
-        (Product.product_name.ilike(search_query)) |
-        (Product.description.ilike(search_query)) |
-        (Category.name.ilike(search_query))
-    )
+    products_query, rank = filter_products(Product.query.join(Category), query, with_category=True)
     
     # Aplicar filtros
     if min_price is not None:
@@ -426,86 +295,28 @@ def search():
             products_query = products_query.order_by(Product.current_price.asc())
         else:
             products_query = products_query.order_by(Product.current_price.desc())
+    elif rank is not None:
+        # Orden por relevancia (predeterminado): bm25 del índice FTS5
+        products_query = products_query.order_by(rank, Product.id.desc())
     else:
-        # Orden por relevancia (predeterminado)
         products_query = products_query.order_by(Product.id.desc())
     
     # Obtener todas las categorías para el filtro
     categories = Category.query.order_by(Category.name).all()
     
     # Generar búsquedas relacionadas más inteligentes
-    related_searches = []
-    
-    # 1. Búsquedas con palabras similares (usando búsqueda difusa)
-    if len(query) > 3:
-        # Buscar productos con nombres similares
-        similar_products = Product.query.filter(
-            Product.product_name.ilike(f"%{query}%")
-        ).limit(3).all()
-        
-        for product in similar_products:
-            # Extraer palabras clave únicas del nombre del producto
-            product_words = set(word.lower() for word in product.product_name.split() if len(word) > 3)
-            query_words = set(word.lower() for word in query.split() if len(word) > 3)
-            
-            # Añadir palabras del producto que no estén en la consulta
-            new_terms = list(product_words - query_words)
-            if new_terms:
-                related_search = f"{query} {new_terms[0]}"
-                if related_search not in related_searches:
-                    related_searches.append(related_search)
-    
-    # 2. Búsquedas con una palabra menos (solo si no hay suficientes sugerencias)
-    if len(related_searches) < 3 and len(query.split()) > 1:
-        words = query.split()
-        for i in range(min(3, len(words))):
-            shorter_query = ' '.join(words[:i] + words[i+1:])
-            if shorter_query and shorter_query not in related_searches:
-                related_searches.append(shorter_query)
-    
-    # 3. Búsquedas populares en la misma categoría
-    if category_ids:
-        popular_in_category = Product.query.filter(
-            Product.category_id.in_(category_ids),
-            Product.product_name != query,
-            Product.in_stock > 0
-        ).order_by(
-            Product.created_at.desc()
-        ).limit(3).all()
-        
-        for product in popular_in_category:
-            if len(related_searches) < 5:  # Limitar el número total de sugerencias
-                related_searches.append(product.product_name)
-    
-    # Eliminar duplicados y limitar el número de sugerencias
-    related_searches = list(dict.fromkeys(related_searches))[:5]
+    related = related_searches(query, category_ids)
     
     # Aplicar paginación
     products = products_query.paginate(page=page, per_page=per_page, error_out=False)
     
     # Mejorar la sugerencia de búsqueda alternativa
-    did_you_mean = None
+    did_you_mean_query = None
     if products.total == 0 and len(query) > 2:
-        # Buscar términos similares usando búsqueda difusa
-        from difflib import get_close_matches
-        
-        # Obtener todas las palabras de productos para sugerencias
-        all_product_words = set()
-        for product in Product.query.with_entities(Product.product_name).all():
-            all_product_words.update(word.lower() for word in product[0].split() if len(word) > 2)
-        
-        # Buscar coincidencias cercanas para cada palabra de la consulta
-        suggested_terms = []
-        for word in query.lower().split():
-            if len(word) > 2:  # Solo buscar sugerencias para palabras de 3+ caracteres
-                matches = get_close_matches(word, all_product_words, n=1, cutoff=0.6)
-                if matches:
-                    suggested_terms.append(matches[0])
+        # Corregir cada palabra con el vocabulario precalculado (SymSpell)
+        did_you_mean_query = did_you_mean(query)
         
-        # Si encontramos sugerencias, construir una nueva consulta
-        if suggested_terms:
-            did_you_mean = ' '.join(suggested_terms)
-        else:
+        if not did_you_mean_query:
             # Si no hay sugerencias cercanas, buscar productos con palabras similares
             similar = Product.query.filter(
                 Product.product_name.ilike(f"%{query[:3]}%")
@@ -513,14 +324,14 @@ def search():
                 db.func.length(Product.product_name)
             ).first()
             if similar:
-                did_you_mean = ' '.join(similar.product_name.split()[:3])  # Tomar hasta 3 palabras
+                did_you_mean_query = ' '.join(similar.product_name.split()[:3])  # Tomar hasta 3 palabras
     
     return render_template('search_results.html', 
                          query=query, 
                          products=products,
                          categories=categories,
-                         related_searches=related_searches[:5],
-                         did_you_mean=did_you_mean,
+                         related_searches=related,
+                         did_you_mean=did_you_mean_query,
                          sort=sort,
                          order=order,
                          request_args=request.args)
@@ -538,28 +349,17 @@ def add_product():
         try:
             # Manejar la subida de la imagen
             product_picture = '/static/images/default-product.jpg'  # Imagen por defecto
+            picture_meta = None
             if form.product_picture.data:
                 file = form.product_picture.data
                 if file and file.filename:
-                    # Verificar la extensión del archivo
-                    allowed_extensions = {'png', 'jpg', 'jpeg', 'gif'}
-                    file_ext = file.filename.rsplit('.', 1)[1].lower() if '.' in file.filename else ''
-                    
-                    if file_ext not in allowed_extensions:
-                        flash('Formato de archivo no permitido. Use: png, jpg, jpeg, gif', 'error')
+                    # Imagen sin metadatos más miniaturas y variantes WebP
+                    try:
+                        product_picture, meta = process_image(file)
+                    except InvalidImageError as e:
+                        flash(str(e), 'error')
                         return redirect(url_for('views.add_product'))
-                    
-                    # Crear directorio de uploads si no existe
-                    upload_folder = os.path.join('website', 'static', 'uploads', 'products')
-                    os.makedirs(upload_folder, exist_ok=True)
-                    
-                    # Generar nombre único para el archivo
-                    filename = f"{datetime.now().strftime('%Y%m%d%H%M%S')}_{secure_filename(file.filename)}"
-                    file_path = os.path.join(upload_folder, filename)
-                    file.save(file_path)
-                    
-                    # Guardar la ruta relativa para la base de datos
-                    product_picture = os.path.join('static', 'uploads', 'products', filename).replace('\\', '/')
+                    picture_meta = dump_meta(meta)
             
             # Crear el nuevo producto
             new_product = Product(
@@ -571,6 +371,7 @@ def add_product():
                 stock_quantity=form.stock_quantity.data,
                 flash_sale=form.flash_sale.data,
                 product_picture=product_picture,
+                picture_meta=picture_meta,
                 category_id=form.category_id.data,
                 created_by=current_user.id
             )
@@ -591,6 +392,7 @@ def add_product():
 
 
 @views.route('/list-products')
+@cached_page
 def list_products():
     # Obtener todos los productos y categorías
     products = Product.query.all()
@@ -697,24 +499,14 @@ def edit_item(item_id):
             if 'product_picture' in request.files:
                 file = request.files['product_picture']
                 if file and file.filename:
-                    # Verificar la extensión del archivo
-                    allowed_extensions = {'png', 'jpg', 'jpeg', 'gif'}
-                    if '.' in file.filename and file.filename.rsplit('.', 1)[1].lower() in allowed_extensions:
-                        filename = secure_filename(file.filename)
-                        # Agregar timestamp al nombre del archivo para evitar duplicados
-                        filename = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{filename}"
-                        # Asegurarse de que el directorio existe
-                        upload_dir = os.path.join('website', 'static', 'uploads', 'products')
-                        os.makedirs(upload_dir, exist_ok=True)
-                        # Guardar el archivo
-                        file_path = os.path.join(upload_dir, filename)
-                        file.save(file_path)
-                        # Actualizar la ruta de la imagen en el producto
-                        product.product_picture = f'/static/uploads/products/{filename}'
-                        imagen_actualizada = True
-                    else:
-                        flash('Tipo de archivo no permitido. Use PNG, JPG, JPEG o GIF.', 'error')
+                    # Imagen sin metadatos más miniaturas y variantes WebP
+                    try:
+                        product.product_picture, meta = process_image(file)
+                    except InvalidImageError as e:
+                        flash(str(e), 'error')
                         return redirect(url_for('views.edit_item', item_id=item_id))
+                    product.picture_meta = dump_meta(meta)
+                    imagen_actualizada = True
             # Si no se subió imagen y el campo está vacío o null, poner la imagen por defecto
             if not imagen_actualizada and (not product.product_picture or product.product_picture.strip() == '' or product.product_picture is None):
                 product.product_picture = '/static/images/default-product.jpg'
@@ -817,6 +609,7 @@ def delete_category(category_id):
     return redirect(url_for('views.categories'))
 
 @views.route('/category/<int:category_id>')
+@cached_page
 def category_products(category_id):
     # Obtener el número de página de los parámetros de la URL, por defecto 1
     page = request.args.get('page', 1, type=int)
@@ -909,22 +702,6 @@ def create_sample_categories():
     
     return redirect(url_for('views.categories'))
 
-@views.route('/evaluation/module-quality')
-@login_required
-def module_quality():
-    if not current_user.is_admin:
-        flash('Acceso no autorizado. Solo los administradores pueden ver esta página.', 'error')
-        return redirect(url_for('views.home'))
-    return render_template('evaluation/module_quality.html')
-
-@views.route('/evaluation/usage-quality')
-@login_required
-def usage_quality():
-    if not current_user.is_admin:
-        flash('Acceso no autorizado. Solo los administradores pueden ver esta página.', 'error')
-        return redirect(url_for('views.home'))
-    return render_template('evaluation/usage_quality.html')
-
 @views.route('/profile')
 @login_required
 def profile():
@@ -973,18 +750,14 @@ def update_profile():
             if 'profile_picture' in request.files:
                 file = request.files['profile_picture']
                 if file and file.filename:
-                    # Verificar la extensión del archivo
-                    allowed_extensions = {'png', 'jpg', 'jpeg', 'gif'}
-                    if '.' in file.filename and file.filename.rsplit('.', 1)[1].lower() in allowed_extensions:
-                        filename = secure_filename(file.filename)
-                        # Agregar timestamp al nombre del archivo para evitar duplicados
-                        filename = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{filename}"
-                        file_path = os.path.join('website/static/uploads', filename)
-                        file.save(file_path)
-                        current_user.profile_picture = f'/static/uploads/{filename}'
-                    else:
-                        flash('Tipo de archivo no permitido. Use PNG, JPG, JPEG o GIF.', 'danger')
+                    try:
+                        picture, meta = process_image(file)
+                    except InvalidImageError as e:
+                        flash(str(e), 'danger')
                         return redirect(url_for('views.profile'))
+                    # El perfil muestra la foto a 150 px: basta la miniatura de 320 px
+                    thumbnails = [v for v in meta['variants'] if v['width'] >= 320]
+                    current_user.profile_picture = thumbnails[0]['src'] if thumbnails else picture
 
             db.session.commit()
             flash('Perfil actualizado exitosamente.', 'success')
@@ -1072,9 +845,12 @@ def admin_add_product():
         if 'image' in request.files:
             file = request.files['image']
             if file and file.filename:
-                filename = secure_filename(file.filename)
-                file.save(os.path.join('website/static/uploads/products', filename))
-                new_product.image = f'/static/uploads/products/{filename}'
+                try:
+                    new_product.product_picture, meta = process_image(file)
+                except InvalidImageError as e:
+                    flash(str(e), 'error')
+                    return redirect(url_for('views.admin'))
+                new_product.picture_meta = dump_meta(meta)
 
         db.session.add(new_product)
         db.session.commit()